@@ -0,0 +1,141 @@
+import argparse
+import statistics
+import threading
+import time
+from typing import Dict, List
+from services.captcha_broker import CaptchaTokenBroker
+from services.twocaptcha_handler import TwoCaptchaHandler
+from standins.captcha_standin import CaptchaStandin, StandinConfig
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the captcha path against the local stand-in")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent pipeline workers")
+    parser.add_argument('--postings', type=int, default=5, help="Postings per worker")
+    parser.add_argument('--fill-time', type=float, default=10.0,
+                        help="Simulated form filling time per posting (s)")
+    parser.add_argument('--solve-median', type=float, default=15.0, help="Stand-in median solve time (s)")
+    parser.add_argument('--solve-sigma', type=float, default=0.5, help="Stand-in log-normal spread")
+    parser.add_argument('--unsolvable-rate', type=float, default=0.05,
+                        help="Share of tasks the stand-in reports as unsolvable")
+    parser.add_argument('--poll-interval', type=float, default=0.5, help="res.php poll interval (s)")
+    parser.add_argument('--browser', action='store_true',
+                        help="Also time the in-browser path against the fake hCaptcha widget")
+    return parser.parse_args()
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+def run_api_benchmark(args, standin: CaptchaStandin, prefetch: bool) -> Dict[str, float]:
+    """Simulate workers that fill for fill_time and then need a token"""
+    handler = TwoCaptchaHandler("standin-key", base_url=standin.base_url,
+                                poll_interval=args.poll_interval, max_polls=10_000)
+    broker = CaptchaTokenBroker(handler, max_solves=10_000, workers=args.workers * 2,
+                                sitekey_path="output/state/benchmark-sitekeys.json")
+    sitekey = standin.config.sitekey
+    waits: List[float] = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def worker(worker_id: int):
+        for posting in range(args.postings):
+            page_url = f"{standin.base_url}/widget?worker={worker_id}&posting={posting}"
+            if prefetch:
+                broker.prefetch_sitekey(sitekey, page_url)
+            time.sleep(args.fill_time)
+            started = time.monotonic()
+            token = broker.take(sitekey, page_url)
+            with lock:
+                waits.append(time.monotonic() - started)
+                if not token:
+                    failures[0] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    broker.close()
+
+    total = args.workers * args.postings
+    return {
+        'elapsed': elapsed,
+        'wait_p50': percentile(waits, 50),
+        'wait_p95': percentile(waits, 95),
+        'wait_mean': statistics.mean(waits) if waits else 0.0,
+        'failures': failures[0],
+        'postings_per_min': total / elapsed * 60 if elapsed else 0.0,
+    }
+
+def run_browser_benchmark(args, standin: CaptchaStandin) -> Dict[str, float]:
+    """Time detection and solution injection against the fake widget page"""
+    from services.browser import BrowserService
+
+    handler = TwoCaptchaHandler("standin-key", base_url=standin.base_url,
+                                poll_interval=args.poll_interval, max_polls=10_000)
+    timings: Dict[str, List[float]] = {'detect': [], 'solve': [], 'submit': []}
+    solved = 0
+    with BrowserService(headless=True, slow_mo=0) as browser:
+        page = browser.get_page()
+        for _ in range(args.postings):
+            page.goto(f"{standin.base_url}/widget?challenge=1")
+
+            started = time.monotonic()
+            hcaptcha = TwoCaptchaHandler.detect_hcaptcha(page)
+            timings['detect'].append(time.monotonic() - started)
+            if not hcaptcha["found"]:
+                continue
+
+            started = time.monotonic()
+            ok = handler.solve_hcaptcha(page, hcaptcha)
+            timings['solve'].append(time.monotonic() - started)
+            if not ok:
+                continue
+
+            started = time.monotonic()
+            page.click('button[type="submit"]')
+            page.wait_for_load_state()
+            timings['submit'].append(time.monotonic() - started)
+            if 'Application submitted' in page.content():
+                solved += 1
+
+    result = {f"{stage}_p50": percentile(values, 50) for stage, values in timings.items()}
+    result['submitted'] = solved
+    return result
+
+def main():
+    """Compare captcha solving with and without prefetch under concurrency"""
+    args = parse_args()
+    config = StandinConfig(solve_median=args.solve_median, solve_sigma=args.solve_sigma,
+                           unsolvable_rate=args.unsolvable_rate)
+
+    with CaptchaStandin(config) as standin:
+        print(f"Stand-in at {standin.base_url}: {args.workers} workers x {args.postings} postings, "
+              f"fill {args.fill_time}s, solve median {args.solve_median}s")
+
+        for label, prefetch in (("on demand", False), ("prefetch", True)):
+            result = run_api_benchmark(args, standin, prefetch)
+            print(f"\n[{label}] {result['elapsed']:.1f}s total, "
+                  f"{result['postings_per_min']:.1f} postings/min")
+            print(f"  token wait after fill: p50 {result['wait_p50']:.1f}s, "
+                  f"p95 {result['wait_p95']:.1f}s, mean {result['wait_mean']:.1f}s")
+            print(f"  failed solves: {result['failures']}")
+
+        if args.browser:
+            # Near-instant solves so the browser-side cost is what gets measured
+            standin.config.solve_median = 0
+            standin.config.unsolvable_rate = 0
+            result = run_browser_benchmark(args, standin)
+            print(f"\n[browser] detect p50 {result['detect_p50']:.2f}s, "
+                  f"solve+inject p50 {result['solve_p50']:.2f}s, "
+                  f"submit p50 {result['submit_p50']:.2f}s, "
+                  f"{result['submitted']}/{args.postings} accepted")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+from services.lever_discovery import LeverDiscovery
+from utils.constants import LEVER_DISCOVERY
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="List open Lever postings through the public postings API")
+    parser.add_argument('--companies', nargs='+', default=LEVER_DISCOVERY['companies'],
+                        help="Lever company slugs (jobs.lever.co/<slug>)")
+    parser.add_argument('--title', nargs='+', default=None,
+                        help="Keep postings whose title contains one of these")
+    parser.add_argument('--exclude-title', nargs='+', default=None,
+                        help="Drop postings whose title contains one of these")
+    parser.add_argument('--location', nargs='+', default=None,
+                        help="Keep postings whose location contains one of these")
+    parser.add_argument('--api-base', default=LEVER_DISCOVERY['api_base'], help="Postings API base URL")
+    parser.add_argument('--cache', default=LEVER_DISCOVERY['cache_path'], help="ETag/Last-Modified cache")
+    parser.add_argument('--workers', type=int, default=LEVER_DISCOVERY['workers'], help="Parallel requests")
+    parser.add_argument('--output', default=LEVER_DISCOVERY['output_path'], help="Where the postings are written")
+    parser.add_argument('--standin', type=int, default=0, metavar='N',
+                        help="Query a local stand-in with N generated companies instead of Lever")
+    parser.add_argument('--standin-port', type=int, default=LEVER_DISCOVERY['standin_port'],
+                        help="Port of the stand-in started by --standin")
+    return parser.parse_args()
+
+def rules_from(args: argparse.Namespace) -> dict:
+    """Configured filter rules, overridden by the command line"""
+    rules = dict(LEVER_DISCOVERY['rules'])
+    if args.title is not None:
+        rules['title_include'] = args.title
+    if args.exclude_title is not None:
+        rules['title_exclude'] = args.exclude_title
+    if args.location is not None:
+        rules['locations'] = args.location
+    return rules
+
+def main():
+    """Discover matching postings and write their apply URLs"""
+    args = parse_args()
+    standin = None
+    companies, api_base, cache = args.companies, args.api_base, args.cache
+    if args.standin:
+        from standins.lever_standin import LeverStandin
+        standin = LeverStandin(companies=args.standin, port=args.standin_port).start()
+        companies, api_base = standin.companies, standin.api_base
+        # Keep the stand-in's validators out of the real cache
+        cache = str(Path(args.cache).with_name('lever_postings_standin.json'))
+
+    discovery = LeverDiscovery(api_base=api_base, cache_path=cache, workers=args.workers)
+    try:
+        started = time.monotonic()
+        postings = discovery.discover(companies, rules_from(args))
+        elapsed = time.monotonic() - started
+    finally:
+        discovery.close()
+        if standin:
+            standin.stop()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump([dict(asdict(posting), name=posting.name) for posting in postings], f, indent=2)
+
+    stats = discovery.stats
+    print(f"{len(postings)} matching postings from {len(companies)} companies in {elapsed:.2f}s "
+          f"({stats['fetched']} fetched, {stats['not_modified']} unchanged, {stats['failed']} failed)")
+    print(f"Postings written to {output}")
+
+if __name__ == "__main__":
+    main()
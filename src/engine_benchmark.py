@@ -0,0 +1,181 @@
+import argparse
+import json
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from services.browser import BrowserService, ENGINES, load_engine_routes
+from services.form_filler import FormFiller
+from services.form_scraper import FormScraper
+from services.form_submitter import FormSubmitter
+from services.latency_tracker import HostTimeouts
+from services.posting_budget import PostingBudget
+from services.scheduler import host_of
+from services.twocaptcha_handler import TwoCaptchaHandler
+from utils.constants import BROWSER_ENGINES, REPLAY
+from utils.postings import URLS
+
+STAGES = ('load', 'scrape', 'fill', 'verify', 'submit')
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Compare browser engines on recorded postings or the stand-in form")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES),
+                        help="Engines to compare")
+    parser.add_argument('--source', choices=('recorded', 'standin'), default='recorded',
+                        help="recorded: replay the HARs of URLS; standin: the local Lever-like form")
+    parser.add_argument('--har-dir', default=REPLAY['har_dir'], help="Directory holding the HAR archives")
+    parser.add_argument('--runs', type=int, default=3, help="Runs of every posting per engine")
+    parser.add_argument('--headed', action='store_true', help="Show the browsers (default: headless)")
+    parser.add_argument('--write-routes', action='store_true',
+                        help=f"Save the fastest engine per host to {BROWSER_ENGINES['routes_path']}")
+    return parser.parse_args()
+
+def recorded_postings(har_dir: str) -> List[Tuple[str, str, str]]:
+    """(url, name, host) of every posting in URLS that has a recording"""
+    return [(url, name, host_of(url)) for url, name in URLS
+            if (Path(har_dir) / f"{name}.har.zip").exists()]
+
+def run_posting(browser: BrowserService, url: str, name: str,
+                captcha_handler: Optional[TwoCaptchaHandler]) -> Tuple[Dict[str, float], bool]:
+    """Load, scrape, fill, verify and submit one posting, timing each stage"""
+    timings: Dict[str, float] = {}
+    timeouts = HostTimeouts().with_budget(PostingBudget())
+    submitted = False
+    try:
+        started = time.monotonic()
+        # A fresh context per run, so no run starts on a warm cache
+        browser.start_posting(name, isolated=True)
+        browser.goto(url, timeouts)
+        timings['load'] = time.monotonic() - started
+
+        page = browser.get_page()
+        started = time.monotonic()
+        elements = FormScraper(page, timeouts).scrape_form()
+        timings['scrape'] = time.monotonic() - started
+
+        filler = FormFiller(page, timeouts=timeouts)
+        started = time.monotonic()
+        filler.fill_form(elements, captcha_handler=captcha_handler)
+        timings['fill'] = time.monotonic() - started
+
+        started = time.monotonic()
+        filler.verify_and_repair(elements)
+        timings['verify'] = time.monotonic() - started
+
+        started = time.monotonic()
+        submitted = FormSubmitter(page, timeouts=timeouts).submit_form(captcha_handler=captcha_handler)
+        timings['submit'] = time.monotonic() - started
+    except Exception as e:
+        print(f"{name} failed on {browser.engine}: {e}")
+    return timings, submitted
+
+def run_engine(args, engine: str, postings: List[Tuple[str, str, str]],
+               captcha_handler: Optional[TwoCaptchaHandler]) -> Dict[str, dict]:
+    """Every posting args.runs times on one engine; results per host"""
+    mode = 'replay' if args.source == 'recorded' else 'live'
+    results: Dict[str, dict] = defaultdict(lambda: {
+        'stages': defaultdict(list), 'totals': [], 'ok': 0, 'runs': 0, 'rss_mb': [], 'launch': 0.0})
+    started = time.monotonic()
+    with BrowserService(headless=not args.headed, slow_mo=0, mode=mode, har_dir=args.har_dir,
+                        engine=engine, recycle_after=0, recycle_rss_mb=0) as browser:
+        launch = time.monotonic() - started
+        for _ in range(args.runs):
+            for url, name, host in postings:
+                timings, submitted = run_posting(browser, url, name, captcha_handler)
+                result = results[host]
+                result['launch'] = launch
+                result['runs'] += 1
+                result['ok'] += submitted
+                for stage, seconds in timings.items():
+                    result['stages'][stage].append(seconds)
+                if submitted:
+                    result['totals'].append(sum(timings.values()))
+                rss = browser.rss_mb()
+                if rss is not None:
+                    result['rss_mb'].append(rss)
+    return results
+
+def summarize(results: Dict[str, dict]) -> Dict[str, dict]:
+    """Medians per stage, peak memory and success rate"""
+    summary = {}
+    for host, result in results.items():
+        summary[host] = {
+            'stages': {stage: statistics.median(values) for stage, values in result['stages'].items()},
+            'total': statistics.median(result['totals']) if result['totals'] else None,
+            'success': result['ok'] / result['runs'] if result['runs'] else 0.0,
+            'peak_rss_mb': max(result['rss_mb']) if result['rss_mb'] else None,
+            'launch': result['launch'],
+        }
+    return summary
+
+def fastest_engines(by_engine: Dict[str, Dict[str, dict]]) -> Dict[str, str]:
+    """Per host: the most reliable engine, ties broken by median total time"""
+    routes = {}
+    hosts = {host for summary in by_engine.values() for host in summary}
+    for host in hosts:
+        candidates = [(engine, summary[host]) for engine, summary in by_engine.items()
+                      if host in summary and summary[host]['total'] is not None]
+        if candidates:
+            engine, _ = min(candidates, key=lambda item: (-item[1]['success'], item[1]['total']))
+            routes[host] = engine
+    return routes
+
+def print_report(by_engine: Dict[str, Dict[str, dict]]) -> None:
+    header = f"{'host':<28} {'engine':<9}" + ''.join(f"{stage:>8}" for stage in STAGES)
+    print(f"\n{header} {'total':>8} {'ok':>6} {'rss':>7}")
+    for host in sorted({host for summary in by_engine.values() for host in summary}):
+        for engine, summary in by_engine.items():
+            if host not in summary:
+                continue
+            row = summary[host]
+            stages = ''.join(f"{row['stages'].get(stage, 0):8.2f}" for stage in STAGES)
+            total = f"{row['total']:8.2f}" if row['total'] is not None else f"{'n/a':>8}"
+            rss = f"{row['peak_rss_mb']:5.0f}MB" if row['peak_rss_mb'] is not None else f"{'n/a':>7}"
+            print(f"{host:<28} {engine:<9}{stages} {total} {row['success']:6.0%} {rss}")
+
+def main():
+    """Run the same postings on each engine and report where each one is fastest"""
+    args = parse_args()
+    captcha_handler = None
+    standin = None
+    if args.source == 'standin':
+        from standins.captcha_standin import CaptchaStandin, StandinConfig
+        # Instant solves: the engines' own cost is what gets measured
+        standin = CaptchaStandin(StandinConfig(solve_median=0, unsolvable_rate=0)).start()
+        captcha_handler = TwoCaptchaHandler("standin-key", base_url=standin.base_url, poll_interval=0.2)
+        postings = [(f"{standin.base_url}/widget", "standin", "standin")]
+    else:
+        postings = recorded_postings(args.har_dir)
+        if not postings:
+            print(f"No recordings in {args.har_dir}; run main.py --mode record first")
+            return
+
+    try:
+        by_engine = {}
+        for engine in args.engines:
+            print(f"\nBenchmarking {engine} on {len(postings)} postings x {args.runs} runs...")
+            by_engine[engine] = summarize(run_engine(args, engine, postings, captcha_handler))
+            launches = {row['launch'] for row in by_engine[engine].values()}
+            print(f"{engine} launched in {max(launches, default=0):.2f}s")
+    finally:
+        if standin:
+            standin.stop()
+
+    print_report(by_engine)
+    routes = fastest_engines(by_engine)
+    for host, engine in sorted(routes.items()):
+        print(f"Fastest for {host}: {engine}")
+
+    if args.write_routes and args.source == 'recorded' and routes:
+        saved = load_engine_routes()
+        saved.update(routes)
+        path = Path(BROWSER_ENGINES['routes_path'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(saved, f, indent=2)
+        print(f"Engine routes saved to {path} (use with main.py --engine auto)")
+
+if __name__ == "__main__":
+    main()
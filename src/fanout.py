@@ -0,0 +1,184 @@
+import argparse
+import glob
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from models.form import FormElement
+from services.answer_matcher import AnswerMatcher
+from services.captcha_triggers import CaptchaTriggerStore
+from services.browser import BrowserService
+from services.form_filler import FormFiller
+from services.form_scraper import FormScraper
+from services.form_submitter import FormSubmitter, SubmissionError
+from services.latency_tracker import LatencyTracker
+from services.posting_budget import PostingBudget
+from services.posting_costs import PostingCostModel
+from services.scheduler import HostScheduler, host_of
+from services.twocaptcha_handler import TwoCaptchaHandler
+from utils.postings import URLS, CAPTCHA_API_KEY, posting_schedule
+
+@dataclass
+class Profile:
+    name: str
+    path: str
+
+@dataclass
+class Posting:
+    url: str
+    name: str
+    elements: List[FormElement]
+
+@dataclass
+class FillTask:
+    profile: Profile
+    posting: Posting
+    plan: Dict[str, Any]
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Apply several candidate profiles to each scraped posting")
+    parser.add_argument('--profiles', nargs='+', required=True,
+                        help="Resume data JSON files (globs allowed), one per candidate")
+    parser.add_argument('--workers', type=int, default=2, help="Parallel browsers filling forms")
+    parser.add_argument('--headless', action='store_true', help="Run the browsers headless")
+    parser.add_argument('--slow-mo', type=int, default=0, help="Delay between browser actions in ms")
+    parser.add_argument('--output-dir', default='output/fanout', help="Schemas and fill plans")
+    parser.add_argument('--no-submit', action='store_true',
+                        help="Fill and verify, but don't submit (plan review / dry runs)")
+    return parser.parse_args()
+
+def load_profiles(patterns: List[str]) -> List[Profile]:
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    return [Profile(name=Path(path).stem, path=path) for path in paths]
+
+def scrape_postings(args, latency_tracker: LatencyTracker, output_dir: Path) -> List[Posting]:
+    """Load and scrape each posting once, whatever the number of profiles"""
+    postings = []
+    with BrowserService(headless=args.headless, slow_mo=args.slow_mo) as browser:
+        for url, name in URLS:
+            timeouts = latency_tracker.for_host(host_of(url))
+            try:
+                browser.goto(url, timeouts)
+                elements = FormScraper(browser.get_page(), timeouts).scrape_form()
+            except Exception as e:
+                print(f"Skipping {name}, could not scrape it: {e}")
+                continue
+            postings.append(Posting(url=url, name=name, elements=elements))
+            with open(output_dir / f"{name}-form.json", "w") as f:
+                json.dump({"url": url, "timestamp": datetime.now().isoformat(),
+                           "elements": [elem.to_dict() for elem in elements]}, f, indent=2)
+            print(f"Scraped {name}: {len(elements)} elements")
+    return postings
+
+def plan_fills(profiles: List[Profile], postings: List[Posting], matcher: AnswerMatcher,
+               output_dir: Path) -> List[FillTask]:
+    """Every profile's fill plan for every schema, from one shared label scoring pass"""
+    labels = sorted({elem.label for posting in postings for elem in posting.elements if elem.label})
+    # The bank match depends only on the label; profiles differ in the values it points to
+    bank_matches = dict(zip(labels, matcher.match_all(labels)))
+
+    tasks = []
+    for profile in profiles:
+        filler = FormFiller(None, resume_data_path=profile.path, answer_matcher=matcher)
+        for posting in postings:
+            plan = filler.plan(posting.elements, posting.url, bank_matches)
+            tasks.append(FillTask(profile=profile, posting=posting, plan=plan))
+            with open(output_dir / f"{profile.name}-{posting.name}-plan.json", "w") as f:
+                json.dump(plan, f, indent=2)
+    return tasks
+
+def fill_worker(worker_id: int, args, scheduler: HostScheduler, tasks: Dict[str, FillTask],
+                matcher: AnswerMatcher, latency_tracker: LatencyTracker,
+                cost_model: PostingCostModel,
+                captcha_handler: Optional[TwoCaptchaHandler]) -> None:
+    """Fill (and submit) scheduled tasks, each in a fresh browser context"""
+    # Each thread drives its own Playwright instance
+    with BrowserService(headless=args.headless, slow_mo=args.slow_mo, worker_id=worker_id) as browser:
+        while (job := scheduler.next_job()) is not None:
+            task = tasks[job.name]
+            timeouts = latency_tracker.for_host(job.host).with_budget(PostingBudget())
+            started = time.monotonic()
+            try:
+                # Candidates never share cookies, storage or half-filled forms
+                browser.start_posting(job.name, isolated=True)
+                browser.goto(job.url, timeouts)
+                filler = FormFiller(browser.get_page(), resume_data_path=task.profile.path,
+                                    timeouts=timeouts, answer_matcher=matcher)
+                filler.fill_form(task.posting.elements, captcha_handler=captcha_handler, plan=task.plan)
+                report = filler.verify_and_repair(task.posting.elements)
+                if not report.ready:
+                    raise SubmissionError(f"required fields empty: {', '.join(report.missing_required)}")
+                if not args.no_submit:
+                    submitter = FormSubmitter(browser.get_page(), timeouts=timeouts)
+                    if not submitter.submit_form(captcha_handler=captcha_handler):
+                        raise SubmissionError(f"Submission {submitter.last_outcome}: {submitter.last_reason}")
+                scheduler.report_success(job)
+                # Workers share the captcha handler, so whether this posting met one is unknown
+                cost_model.record(job.host, time.monotonic() - started, len(task.posting.elements))
+            except Exception as e:
+                print(f"[worker {worker_id}] Error on {job.name}: {e}")
+                scheduler.report_failure(job, e)
+            finally:
+                # Losing a history update must not end the worker and strand its jobs
+                try:
+                    latency_tracker.save()
+                    cost_model.save()
+                except OSError as e:
+                    print(f"[worker {worker_id}] Could not save timing history: {e}")
+
+def main():
+    """Scrape each posting once and apply every profile to it"""
+    args = parse_args()
+    profiles = load_profiles(args.profiles)
+    if not profiles:
+        print("No profiles found")
+        return
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    latency_tracker = LatencyTracker.load()
+
+    started = datetime.now()
+    postings = scrape_postings(args, latency_tracker, output_dir)
+    scraped_at = datetime.now()
+    matcher = AnswerMatcher.from_file("src/data/answer_bank.json")
+    tasks = plan_fills(profiles, postings, matcher, output_dir)
+    planned_at = datetime.now()
+    print(f"\n{len(postings)} postings scraped in {(scraped_at - started).total_seconds():.1f}s, "
+          f"{len(tasks)} fill plans for {len(profiles)} profiles in "
+          f"{(planned_at - scraped_at).total_seconds():.1f}s")
+
+    scheduler = HostScheduler()
+    cost_model = PostingCostModel.load()
+    by_name: Dict[str, FillTask] = {}
+    for task in tasks:
+        name = f"{task.profile.name}-{task.posting.name}"
+        by_name[name] = task
+        priority, deadline = posting_schedule(task.posting.name)
+        scheduler.add(task.posting.url, name, priority=priority, deadline=deadline,
+                      cost=cost_model.estimate(host_of(task.posting.url), len(task.posting.elements)))
+
+    captcha_handler = TwoCaptchaHandler(CAPTCHA_API_KEY)
+    captcha_handler.triggers = CaptchaTriggerStore.load()
+    workers = [
+        threading.Thread(target=fill_worker,
+                         args=(i, args, scheduler, by_name, matcher, latency_tracker, cost_model,
+                               captcha_handler))
+        for i in range(max(1, min(args.workers, len(tasks))))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stats = scheduler.stats
+    print(f"\nDone in {(datetime.now() - started).total_seconds():.1f}s: "
+          f"{len(stats.succeeded)} succeeded, {len(stats.failed)} failed, {stats.retries} retries")
+    for name, error in stats.failed.items():
+        print(f"  - {name}: {error}")
+
+if __name__ == "__main__":
+    main()
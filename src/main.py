@@ -1,76 +1,326 @@
+import argparse
 import json
+import time
 from datetime import datetime
-from services.browser import BrowserService
+from services.browser import BrowserService, PIPELINE_MODES, ENGINES, load_engine_routes
 from services.form_scraper import FormScraper
 from services.form_filler import FormFiller
-from services.form_submitter import FormSubmitter
+from services.form_submitter import FormSubmitter, SubmissionError
 from services.twocaptcha_handler import TwoCaptchaHandler
+from services.scheduler import HostScheduler, Job, host_of
+from services.latency_tracker import LatencyTracker, HostTimeouts
+from services.snapshot_store import SnapshotStore
+from services.captcha_broker import CaptchaTokenBroker
+from services.captcha_diagnostics import CaptchaDiagnostics, DIAGNOSTIC_LEVELS
+from services.captcha_triggers import CaptchaTriggerStore
+from services.pipeline import PostingPipeline
+from services.question_corpus import QuestionCorpus
+from services.session_cache import SessionCache
+from services.workday_auth import WorkdayAuth
+from services.trace_recorder import TraceRecorder
+from services.round_trips import RoundTripProfiler
+from services.posting_costs import PostingCostModel, schema_field_count
+from services.posting_budget import PostingBudget
+from services.lever_discovery import LeverDiscovery
 from pathlib import Path
-from utils.constants import TIMEOUTS
+from typing import Optional
+from utils.postings import URLS, CAPTCHA_API_KEY, posting_schedule
+from utils.constants import REPLAY, SNAPSHOTS, CAPTCHA_DIAGNOSTICS, QUESTION_CORPUS, WORKDAY_AUTH, TRACING, ROUND_TRIPS, POSTING_BUDGET, BROWSER_ENGINES, LEVER_DISCOVERY
 
-# Test URLs
-URLS = [
-    ("https://jobs.lever.co/voltus/e6e12da1-116e-4fa9-bb36-a6d224aaee4f/apply", "voltus"),
-    ("https://jobs.lever.co/Regentcraft/f8597117-3d67-4989-944a-c89fd4f756ac/apply", "regentcraft")
-]
+def process_posting(browser: BrowserService, url: str, name: str,
+                    captcha_handler: Optional[TwoCaptchaHandler], output_dir: Path,
+                    timeouts: HostTimeouts,
+                    snapshot_store: Optional[SnapshotStore] = None,
+                    pipeline: Optional[PostingPipeline] = None,
+                    job: Optional[Job] = None,
+                    corpus: Optional[QuestionCorpus] = None,
+                    workday_auth: Optional[WorkdayAuth] = None) -> bool:
+    """Scrape, fill and submit a single posting.
 
-# Captcha solver API key
-CAPTCHA_API_KEY = "<your api key>"
+    With a pipeline, the page may arrive already loaded and scraped, and the
+    next posting is loaded and scraped while this one is filled and submitted.
+    Raises SubmissionError when the ATS does not confirm the submission.
+    """
+    print(f"\nProcessing {name}...")
+    form_elements = pipeline.take(job) if pipeline else None
+    if form_elements is not None:
+        print("Using page loaded and scraped ahead")
+    else:
+        print("Navigating to URL...")
+        browser.goto(url, timeouts)
+
+    # Candidate account sign-in, checked on the loaded posting page (usually
+    # a cached session, so nothing more to do)
+    if workday_auth and workday_auth.handles(url):
+        sign_ins = workday_auth.sign_ins
+        if not workday_auth.ensure_signed_in(browser.get_page(), timeouts):
+            raise RuntimeError(f"Could not sign in to {url}")
+        if workday_auth.sign_ins != sign_ins:
+            # Loaded (and maybe scraped) signed out: load it again signed in
+            browser.goto(url, timeouts)
+            form_elements = None
+
+    if form_elements is None:
+        # Start solving the host's hCaptcha in the background while we fill
+        if captcha_handler and captcha_handler.broker:
+            captcha_handler.broker.prefetch(browser.get_page())
+
+        # Keep the rendered form page for offline re-scraping
+        if snapshot_store:
+            snapshot_store.save(url, name, browser.get_page().content())
+        
+        # Extract form elements
+        print("Scraping form elements...")
+        scraper = FormScraper(browser.get_page(), timeouts)
+        form_elements = scraper.scrape_form()
+
+    browser.mark_stage('loaded')
+
+    # Start loading the next posting while this one is filled
+    if pipeline:
+        pipeline.look_ahead(timeouts.budget)
+    
+    # Save form structure
+    output = {
+        "url": url,
+        "timestamp": datetime.now().isoformat(),
+        "elements": [elem.to_dict() for elem in form_elements]
+    }
+    
+    output_path = output_dir / f"{name}-form.json"
+    with open(output_path, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Found {len(form_elements)} elements")
+    if corpus:
+        corpus.record_form(url, form_elements)
+    
+    # Fill the form
+    print("\nFilling form fields...")
+    filler = FormFiller(browser.get_page(), timeouts=timeouts, corpus=corpus)
+    filler.fill_form(form_elements, captcha_handler=captcha_handler)
+
+    # Don't spend a submit (and maybe a captcha solve) on a form the ATS will reject
+    browser.mark_stage('filled')
+    report = filler.verify_and_repair(form_elements)
+    if not report.ready:
+        raise SubmissionError(f"Not submitted, required fields empty: {', '.join(report.missing_required)}")
+    
+    # Submit the form
+    print("\nSubmitting form...")
+    submitter = FormSubmitter(browser.get_page(), timeouts=timeouts,
+                              while_waiting=(lambda: pipeline.prepare_next(timeouts.budget)) if pipeline else None)
+    if submitter.submit_form(captcha_handler=captcha_handler):
+        browser.mark_stage('submitted')
+        print("Form submitted successfully")
+        print("Moving to next form...")
+        return True
+    raise SubmissionError(f"Submission {submitter.last_outcome}: {submitter.last_reason}")
+
+def print_memory_metrics(browser: BrowserService) -> None:
+    """One-line memory report for the worker"""
+    metrics = browser.memory_metrics()
+    rss = f"{metrics['rss_mb']:.0f}MB" if metrics['rss_mb'] is not None else "n/a"
+    heap = f"{metrics['js_heap_mb']:.1f}MB" if metrics['js_heap_mb'] is not None else "n/a"
+    print(f"[worker {metrics['worker']}] RSS {rss}, JS heap {heap}, "
+          f"{metrics['postings_in_context']} postings in context, {metrics['recycles']} recycles")
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Scrape, fill and submit job applications")
+    parser.add_argument('--mode', choices=PIPELINE_MODES, default='live',
+                        help="live: hit the ATS; record: also save a HAR per posting; "
+                             "replay: run offline from saved HARs")
+    parser.add_argument('--har-dir', default=REPLAY['har_dir'],
+                        help="Directory holding the per-posting HAR archives")
+    parser.add_argument('--headless', action='store_true', help="Run the browser headless")
+    parser.add_argument('--engine', choices=ENGINES + ('auto',), default=BROWSER_ENGINES['default'],
+                        help="Browser engine; auto routes each ATS host to the engine "
+                             "engine_benchmark.py found fastest")
+    parser.add_argument('--slow-mo', type=int, default=None,
+                        help="Delay between browser actions in ms (default 1000, 0 in replay)")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOTS['dir'],
+                        help="Where rendered form pages are stored for offline re-scraping")
+    parser.add_argument('--no-snapshots', action='store_true',
+                        help="Don't store rendered form pages")
+    parser.add_argument('--no-captcha-prefetch', action='store_true',
+                        help="Only solve hCaptcha once a challenge is visible")
+    parser.add_argument('--question-db', default=QUESTION_CORPUS['db_path'],
+                        help="Question corpus for cross-posting counts and precomputed answers")
+    parser.add_argument('--no-question-corpus', action='store_true',
+                        help="Neither record scraped questions nor use precomputed answers")
+    parser.add_argument('--session-dir', default=WORKDAY_AUTH['session_dir'],
+                        help="Saved Workday sign-ins, one storage state per tenant")
+    parser.add_argument('--trace-dir', default=TRACING['dir'],
+                        help="Where Playwright traces of failed postings are kept")
+    parser.add_argument('--no-trace', action='store_true',
+                        help="Don't trace postings (no forensic capture on failure)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Load and scrape the next posting in a second tab while the "
+                             "current one is filled and submitted (live mode)")
+    parser.add_argument('--captcha-diagnostics', choices=DIAGNOSTIC_LEVELS,
+                        default=CAPTCHA_DIAGNOSTICS['level'],
+                        help="Log hCaptcha widget state for every detection, a sample of them, or none")
+    parser.add_argument('--diagnostics-sample-rate', type=float, default=CAPTCHA_DIAGNOSTICS['sample_rate'],
+                        help="Share of detections captured with --captcha-diagnostics sampled")
+    parser.add_argument('--posting-budget', type=float, default=POSTING_BUDGET['seconds'],
+                        help="Seconds a posting may take in total before it is abandoned (0: no limit)")
+    parser.add_argument('--round-trips', action='store_true',
+                        help="Count and time every Playwright call per posting and report the top call sites")
+    parser.add_argument('--round-trip-budget', type=int, default=ROUND_TRIPS['budget'],
+                        help="Flag postings making more Playwright calls than this (0: no budget)")
+    parser.add_argument('--discover', action='store_true',
+                        help="Also queue the open postings of --companies found through Lever's postings API")
+    parser.add_argument('--companies', nargs='+', default=LEVER_DISCOVERY['companies'],
+                        help="Lever company slugs searched with --discover (filtered by LEVER_DISCOVERY['rules'])")
+    parser.add_argument('--lever-api-base', default=LEVER_DISCOVERY['api_base'],
+                        help="Postings API base URL used by --discover")
+    parser.add_argument('--standin', type=int, default=0, metavar='N',
+                        help="Discover and apply to the postings of a local Lever stand-in with N generated "
+                             "companies instead of URLS (implies --discover)")
+    parser.add_argument('--standin-port', type=int, default=LEVER_DISCOVERY['standin_port'],
+                        help="Port of the stand-in started by --standin")
+    return parser.parse_args()
 
 def main():
     """Main entry point for the scraper"""
+    args = parse_args()
+    replay = args.mode == 'replay'
+    slow_mo = args.slow_mo if args.slow_mo is not None else (0 if replay else 1000)
+    standin = None
+
     try:
-        # Initialize captcha handler
-        captcha_handler = TwoCaptchaHandler(CAPTCHA_API_KEY)
+        # Initialize captcha handler; replays never talk to 2captcha
+        captcha_handler = None if replay else TwoCaptchaHandler(CAPTCHA_API_KEY)
+        if captcha_handler and not args.no_captcha_prefetch:
+            captcha_handler.broker = CaptchaTokenBroker(captcha_handler)
+        if captcha_handler:
+            captcha_handler.diagnostics = CaptchaDiagnostics(args.captcha_diagnostics,
+                                                             args.diagnostics_sample_rate)
+            captcha_handler.triggers = CaptchaTriggerStore.load()
+
+        # Per-host rate limits, retries and circuit breaking. Replays are
+        # local, deterministic runs: no rate limit and a single attempt.
+        if replay:
+            scheduler = HostScheduler(rate_per_minute=float('inf'), max_attempts=1)
+        else:
+            scheduler = HostScheduler()
+        output_dir = Path("output")
+        # Posting costs learned from earlier runs order the queue (replays keep URLS order)
+        cost_model = None if replay else PostingCostModel.load()
+        postings = list(URLS)
+        # Discovery needs the network, so recorded runs keep to URLS
+        if (args.discover or args.standin) and not replay:
+            companies, api_base = args.companies, args.lever_api_base
+            cache = LEVER_DISCOVERY['cache_path']
+            if args.standin:
+                # Stays up until the run ends: the apply URLs point at it
+                from standins.lever_standin import LeverStandin
+                standin = LeverStandin(companies=args.standin, port=args.standin_port).start()
+                companies, api_base, postings = standin.companies, standin.api_base, []
+                # Keep the stand-in's validators out of the real cache
+                cache = str(Path(cache).with_name('lever_postings_standin.json'))
+            discovery = LeverDiscovery(api_base=api_base, cache_path=cache)
+            try:
+                discovered = discovery.discover(companies)
+            finally:
+                discovery.close()
+            known = {url for url, _ in postings}
+            postings += [(p.apply_url, p.name) for p in discovered if p.apply_url not in known]
+            print(f"Discovered {len(discovered)} matching Lever postings "
+                  f"({discovery.stats['not_modified']} of {len(companies)} boards unchanged)")
+        for url, name in postings:
+            priority, deadline = posting_schedule(name)
+            cost = cost_model.estimate(host_of(url), schema_field_count(output_dir, name)) if cost_model else 0.0
+            scheduler.add(url, name, priority=priority, deadline=deadline, cost=cost)
+
+        # Per-host timeouts learned from earlier runs (replay timings would skew them)
+        latency_tracker = None if replay else LatencyTracker.load()
+        snapshot_store = None if replay or args.no_snapshots else SnapshotStore(args.snapshot_dir)
+        # Replays would count the same postings again
+        corpus = None if replay or args.no_question_corpus else QuestionCorpus(args.question_db)
+        # Saved Workday sign-ins; replays carry their own recorded cookies
+        session_cache = None if replay else SessionCache(args.session_dir)
+        workday_auth = WorkdayAuth(session_cache) if session_cache else None
         
-        with BrowserService(headless=False, slow_mo=1000) as browser:
-            output_dir = Path("output")
+        with BrowserService(headless=args.headless, slow_mo=slow_mo,
+                            mode=args.mode, har_dir=args.har_dir,
+                            session_cache=session_cache,
+                            trace_recorder=None if args.no_trace else TraceRecorder(args.trace_dir),
+                            round_trips=RoundTripProfiler(budget=args.round_trip_budget)
+                            if args.round_trips else None,
+                            engine=BROWSER_ENGINES['default'] if args.engine == 'auto' else args.engine,
+                            engine_routes=load_engine_routes() if args.engine == 'auto' else None) as browser:
             output_dir.mkdir(exist_ok=True)
             
-            for url, name in URLS:
+            def timeouts_for(host: str) -> HostTimeouts:
+                return latency_tracker.for_host(host) if latency_tracker else HostTimeouts()
+
+            # Pipelining keeps a second tab in the shared context, so live mode only
+            pipeline = None
+            if args.pipeline and args.mode == 'live':
+                pipeline = PostingPipeline(browser, scheduler, timeouts_for, snapshot_store, captcha_handler)
+            next_job = pipeline.next_job if pipeline else scheduler.next_job
+
+            while (job := next_job()) is not None:
+                # Every wait in the posting is bounded by what is left of its budget
+                timeouts = timeouts_for(job.host).with_budget(
+                    PostingBudget(args.posting_budget) if args.posting_budget else None)
+                failure = None
+                started = time.monotonic()
+                captchas = captcha_handler.encounters if captcha_handler else None
                 try:
-                    print(f"\nProcessing {name}...")
-                    print("Navigating to URL...")
-                    browser.goto(url)
-                    
-                    # Extract form elements
-                    print("Scraping form elements...")
-                    scraper = FormScraper(browser.get_page())
-                    form_elements = scraper.scrape_form()
-                    
-                    # Save form structure
-                    output = {
-                        "url": url,
-                        "timestamp": datetime.now().isoformat(),
-                        "elements": [elem.to_dict() for elem in form_elements]
-                    }
-                    
-                    output_path = output_dir / f"{name}-form.json"
-                    with open(output_path, "w") as f:
-                        json.dump(output, f, indent=2)
-                    print(f"Found {len(form_elements)} elements")
-                    
-                    # Fill the form
-                    print("\nFilling form fields...")
-                    filler = FormFiller(browser.get_page())
-                    filler.fill_form(form_elements, captcha_handler=captcha_handler)
-                    
-                    # Submit the form
-                    print("\nSubmitting form...")
-                    submitter = FormSubmitter(browser.get_page())
-                    if submitter.submit_form(captcha_handler=captcha_handler):
-                        print("Form submitted successfully")
-                        print("\nWaiting for submission to complete...")
-                        browser.get_page().wait_for_timeout(TIMEOUTS['navigation'])
-                        print("Moving to next form...")
-                    
+                    browser.start_posting(job.name, url=job.url)
+                    if browser.trace_recorder:
+                        browser.trace_recorder.begin(job.name)
+                    if browser.round_trips:
+                        browser.round_trips.begin(job.name)
+                    process_posting(browser, job.url, job.name, captcha_handler, output_dir, timeouts,
+                                    snapshot_store, pipeline, job, corpus, workday_auth)
+                    scheduler.report_success(job)
+                    if cost_model:
+                        cost_model.record(job.host, time.monotonic() - started,
+                                          schema_field_count(output_dir, job.name),
+                                          captcha_handler.encounters > captchas if captcha_handler else None)
                 except Exception as e:
-                    print(f"Error processing {name}: {e}")
-                    browser.get_page().wait_for_timeout(TIMEOUTS['navigation'])  # 1 minute wait
+                    print(f"Error processing {job.name}: {e}")
+                    failure = e
+                    browser.mark_stage('failed')
+                    scheduler.report_failure(job, e)
+                finally:
+                    if browser.trace_recorder:
+                        browser.trace_recorder.end(failed=failure is not None, error=failure)
+                    if browser.round_trips:
+                        browser.round_trips.end()
+                    if latency_tracker:
+                        latency_tracker.save()
+                    if cost_model:
+                        cost_model.save()
+                    print_memory_metrics(browser)
+
+            stats = scheduler.stats
+            print(f"\nDone: {len(stats.succeeded)} succeeded, {len(stats.failed)} failed, "
+                  f"{stats.retries} retries")
+            if workday_auth and workday_auth.sign_ins:
+                print(f"Workday: {workday_auth.sign_ins} sign-ins")
+            if browser.trace_recorder and browser.trace_recorder.saved:
+                print(f"Failure traces: {browser.trace_recorder.saved} saved to {args.trace_dir}")
+            if browser.round_trips and browser.round_trips.over_budget:
+                print(f"Round trips: {browser.round_trips.over_budget} postings over the budget "
+                      f"of {browser.round_trips.budget} calls")
+            if pipeline:
+                print(f"Pipelining: {pipeline.handovers} postings handed over ready to fill")
+            if corpus:
+                corpus.close()
+            if captcha_handler and captcha_handler.broker:
+                print(captcha_handler.broker.summary())
+                captcha_handler.broker.close()
 
     except Exception as e:
         print(f"Error: {e}")
         raise
+    finally:
+        if standin:
+            standin.stop()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
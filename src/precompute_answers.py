@@ -0,0 +1,67 @@
+import argparse
+import glob
+import json
+from services.form_filler import FormFiller
+from services.question_corpus import QuestionCorpus
+from models.form import FormElement
+from utils.constants import QUESTION_CORPUS
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Index scraped questions and precompute answers for the top ones")
+    parser.add_argument('--db', default=QUESTION_CORPUS['db_path'], help="Question corpus database")
+    parser.add_argument('--ingest', nargs='*', default=[],
+                        help="Scraped form JSON files to add first (globs allowed), "
+                             "e.g. 'output/*-form.json'")
+    parser.add_argument('--top', type=int, default=QUESTION_CORPUS['top_questions'],
+                        help="How many of the most frequent questions to answer")
+    parser.add_argument('--ats', default=None, help="Only questions seen on this ATS (lever, workday, ...)")
+    parser.add_argument('--resume-data', default="src/data/resume_data.json")
+    parser.add_argument('--search', default=None, help="Print stored questions matching these words and exit")
+    return parser.parse_args()
+
+def ingest(corpus: QuestionCorpus, patterns) -> int:
+    """Add the questions of already scraped forms to the corpus"""
+    files = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    for path in files:
+        with open(path) as f:
+            scraped = json.load(f)
+        elements = [FormElement(**elem) for elem in scraped.get("elements", [])]
+        corpus.record_form(scraped["url"], elements)
+    return len(files)
+
+def main():
+    """Precompute answers for the most common questions before a run"""
+    args = parse_args()
+    corpus = QuestionCorpus(args.db)
+    try:
+        if args.search:
+            for label, type_, seen in corpus.search(args.search):
+                print(f"{seen:5d}  {type_:12s}  {label}")
+            return
+
+        if args.ingest:
+            print(f"Ingested {ingest(corpus, args.ingest)} scraped forms")
+
+        # No page needed: answers come from the resume data and the answer bank
+        filler = FormFiller(None, resume_data_path=args.resume_data, corpus=corpus)
+        questions = corpus.top_questions(args.top, args.ats)
+        answered = skipped = 0
+        for elem in questions:
+            if not filler.is_cacheable(elem):
+                skipped += 1
+                continue
+            value = filler.answer_for(elem)
+            corpus.cache_answer(elem, filler.resume_digest, value)
+            answered += value is not None
+
+        stats = corpus.stats()
+        print(f"Cached answers for {len(questions) - skipped} of the top {len(questions)} questions "
+              f"({answered} with data, {skipped} posting-specific left to fill time)")
+        print(f"Corpus: {stats['questions']} questions, {stats['sightings']} ATS/employer sightings, "
+              f"{stats['answers']} cached answers")
+    finally:
+        corpus.close()
+
+if __name__ == "__main__":
+    main()
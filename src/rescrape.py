@@ -0,0 +1,91 @@
+import argparse
+import json
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from services.browser import BrowserService
+from services.form_scraper import FormScraper
+from services.snapshot_store import SnapshotStore, SnapshotEntry
+from utils.constants import SNAPSHOTS
+
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Re-run the form scraper over stored DOM snapshots")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOTS['dir'],
+                        help="Snapshot store written by main.py")
+    parser.add_argument('--output-dir', default='output/rescrape',
+                        help="Where the re-scraped form JSON files are written")
+    parser.add_argument('--workers', type=int, default=SNAPSHOTS['workers'],
+                        help="Parallel headless browsers")
+    parser.add_argument('--all', action='store_true',
+                        help="Re-scrape every stored visit, not just the latest per URL")
+    return parser.parse_args()
+
+def rescrape_worker(store: SnapshotStore, jobs: "queue.Queue[SnapshotEntry]",
+                    output_dir: Path, results: dict, lock: threading.Lock) -> None:
+    """Scrape snapshots from the queue in one offline browser"""
+    # Each thread drives its own Playwright instance
+    with BrowserService(headless=True, slow_mo=0, mode='snapshot') as browser:
+        while True:
+            try:
+                entry = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                browser.load_snapshot(store.load(entry.digest))
+                form_elements = FormScraper(browser.get_page()).scrape_form()
+
+                output = {
+                    "url": entry.url,
+                    "timestamp": datetime.now().isoformat(),
+                    "snapshot": entry.digest,
+                    "snapshot_timestamp": entry.timestamp,
+                    "elements": [elem.to_dict() for elem in form_elements]
+                }
+                with open(output_dir / f"{entry.name}-{entry.digest[:12]}-form.json", "w") as f:
+                    json.dump(output, f, indent=2)
+                with lock:
+                    results['scraped'] += 1
+                    results['elements'] += len(form_elements)
+            except Exception as e:
+                print(f"Error re-scraping {entry.name} ({entry.digest[:12]}): {e}")
+                with lock:
+                    results['failed'].append(entry.digest)
+
+def main():
+    """Re-scrape stored snapshots in parallel without network access"""
+    args = parse_args()
+    store = SnapshotStore(args.snapshot_dir)
+    entries: List[SnapshotEntry] = list(store.entries()) if args.all else store.latest()
+    if not entries:
+        print(f"No snapshots found in {args.snapshot_dir}")
+        return
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs: "queue.Queue[SnapshotEntry]" = queue.Queue()
+    for entry in entries:
+        jobs.put(entry)
+
+    results = {'scraped': 0, 'elements': 0, 'failed': []}
+    lock = threading.Lock()
+    started = datetime.now()
+    workers = [
+        threading.Thread(target=rescrape_worker, args=(store, jobs, output_dir, results, lock))
+        for _ in range(max(1, min(args.workers, len(entries))))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"\nRe-scraped {results['scraped']}/{len(entries)} snapshots "
+          f"({results['elements']} elements) in {elapsed:.1f}s, "
+          f"{len(results['failed'])} failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.constants import MATCHING
+
+
+@dataclass
+class AnswerMatch:
+    key: str
+    phrase: str
+    score: float
+    path: Optional[List[str]] = None
+    value: Any = None
+
+
+class AnswerMatcher:
+    """Fuzzy matcher that scores form labels against a curated answer bank.
+
+    Labels and bank phrases are turned into TF-IDF vectors over character
+    n-grams (plus whole words), so "Current employer" still lands on the
+    company entry even though no mapping key appears in the label.
+    """
+
+    def __init__(self, answer_bank: List[dict],
+                 threshold: float = MATCHING['threshold'],
+                 ngram_size: int = MATCHING['ngram_size']):
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.entries = [entry for entry in answer_bank if entry.get("phrases")]
+
+        # Flatten phrases, keeping entries contiguous so scores can be
+        # reduced per entry with a single reduceat
+        self._phrases: List[str] = []
+        self._phrase_entry: List[int] = []
+        self._entry_offsets: List[int] = []
+        for idx, entry in enumerate(self.entries):
+            self._entry_offsets.append(len(self._phrases))
+            for phrase in entry["phrases"]:
+                self._phrases.append(phrase)
+                self._phrase_entry.append(idx)
+
+        self._build_index()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "AnswerMatcher":
+        """Load the answer bank from a JSON file"""
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def _features(self, text: str) -> Counter:
+        """Character n-grams (word-bounded) and word tokens for a string"""
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        features = Counter(f"w:{word}" for word in words)
+        n = self.ngram_size
+        for word in words:
+            padded = f" {word} "
+            if len(padded) <= n:
+                features[padded] += 1
+                continue
+            for i in range(len(padded) - n + 1):
+                features[padded[i:i + n]] += 1
+        return features
+
+    def _build_index(self) -> None:
+        """Build the sparse, L2-normalised TF-IDF matrix for the bank"""
+        phrase_features = [self._features(p) for p in self._phrases]
+
+        self._vocab: Dict[str, int] = {}
+        doc_freq: Counter = Counter()
+        for features in phrase_features:
+            doc_freq.update(features.keys())
+            for term in features:
+                self._vocab.setdefault(term, len(self._vocab))
+
+        n_docs = len(phrase_features)
+        self._idf = np.ones(len(self._vocab), dtype=np.float32)
+        for term, col in self._vocab.items():
+            self._idf[col] = math.log((1 + n_docs) / (1 + doc_freq[term])) + 1
+        # Weight used for label terms that never occur in the bank
+        self._unseen_idf = math.log(1 + n_docs) + 1
+
+        # Bank kept in COO form: (phrase row, vocab column, weight)
+        rows, cols, vals = [], [], []
+        for row, features in enumerate(phrase_features):
+            weights = {self._vocab[t]: (1 + math.log(tf)) * self._idf[self._vocab[t]]
+                       for t, tf in features.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for col, weight in weights.items():
+                rows.append(row)
+                cols.append(col)
+                vals.append(weight / norm)
+
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._cols = np.asarray(cols, dtype=np.int64)
+        self._vals = np.asarray(vals, dtype=np.float32)
+        self._offsets_arr = np.asarray(self._entry_offsets, dtype=np.int64)
+
+    def _vectorize(self, labels: List[str]) -> np.ndarray:
+        """Dense, L2-normalised TF-IDF rows for the given labels"""
+        matrix = np.zeros((len(labels), len(self._vocab)), dtype=np.float32)
+        for row, label in enumerate(labels):
+            unseen = 0.0
+            for term, tf in self._features(label).items():
+                col = self._vocab.get(term)
+                weight = 1 + math.log(tf)
+                if col is None:
+                    unseen += (weight * self._unseen_idf) ** 2
+                else:
+                    matrix[row, col] = weight * self._idf[col]
+            norm = math.sqrt(float(matrix[row] @ matrix[row]) + unseen)
+            if norm:
+                matrix[row] /= norm
+        return matrix
+
+    def _phrase_scores(self, labels: List[str]) -> np.ndarray:
+        """Cosine similarity of every label against every bank phrase"""
+        n_labels, n_phrases = len(labels), len(self._phrases)
+        queries = self._vectorize(labels)
+        # Sparse-dense product in one pass: every (label, bank nonzero)
+        # contribution is binned into its (label, phrase) cell
+        contributions = queries[:, self._cols] * self._vals
+        bins = (np.arange(n_labels)[:, None] * n_phrases + self._rows).ravel()
+        return np.bincount(
+            bins, weights=contributions.ravel(), minlength=n_labels * n_phrases
+        ).reshape(n_labels, n_phrases)
+
+    def score(self, labels: List[str]) -> np.ndarray:
+        """Best-phrase similarity of every label against every bank entry.
+
+        Returns an array of shape (len(labels), len(entries)).
+        """
+        if not labels or not self._phrases:
+            return np.zeros((len(labels), len(self.entries)), dtype=np.float32)
+        return np.maximum.reduceat(self._phrase_scores(labels), self._offsets_arr, axis=1)
+
+    def match_all(self, labels: List[str]) -> List[Optional[AnswerMatch]]:
+        """Best bank entry for each label, or None below the threshold"""
+        if not labels:
+            return []
+        if not self._phrases:
+            return [None] * len(labels)
+
+        phrase_scores = self._phrase_scores(labels)
+        best_phrase = phrase_scores.argmax(axis=1)
+        best_scores = phrase_scores[np.arange(len(labels)), best_phrase]
+
+        matches: List[Optional[AnswerMatch]] = []
+        for phrase_idx, score in zip(best_phrase, best_scores):
+            if score < self.threshold:
+                matches.append(None)
+                continue
+            entry = self.entries[self._phrase_entry[phrase_idx]]
+            matches.append(AnswerMatch(
+                key=entry["key"],
+                phrase=self._phrases[phrase_idx],
+                score=float(score),
+                path=entry.get("path"),
+                value=entry.get("value"),
+            ))
+        return matches
+
+    def match(self, label: str) -> Optional[AnswerMatch]:
+        """Best bank entry for a single label"""
+        return self.match_all([label])[0]
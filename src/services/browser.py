@@ -1,15 +1,82 @@
-from playwright.sync_api import sync_playwright, Page, Browser
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, Route
+import json
 import os
+import re
+import threading
 from pathlib import Path
-from utils.constants import TIMEOUTS
+from typing import Dict, Optional
+from services.latency_tracker import HostTimeouts
+from services import page_helpers
+from services.round_trips import RoundTripProfiler
+from services.session_cache import SessionCache
+from services.trace_recorder import TraceRecorder
+from services.scheduler import host_of
+from utils.constants import REPLAY, RECYCLING, BROWSER_ENGINES
+from utils.memory import child_pids, process_tree_rss_mb
+
+# Pipeline modes: 'live' hits the real ATS, 'record' additionally captures a
+# HAR per posting, 'replay' serves those HARs back without any network.
+PIPELINE_MODES = ('live', 'record', 'replay')
+# 'snapshot' loads stored DOM snapshots with scripts and network disabled.
+BROWSER_MODES = PIPELINE_MODES + ('snapshot',)
+
+ENGINES = ('chromium', 'firefox')
+
+def load_engine_routes(path: str = BROWSER_ENGINES['routes_path']) -> Dict[str, str]:
+    """Fastest engine per ATS host, as written by engine_benchmark.py --write-routes"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Serialises driver start-up so each service can tell which child process is its own
+_driver_start_lock = threading.Lock()
 
 class BrowserService:
-    def __init__(self, headless: bool = False, slow_mo: int = 1000):
+    def __init__(self, headless: bool = False, slow_mo: int = 1000,
+                 mode: str = 'live', har_dir: str = REPLAY['har_dir'],
+                 worker_id: int = 0,
+                 recycle_after: int = RECYCLING['max_postings'],
+                 recycle_rss_mb: float = RECYCLING['max_rss_mb'],
+                 session_cache: Optional[SessionCache] = None,
+                 trace_recorder: Optional[TraceRecorder] = None,
+                 round_trips: Optional[RoundTripProfiler] = None,
+                 engine: str = BROWSER_ENGINES['default'],
+                 engine_routes: Optional[Dict[str, str]] = None):
+        if mode not in BROWSER_MODES:
+            raise ValueError(f"Unknown browser mode: {mode}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown browser engine: {engine}")
         self.headless = headless
         self.slow_mo = slow_mo
+        self.mode = mode
+        self.har_dir = Path(har_dir)
         self.browser: Browser | None = None
+        # Engine used unless a route sends a host elsewhere; engines launch on first use
+        self.engine = engine
+        self.engine_routes = engine_routes or {}
+        self.browsers: Dict[str, Browser] = {}
+        self.context_engine: Optional[str] = None
+        self.context: BrowserContext | None = None
         self.page: Page | None = None
         self.playwright = None
+        # Second tab loading the next posting: (url, page)
+        self.preloaded: Optional[tuple[str, Page]] = None
+
+        # Context recycling and memory metrics
+        self.worker_id = worker_id
+        self.recycle_after = recycle_after
+        self.recycle_rss_mb = recycle_rss_mb
+        self.postings_in_context = 0
+        self.recycles = 0
+        self.driver_pid: Optional[int] = None
+        # Saved sign-ins injected into every new context
+        self.session_cache = session_cache
+        # Per-posting trace chunks, kept only for failed postings
+        self.trace_recorder = trace_recorder if mode != 'snapshot' else None
+        # Opt-in accounting of every Playwright call made through get_page()
+        self.round_trips = round_trips
         
         # Set Playwright cache directory to be inside venv
         venv_path = os.environ.get('VIRTUAL_ENV', os.path.join(os.path.dirname(__file__), '../../envs', 'jobAuto'))
@@ -17,47 +84,172 @@ class BrowserService:
         os.environ['PLAYWRIGHT_BROWSERS_PATH'] = self.cache_dir
 
     def __enter__(self):
-        self.playwright = sync_playwright().start()
+        with _driver_start_lock:
+            before = child_pids(os.getpid())
+            self.playwright = sync_playwright().start()
+            started = child_pids(os.getpid()) - before
+        # The driver owns the browser processes, so its tree is this worker's footprint
+        self.driver_pid = started.pop() if len(started) == 1 else None
         
-        # Works for firefox
-        # self.browser = self.playwright.firefox.launch(
-        #     headless=self.headless,
-        #     slow_mo=self.slow_mo,
-        #     args=['--start-maximized']  # Start browser maximized
-        # )
-        
-        # # Get system screen size
-        # context = self.browser.new_context(
-        #     viewport={'width': 1920, 'height': 1080}
-        # )
-
-        # Works for chromium
-        self.browser = self.playwright.chromium.launch(
-            headless=self.headless,
-            slow_mo=self.slow_mo,
-            args=[
-                '--start-maximized',
-                '--disable-infobars',
-                '--window-size=1920,1080'
-            ]
-        )
-
-        # Get system screen size
-        context = self.browser.new_context(
-            viewport=None,  # Required for Chromium maximized mode
-            no_viewport=True
-        )
-        
-        self.page = context.new_page()
+        self.browser = self._launch(self.engine)
+
+        if self.mode in ('live', 'snapshot'):
+            self._new_context()
         return self
 
+    def _launch(self, engine: str) -> Browser:
+        """The engine's browser, launched with its BROWSER_ENGINES settings on first use"""
+        if engine not in self.browsers:
+            settings = BROWSER_ENGINES[engine]
+            options = {
+                'headless': self.headless,
+                'slow_mo': self.slow_mo,
+                'args': settings['args'] + (settings['headless_args'] if self.headless else []),
+            }
+            if settings.get('firefox_user_prefs'):
+                options['firefox_user_prefs'] = settings['firefox_user_prefs']
+            self.browsers[engine] = getattr(self.playwright, engine).launch(**options)
+        return self.browsers[engine]
+
+    def engine_for(self, url: str) -> str:
+        """Engine to load a posting with: its host's route, else the default"""
+        return self.engine_routes.get(host_of(url), self.engine)
+
+    def _new_context(self, har_path: Optional[Path] = None, engine: Optional[str] = None) -> Page:
+        """Replace the current context (flushing any HAR) with a fresh one"""
+        if self.context:
+            self.context.close()
+            self.context, self.page = None, None
+            self.preloaded = None
+
+        engine = engine or self.context_engine or self.engine
+        self.browser = self._launch(engine)
+        self.context_engine = engine
+        options = dict(BROWSER_ENGINES[engine]['context'])
+        if self.mode == 'record' and har_path:
+            har_path.parent.mkdir(parents=True, exist_ok=True)
+            options['record_har_path'] = str(har_path)
+            options['record_har_mode'] = 'full'
+        if self.mode == 'snapshot':
+            # Snapshots are already-rendered DOM: don't re-run page scripts
+            options['java_script_enabled'] = False
+        if self.session_cache and self.mode != 'snapshot':
+            storage_state = self.session_cache.storage_state()
+            if storage_state:
+                options['storage_state'] = storage_state
+
+        self.context = self.browser.new_context(**options)
+        self.postings_in_context = 0
+        # Shared JS helpers, so services send helper names instead of sources
+        page_helpers.install(self.context)
+        if self.trace_recorder:
+            self.trace_recorder.attach(self.context)
+        if self.mode == 'replay' and har_path:
+            self._route_from_har(har_path)
+        if self.mode == 'snapshot':
+            self.context.route('**/*', lambda route: route.abort())
+
+        self.page = self.context.new_page()
+        return self.page
+
+    def _route_from_har(self, har_path: Path) -> None:
+        """Serve recorded responses, stubbing submit and captcha traffic"""
+        if not har_path.exists():
+            raise FileNotFoundError(f"No recording for this posting: {har_path}")
+        self.context.route_from_har(str(har_path), not_found='abort')
+
+        stub_pattern = re.compile('|'.join(REPLAY['stub_url_patterns']))
+
+        def stub(route: Route) -> None:
+            request = route.request
+            if request.method == 'POST' and request.resource_type == 'document':
+                # Form submit: answer with a confirmation page
+                route.fulfill(status=200, content_type='text/html',
+                              body=REPLAY['submit_stub_body'])
+            elif stub_pattern.search(request.url):
+                route.fulfill(status=200, body='')
+            else:
+                route.fallback()
+
+        # Registered after the HAR route, so it takes precedence
+        self.context.route('**/*', stub)
+
+    def har_path(self, name: str) -> Path:
+        """Location of the HAR archive for a posting"""
+        return self.har_dir / f"{name}.har.zip"
+
+    def start_posting(self, name: str, isolated: bool = False, url: Optional[str] = None) -> Page:
+        """Prepare the page for a posting.
+
+        Live mode reuses one page until the recycling policy asks for a
+        fresh context, or always starts a fresh one when isolated (nothing
+        carries over, e.g. between candidates). Record and replay modes open
+        a fresh context per posting, bound to that posting's HAR archive.
+        Given the posting's URL, the context is opened on its host's engine.
+        """
+        engine = self.engine_for(url) if url else None
+        if self.mode != 'live':
+            page = self._new_context(self.har_path(name), engine)
+        elif isolated or (engine and engine != self.context_engine):
+            page = self._new_context(engine=engine)
+        elif self._should_recycle():
+            self.recycles += 1
+            page = self._new_context()
+        else:
+            page = self.get_page()
+        self.postings_in_context += 1
+        return page
+
+    def mark_stage(self, stage: str) -> None:
+        """Stage boundary for the failure trace (no-op without tracing)"""
+        if self.trace_recorder and self.page:
+            self.trace_recorder.mark(self.page, stage)
+
+    def _should_recycle(self) -> bool:
+        """Recycle after N postings or once the worker's memory exceeds the limit"""
+        if self.recycle_after and self.postings_in_context >= self.recycle_after:
+            print(f"Recycling browser context after {self.postings_in_context} postings")
+            return True
+        rss = self.rss_mb()
+        if self.recycle_rss_mb and rss is not None and rss > self.recycle_rss_mb:
+            print(f"Recycling browser context at {rss:.0f}MB RSS")
+            return True
+        return False
+
+    def rss_mb(self) -> Optional[float]:
+        """Resident memory of this worker's driver and browser processes"""
+        if not self.driver_pid:
+            return None
+        return process_tree_rss_mb(self.driver_pid)
+
+    def memory_metrics(self) -> dict:
+        """Memory snapshot for this worker"""
+        js_heap_mb = None
+        try:
+            # Chromium only; other engines return null
+            used = self.get_page().evaluate('() => performance.memory ? performance.memory.usedJSHeapSize : null')
+            js_heap_mb = used / (1024 * 1024) if used else None
+        except Exception:
+            pass
+        return {
+            'worker': self.worker_id,
+            'rss_mb': self.rss_mb(),
+            'js_heap_mb': js_heap_mb,
+            'postings_in_context': self.postings_in_context,
+            'recycles': self.recycles,
+        }
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Ensure proper cleanup of browser resources"""
         try:
+            self.discard_preloaded()
             if self.page:
                 self.page.close()
-            if self.browser:
-                self.browser.close()
+            # Closing the context writes out a pending HAR recording
+            if self.context:
+                self.context.close()
+            for browser in self.browsers.values():
+                browser.close()
             if self.playwright:
                 self.playwright.stop()
         except Exception as e:
@@ -66,25 +258,93 @@ class BrowserService:
             if self.playwright:
                 self.playwright.stop()
 
-    def goto(self, url: str):
+    def goto(self, url: str, timeouts: Optional[HostTimeouts] = None):
         """Navigate to a URL and wait for form to be ready"""
-        self.page.goto(url)
-        
-        # Wait for form to be present and visible
-        self.page.wait_for_selector('form', 
-                                  timeout=TIMEOUTS['page_load'],
-                                  state='visible')
+        timeouts = timeouts or HostTimeouts()
+        page = self.get_page()
+
+        with timeouts.measure('page_load', include_failures=True):
+            page.goto(url, timeout=timeouts['page_load'])
+            
+            # Wait for form to be present and visible
+            page.wait_for_selector('form', 
+                                 timeout=timeouts['page_load'],
+                                 state='visible')
         
         # Wait for interactive elements to be ready
-        self.page.wait_for_selector('input, textarea, select', 
-                                  timeout=TIMEOUTS['element'],
-                                  state='visible')
+        with timeouts.measure('element'):
+            page.wait_for_selector('input, textarea, select', 
+                                 timeout=timeouts['element'],
+                                 state='visible')
         
         # Wait a bit for any dynamic content to load
-        self.page.wait_for_timeout(TIMEOUTS['interaction'])
+        page.wait_for_timeout(timeouts['interaction'])
+
+    def preload(self, url: str, timeouts: Optional[HostTimeouts] = None) -> Optional[Page]:
+        """Start loading a posting in a second tab and return without waiting for it.
+
+        Only live mode shares one context across postings; elsewhere this is a no-op.
+        """
+        if self.mode != 'live' or not self.context:
+            return None
+        timeouts = timeouts or HostTimeouts()
+        self.discard_preloaded()
+        page = self.context.new_page()
+        try:
+            # Returns once the response starts; the rest loads in the background
+            page.goto(url, wait_until='commit', timeout=timeouts['page_load'])
+        except Exception as e:
+            print(f"Preloading {url} failed: {e}")
+            page.close()
+            return None
+        self.preloaded = (url, page)
+        return page
+
+    def wait_for_form(self, page: Page, timeouts: Optional[HostTimeouts] = None) -> None:
+        """Wait for a preloaded page's form, without recording latencies.
+
+        Mostly returns at once; timing it would drag the adaptive timeouts down.
+        """
+        timeouts = timeouts or HostTimeouts()
+        page = self.instrumented(page)
+        page.wait_for_selector('form', timeout=timeouts['page_load'], state='visible')
+        page.wait_for_selector('input, textarea, select', timeout=timeouts['element'], state='visible')
+
+    def adopt_preloaded(self, url: str) -> bool:
+        """Make the preloaded tab the current page if it holds this URL"""
+        if not self.preloaded or self.preloaded[0] != url:
+            return False
+        _, page = self.preloaded
+        self.preloaded = None
+        if self.page:
+            self.page.close()
+        self.page = page
+        page.bring_to_front()
+        return True
+
+    def discard_preloaded(self) -> None:
+        """Close a preloaded tab that will not be used"""
+        if self.preloaded:
+            _, page = self.preloaded
+            self.preloaded = None
+            try:
+                page.close()
+            except Exception:
+                pass
+
+    def load_snapshot(self, html: str) -> Page:
+        """Load a stored DOM snapshot into the page without touching the network"""
+        if self.mode != 'snapshot':
+            raise RuntimeError("load_snapshot requires snapshot mode")
+        self.get_page().set_content(html, wait_until='domcontentloaded')
+        return self.page
+
+    def instrumented(self, page: Page) -> Page:
+        """The page as services should use it: wrapped for round-trip accounting when enabled"""
+        return self.round_trips.wrap(page) if self.round_trips else page
 
     def get_page(self) -> Page:
         """Get the current page object"""
         if not self.page:
             raise RuntimeError("Page not initialized")
-        return self.page 
\ No newline at end of file
+        return self.instrumented(self.page) 
\ No newline at end of file
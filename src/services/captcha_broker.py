@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from services.page_helpers import call
+from services.posting_budget import PostingBudget
+from services.scheduler import host_of
+from utils.constants import CAPTCHA_BROKER
+
+
+@dataclass
+class CachedToken:
+    token: str
+    solved_at: float
+    prefetched: bool
+
+
+@dataclass
+class BrokerStats:
+    solves: int = 0
+    prefetches: int = 0
+    cache_hits: int = 0
+    expired: int = 0
+    failures: int = 0
+    budget_refusals: int = 0
+    solve_seconds: list = field(default_factory=list)
+
+
+class CaptchaTokenBroker:
+    """Solves hCaptcha tokens ahead of time and hands them out on demand.
+
+    As soon as a posting page loads, a solve is started in the background
+    for the sitekey on the page (or the one last seen on that host), so the
+    20-120s solve overlaps form filling. Tokens wait in a TTL cache keyed by
+    (sitekey, page URL) until a challenge needs one; every solve counts
+    against a per-run budget.
+    """
+
+    def __init__(self, handler, ttl: float = CAPTCHA_BROKER['ttl'],
+                 max_solves: int = CAPTCHA_BROKER['max_solves'],
+                 workers: int = CAPTCHA_BROKER['workers'],
+                 sitekey_path: str = CAPTCHA_BROKER['sitekey_path']):
+        self.handler = handler
+        self.ttl = ttl
+        self.max_solves = max_solves
+        self.sitekey_path = Path(sitekey_path)
+        self.stats = BrokerStats()
+
+        self._tokens: Dict[Tuple[str, str], CachedToken] = {}
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._sitekeys: Dict[str, str] = self._load_sitekeys()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='captcha')
+
+    def _load_sitekeys(self) -> Dict[str, str]:
+        if not self.sitekey_path.exists():
+            return {}
+        try:
+            with open(self.sitekey_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load known sitekeys: {e}")
+            return {}
+
+    def _save_sitekeys(self) -> None:
+        self.sitekey_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.sitekey_path, 'w') as f:
+            json.dump(self._sitekeys, f, indent=2)
+
+    def remember_sitekey(self, page_url: str, sitekey: str) -> None:
+        """Remember the sitekey a host uses, for prefetching on later visits"""
+        host = host_of(page_url)
+        with self._lock:
+            if self._sitekeys.get(host) == sitekey:
+                return
+            self._sitekeys[host] = sitekey
+            self._save_sitekeys()
+
+    def known_sitekey(self, page_url: str) -> Optional[str]:
+        return self._sitekeys.get(host_of(page_url))
+
+    def _fresh(self, cached: CachedToken) -> bool:
+        return time.monotonic() - cached.solved_at < self.ttl
+
+    def _submit(self, sitekey: str, page_url: str, prefetched: bool) -> Optional[Future]:
+        """Start a background solve unless one is cached, running or over budget"""
+        key = (sitekey, page_url)
+        cached = self._tokens.get(key)
+        if cached and self._fresh(cached):
+            return None
+        if key in self._in_flight:
+            return self._in_flight[key]
+        if self.stats.solves >= self.max_solves:
+            self.stats.budget_refusals += 1
+            print(f"Captcha budget of {self.max_solves} solves used up")
+            return None
+
+        self.stats.solves += 1
+        if prefetched:
+            self.stats.prefetches += 1
+        future = self._pool.submit(self._solve, sitekey, page_url, prefetched)
+        self._in_flight[key] = future
+        return future
+
+    def _solve(self, sitekey: str, page_url: str, prefetched: bool) -> Optional[str]:
+        started = time.monotonic()
+        token = None
+        try:
+            token = self.handler._get_solution_from_2captcha(sitekey, page_url)
+        except Exception as e:
+            print(f"Background captcha solve failed: {e}")
+        with self._lock:
+            self._in_flight.pop((sitekey, page_url), None)
+            self.stats.solve_seconds.append(time.monotonic() - started)
+            if token:
+                self._tokens[(sitekey, page_url)] = CachedToken(token, time.monotonic(), prefetched)
+            else:
+                self.stats.failures += 1
+        return token
+
+    def prefetch(self, page, sitekey: Optional[str] = None) -> bool:
+        """Start solving for a freshly loaded page if its sitekey is known"""
+        page_url = page.url
+        if not sitekey:
+            try:
+                sitekey = call(page, 'sitekey')
+            except Exception:
+                sitekey = None
+        sitekey = sitekey or self.known_sitekey(page_url)
+        if not sitekey:
+            return False
+        return self.prefetch_sitekey(sitekey, page_url)
+
+    def prefetch_sitekey(self, sitekey: str, page_url: str) -> bool:
+        """Start solving for a sitekey and page URL in the background"""
+        with self._lock:
+            if (sitekey, page_url) in self._in_flight:
+                return True
+            future = self._submit(sitekey, page_url, prefetched=True)
+        if future:
+            print(f"Prefetching hCaptcha token for sitekey {sitekey}")
+        return future is not None
+
+    def take(self, sitekey: str, page_url: str, budget: Optional[PostingBudget] = None) -> Optional[str]:
+        """Hand out a token for a challenge, waiting on an in-flight solve if needed.
+
+        The wait is bounded by the posting's budget, or without one by the
+        solver's own polling limit; the solve itself keeps running and its
+        token is cached for a later attempt.
+        """
+        self.remember_sitekey(page_url, sitekey)
+        key = (sitekey, page_url)
+        with self._lock:
+            cached = self._tokens.pop(key, None)
+            if cached and self._fresh(cached):
+                self.stats.cache_hits += 1
+                print(f"Using {'prefetched' if cached.prefetched else 'cached'} hCaptcha token")
+                return cached.token
+            if cached:
+                self.stats.expired += 1
+            future = self._submit(sitekey, page_url, prefetched=False)
+
+        if not future:
+            return None
+        print("Waiting for hCaptcha token...")
+        try:
+            future.result(timeout=budget.remaining_seconds() if budget else self._solve_limit())
+        except FuturesTimeout:
+            if budget:
+                budget.check('captcha solve')
+            print("No hCaptcha token within the wait limit")
+            return None
+        with self._lock:
+            cached = self._tokens.pop(key, None)
+        return cached.token if cached else None
+
+    def _solve_limit(self) -> float:
+        """Wait limit without a budget: the solver's polling window plus one request"""
+        handler = self.handler
+        return handler.max_polls * handler.poll_interval + handler.request_timeout
+
+    def summary(self) -> str:
+        """Budget and cache accounting for the run"""
+        stats = self.stats
+        avg = sum(stats.solve_seconds) / len(stats.solve_seconds) if stats.solve_seconds else 0
+        unused = len(self._tokens)
+        return (f"Captcha: {stats.solves}/{self.max_solves} solves "
+                f"({stats.prefetches} prefetched), {stats.cache_hits} served from cache, "
+                f"{stats.expired} expired, {unused} unused, {stats.failures} failed, "
+                f"avg solve {avg:.1f}s")
+
+    def close(self) -> None:
+        """Stop background solves"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,80 @@
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import Page
+from services.page_helpers import call
+from utils.constants import CAPTCHA_DIAGNOSTICS
+
+DIAGNOSTIC_LEVELS = ('off', 'sampled', 'all')
+
+
+class CaptchaDiagnostics:
+    """Captures hCaptcha widget state at interesting moments.
+
+    Off by default. When enabled, each event costs one evaluate in the page
+    (plus one in the challenge frame, if given) and is appended as a JSON
+    line to the diagnostics log. In 'sampled' mode only a share of events
+    is captured; the sampling decision is made before touching the page.
+    """
+
+    def __init__(self, level: str = CAPTCHA_DIAGNOSTICS['level'],
+                 sample_rate: float = CAPTCHA_DIAGNOSTICS['sample_rate'],
+                 log_path: str = CAPTCHA_DIAGNOSTICS['log_path']):
+        if level not in DIAGNOSTIC_LEVELS:
+            raise ValueError(f"Unknown diagnostics level {level!r}, expected one of {DIAGNOSTIC_LEVELS}")
+        self.level = level
+        self.sample_rate = sample_rate
+        self.log_path = Path(log_path)
+        self.captured = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != 'off'
+
+    def should_capture(self) -> bool:
+        if self.level == 'all':
+            return True
+        return self.level == 'sampled' and random.random() < self.sample_rate
+
+    def capture(self, page: Page, event: str, frame_url: Optional[str] = None, **fields) -> Optional[dict]:
+        """Record the captcha state for an event, if enabled and sampled"""
+        if not self.should_capture():
+            return None
+
+        started = time.monotonic()
+        record = {'time': time.time(), 'event': event, 'url': page.url, **fields}
+        try:
+            record['state'] = call(page, 'captchaState')
+            if frame_url:
+                frame = page.frame(url=frame_url)
+                record['challenge_frame'] = call(frame, 'challengeFrameState') if frame else None
+        except Exception as e:
+            record['error'] = str(e)
+        record['capture_ms'] = round((time.monotonic() - started) * 1000, 1)
+
+        self._write(record)
+        self._print_summary(record)
+        return record
+
+    def _write(self, record: dict) -> None:
+        with self._lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            self.captured += 1
+
+    def _print_summary(self, record: dict) -> None:
+        if 'error' in record:
+            print(f"Captcha diagnostics [{record['event']}] failed: {record['error']}")
+            return
+        state = record['state']
+        visible = sum(1 for iframe in state['iframes']
+                      if iframe['enclave'] and iframe['style']['visibility'] == 'visible')
+        answered = any(response['hasValue'] for response in state['responses'])
+        print(f"Captcha diagnostics [{record['event']}]: {len(state['iframes'])} iframes "
+              f"({visible} visible challenges), response {'set' if answered else 'empty'} "
+              f"-> {self.log_path}")
@@ -0,0 +1,97 @@
+import json
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List
+from models.form import FormElement
+from services.question_corpus import normalize_question
+from utils.constants import CAPTCHA_TRIGGERS
+
+
+class CaptchaTriggerStore:
+    """Which fields bring up hCaptcha, learned per ATS host across runs.
+
+    While a host is being learned (its first few forms), the filler checks
+    for a challenge after every field and reports each check here. Once a
+    host has been learned, fields that triggered often enough are filled
+    last and only they are checked, so the challenge comes up once, at the
+    end, and is solved once right before submit. Every sample_every-th form
+    is still checked field by field, so fields that start triggering later
+    are picked up. The seed lists label words known to trigger on some
+    hosts (e.g. Lever's location text field).
+    """
+
+    def __init__(self, path: str = CAPTCHA_TRIGGERS['path'],
+                 learn_forms: int = CAPTCHA_TRIGGERS['learn_forms'],
+                 min_rate: float = CAPTCHA_TRIGGERS['min_rate'],
+                 sample_every: int = CAPTCHA_TRIGGERS['sample_every']):
+        self.path = Path(path)
+        self.learn_forms = learn_forms
+        self.sample_every = sample_every
+        self.min_rate = min_rate
+        # host -> {'forms': n, 'fields': {label: [checks, triggers]}}
+        self.hosts: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = CAPTCHA_TRIGGERS['path'], **kwargs) -> "CaptchaTriggerStore":
+        """Create a store seeded with the observations saved by earlier runs"""
+        store = cls(path, **kwargs)
+        if store.path.exists():
+            try:
+                with open(store.path) as f:
+                    store.hosts = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not load captcha trigger history: {e}")
+        return store
+
+    def save(self) -> None:
+        # Fanout workers finish forms concurrently: write under the lock
+        # through a temp file of this call's own
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False) as f:
+                json.dump(self.hosts, f)
+            Path(f.name).replace(self.path)
+
+    def _host(self, host: str) -> dict:
+        return self.hosts.setdefault(host, {'forms': 0, 'fields': {}})
+
+    def learning(self, host: str) -> bool:
+        """Whether the next form on this host is checked after every field"""
+        with self._lock:
+            forms = self.hosts.get(host, {}).get('forms', 0)
+        if forms < self.learn_forms:
+            return True
+        return self.sample_every > 0 and (forms - self.learn_forms) % self.sample_every == self.sample_every - 1
+
+    def is_trigger(self, host: str, elem: FormElement) -> bool:
+        label = normalize_question(elem.label or '')
+        # Whole words only: 'location' must not match 'relocation'
+        if elem.type_of_input in CAPTCHA_TRIGGERS['seed_types'] and any(
+                f" {word} " in f" {label} " for word in CAPTCHA_TRIGGERS['seed'].get(host, ())):
+            return True
+        with self._lock:
+            checks, triggers = self.hosts.get(host, {}).get('fields', {}).get(label, (0, 0))
+        return triggers > 0 and triggers / checks >= self.min_rate
+
+    def order(self, host: str, elements: List[FormElement]) -> List[FormElement]:
+        """Fill order with trigger fields moved to the end (otherwise unchanged)"""
+        return sorted(elements, key=lambda elem: self.is_trigger(host, elem))
+
+    def record(self, host: str, elem: FormElement, triggered: bool) -> None:
+        """A check for a challenge right after filling a field"""
+        with self._lock:
+            counts = self._host(host)['fields'].setdefault(normalize_question(elem.label or ''), [0, 0])
+            counts[0] += 1
+            counts[1] += triggered
+
+    def finish_form(self, host: str) -> None:
+        """A form on the host has been filled"""
+        with self._lock:
+            self._host(host)['forms'] += 1
+        # The form itself was filled fine; a lost history update only costs learning
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save captcha trigger history: {e}")
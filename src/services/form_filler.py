@@ -3,16 +3,54 @@ import re
 from typing import Dict, Any, List, Union, Optional
 from playwright.sync_api import Page, ElementHandle
 from models.form import FormElement
-from utils.constants import TIMEOUTS
 from services.twocaptcha_handler import TwoCaptchaHandler
+from services.answer_matcher import AnswerMatcher, AnswerMatch
+from services.option_resolver import OptionResolver
+from services.text_input import TextInput
+from services.question_corpus import QuestionCorpus, resume_digest
+from services.form_verifier import FormVerifier, VerificationReport
+from services.scheduler import host_of
+from services.page_helpers import call
+from utils.constants import VERIFICATION
+from services.latency_tracker import HostTimeouts
+from services.posting_budget import BudgetExceeded
+from utils.memory import dispose
+
+def _is_upload(response) -> bool:
+    """A response to the request that sends a chosen file to the ATS"""
+    request = response.request
+    return request.method in ('POST', 'PUT') and request.resource_type in ('xhr', 'fetch')
+
 
 class FormFiller:
     """Service for mapping form fields to resume data and filling forms"""
     
-    def __init__(self, page: Page, resume_data_path: str = "src/data/resume_data.json"):
+    def __init__(self, page: Page, resume_data_path: str = "src/data/resume_data.json",
+                 answer_bank_path: str = "src/data/answer_bank.json",
+                 timeouts: Optional[HostTimeouts] = None,
+                 corpus: Optional[QuestionCorpus] = None,
+                 answer_matcher: Optional[AnswerMatcher] = None):
         self.page = page
+        self.timeouts = timeouts or HostTimeouts()
         with open(resume_data_path) as f:
             self.resume_data = json.load(f)
+        # Precomputed answers for recurring questions, tied to this resume version
+        self.corpus = corpus
+        self.resume_digest = resume_digest(self.resume_data)
+
+        # Fuzzy fallback for labels that no mapping key appears in (shareable
+        # across fillers, the bank index doesn't depend on the resume)
+        self.answer_matcher = answer_matcher or AnswerMatcher.from_file(answer_bank_path)
+        self._bank_matches: Dict[str, Optional[AnswerMatch]] = {}
+        self.option_resolver = OptionResolver(page)
+        self.text_input = TextInput(page)
+        self.verifier = FormVerifier(page)
+        # Value attempted per field id, checked by verify_and_repair
+        self.fill_plan: Dict[str, Any] = {}
+        # Posting URL for company-specific answers when planning without a page
+        self.posting_url: Optional[str] = None
+        # Whether a challenge came up while filling
+        self.captcha_seen = False
             
         # Common field mappings
         self.field_mappings = {
@@ -44,148 +82,154 @@ class FormFiller:
             "work on-site": ["application_responses", "location_preferences", "willing_to_relocate"]
         }
     
-    def fill_form(self, form_elements: List[FormElement], captcha_handler: Optional[TwoCaptchaHandler] = None) -> None:
-        """Fill form fields with resume data"""
+    def plan(self, form_elements: List[FormElement], posting_url: Optional[str] = None,
+             bank_matches: Optional[Dict[str, Optional[AnswerMatch]]] = None) -> Dict[str, Any]:
+        """Value to fill per field id (None where there is no data); no page needed"""
+        if posting_url:
+            self.posting_url = posting_url
+
+        # Recurring questions are answered from the corpus; score the rest
+        # against the answer bank in one pass (unless scored for us already)
+        cached = self._cached_answers(form_elements)
+        self._bank_matches = dict(bank_matches or {})
+        labels = [elem.label for elem in form_elements
+                  if elem.label and id(elem) not in cached and elem.label not in self._bank_matches]
+        self._bank_matches.update(zip(labels, self.answer_matcher.match_all(labels)))
+
+        plan = {}
+        for elem in form_elements:
+            if not elem.label or not elem.id_of_input_component:
+                continue
+            plan[elem.id_of_input_component] = (
+                cached[id(elem)] if id(elem) in cached else self._find_matching_data(elem))
+        return plan
+
+    def fill_form(self, form_elements: List[FormElement], captcha_handler: Optional[TwoCaptchaHandler] = None,
+                  plan: Optional[Dict[str, Any]] = None) -> None:
+        """Fill form fields with resume data, or with a plan computed beforehand"""
         unfilled_fields = []
+        if plan is None:
+            plan = self.plan(form_elements)
+
+        # Trigger fields go last, so any challenge comes up once, just before submit.
+        # While a host is being learned, and on every sample_every-th form after,
+        # every field is checked.
+        host = host_of(self.posting_url or self.page.url)
+        triggers = captcha_handler.triggers if captcha_handler else None
+        learning = bool(triggers) and triggers.learning(host)
+        if triggers:
+            form_elements = triggers.order(host, form_elements)
+        self.captcha_seen = False
         
         for elem in form_elements:
+            self.timeouts.check('filling')
             print(f"Processing field: {elem.label} ({elem.type_of_input})")
 
             # Skip if no label
             if not elem.label:
                 print(f"Skipping field: no label")
                 continue
+            if not elem.id_of_input_component:
+                print(f"No field ID for: {elem.label}")
+                unfilled_fields.append(elem.label)
+                continue
 
-            #Skip if current location field since it triggers a captcha
-            # if "location" in elem.label.lower() and elem.type_of_input in ["text", "textarea"]:
-            #     print(f"Skipping location text field: {elem.label}")
-            #     continue
-                
-            value = self._find_matching_data(elem)
+
+            value = plan.get(elem.id_of_input_component)
             if not value:
                 print(f"No matching data found for: {elem.label}")
                 unfilled_fields.append(elem.label)
                 continue
+            self.fill_plan[elem.id_of_input_component] = value
                 
             try:
-                # If this is the location field, print captcha state before filling
-                if "location" in elem.label.lower() and elem.type_of_input in ["text", "textarea"]:
-                    if captcha_handler:
-                        print("\nCapturing state before location field...")
-                        captcha_handler.print_captcha_state(self.page, "Before location field")
+                is_trigger = bool(triggers) and triggers.is_trigger(host, elem)
+                if captcha_handler and is_trigger:
+                    captcha_handler.diagnostics.capture(self.page, "before_trigger", field=elem.label)
                 
                 self._fill_field(elem, value)
                 print(f"Filled {elem.label} with: {value}")
                 # Add delay after filling each field
-                self.page.wait_for_timeout(TIMEOUTS['interaction'])
+                self.page.wait_for_timeout(self.timeouts['interaction'])
                 
-                # Check for captcha after field interaction
-                if captcha_handler:
-                    print("\nChecking for hCaptcha after field fill...")
+                # Check for captcha after field interaction; solving happens at submit.
+                # Once one is up there is nothing more to learn from this form.
+                if captcha_handler and not self.captcha_seen and (learning or is_trigger or not triggers):
                     hcaptcha = TwoCaptchaHandler.detect_hcaptcha(self.page)
+                    if triggers:
+                        triggers.record(host, elem, hcaptcha["found"])
                     if hcaptcha["found"]:
-                        print("hCaptcha detected, attempting to solve...")
-                        print("\nCapturing state when captcha becomes active...")
-                        captcha_handler.print_captcha_state(self.page, "Captcha active")
-                        
-                        # Uncomment and use automatic solution
-                        # import pdb; pdb.set_trace()
-                        # if captcha_handler.solve_hcaptcha(self.page, hcaptcha):
-                        #     print("hCaptcha solved successfully")
-                        #     # Add extra delay after solving captcha
-                        #     self.page.wait_for_timeout(TIMEOUTS['interaction'])
-                        #     print("\nCapturing state after captcha solved...")
-                        #     captcha_handler.print_captcha_state(self.page, "After captcha solved")
-                        # else:
-                            # print("Failed to solve hCaptcha")
-                        
-                        # Comment out manual solution
-                        # """
-                        # print("\nPlease solve the captcha manually...")
-                        # print("After solving, press Enter to capture the state...")
-                        # input()
-                        # ... rest of manual monitoring code ...
-                        # """                        
-                        # 1. Get the visible enclave iframe we already detected
-                        print("\nInvisible Checkbox Iframe:")
-                        try:
-                            # Get the frame using the URL from detect_hcaptcha
-                            frame = self.page.frame(url=hcaptcha['src'])
-                            if frame:
-                                # Look for checkbox-invisible inside this frame
-                                checkbox_info = frame.evaluate('''() => {
-                                    const iframe = document.querySelector('iframe[src*="checkbox-invisible"]');
-                                    if (!iframe) return null;
-                                    return {
-                                        src: iframe.src,
-                                        widgetId: iframe.getAttribute('data-hcaptcha-widget-id'),
-                                        response: iframe.getAttribute('data-hcaptcha-response'),
-                                        display: window.getComputedStyle(iframe).display,
-                                        visibility: window.getComputedStyle(iframe).visibility,
-                                        attributes: Object.entries(iframe.attributes).reduce((acc, [_, attr]) => {
-                                            acc[attr.name] = attr.value;
-                                            return acc;
-                                        }, {})
-                                    };
-                                }''')
-                                
-                                if checkbox_info:
-                                    print(f"  Source: {checkbox_info.get('src', 'Not found')}")
-                                    print(f"  Widget ID: {checkbox_info.get('widgetId', 'None')}")
-                                    print(f"  Response Present: {'Yes' if checkbox_info.get('response') else 'No'}")
-                                    if checkbox_info.get('response'):
-                                        print(f"  Response Value: {checkbox_info['response']}")
-                                    print(f"  Display: {checkbox_info.get('display', 'Not found')}")
-                                    print(f"  Visibility: {checkbox_info.get('visibility', 'Not found')}")
-                                    print(f"  All Attributes: {checkbox_info.get('attributes', {})}")
-                                else:
-                                    print("  No checkbox-invisible iframe found in frame")
-                            else:
-                                print("  Could not access detected frame")
-                        except Exception as e:
-                            print(f"  Error: {str(e)}")
-                            print("  Not found!")
-                        
-                        # 2. Check enclave iframes
-                        enclave_iframes = self.page.query_selector_all('iframe[src*="hcaptcha-enclave"]')
-                        for idx, iframe in enumerate(enclave_iframes, 1):
-                            print(f"\nEnclave Iframe {idx}:")
-                            print(f"  Source: {iframe.get_attribute('src')}")
-                            print(f"  Widget ID: {iframe.get_attribute('data-hcaptcha-widget-id')}")
-                            print(f"  Response Present: {'Yes' if iframe.get_attribute('data-hcaptcha-response') else 'No'}")
-                            print(f"  Display: {iframe.evaluate('node => window.getComputedStyle(node).display')}")
-                            print(f"  Visibility: {iframe.evaluate('node => window.getComputedStyle(node).visibility')}")
-                            print(f"  Parent: {iframe.evaluate('node => node.parentElement.tagName')}")
-                        
-                        # 3. Check response input field
-                        response_input = self.page.query_selector('textarea[name="h-captcha-response"]')
-                        if response_input:
-                            print("\nResponse Input Field:")
-                            value = response_input.evaluate('node => node.value')
-                            print(f"  Value Present: {'Yes' if value else 'No'}")
-                            if value:
-                                print(f"  Value: {value}")
-                            print(f"  Parent Element: {response_input.evaluate('node => node.parentElement.tagName')}")
-                            print(f"  Is Visible: {response_input.is_visible()}")
-                        
-                        print("\nVerifying form continuation...")
-                        # Check if form continues processing
-                        try:
-                            next_field = self.page.query_selector('input:focus, textarea:focus, select:focus')
-                            if next_field:
-                                print(f"Form is continuing - Found focused field: {next_field.get_attribute('name')}")
-                        except Exception as e:
-                            print("Could not verify form continuation")
+                        self.captcha_seen = True
+                        print(f"hCaptcha appeared after filling {elem.label}")
+                        captcha_handler.diagnostics.capture(self.page, "captcha_active", frame_url=hcaptcha['src'],
+                                                            field=elem.label)
             
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 print(f"Error filling {elem.label}: {e}")
                 unfilled_fields.append(elem.label)
         
+        if triggers and captcha_handler:
+            triggers.finish_form(host)
+
         if unfilled_fields:
             print("\nThe following fields need attention:")
             for field in unfilled_fields:
                 print(f"  - {field}")
     
+    def verify_and_repair(self, form_elements: List[FormElement],
+                          rounds: int = VERIFICATION['repair_rounds']) -> VerificationReport:
+        """Read the whole form back, refill only the fields that didn't take, and report"""
+        report = self.verifier.verify(form_elements, self.fill_plan)
+        for _ in range(rounds):
+            if not report.mismatched:
+                break
+            print(f"\nRefilling {len(report.mismatched)} fields that did not take: "
+                  f"{', '.join(elem.label for elem in report.mismatched)}")
+            for elem in report.mismatched:
+                try:
+                    self._fill_field(elem, self.fill_plan[elem.id_of_input_component])
+                except BudgetExceeded:
+                    raise
+                except Exception as e:
+                    print(f"Error refilling {elem.label}: {e}")
+            report = self.verifier.verify(form_elements, self.fill_plan)
+
+        for label, message in report.invalid.items():
+            print(f"Field rejected by the page: {label} ({message})")
+        if report.missing_required:
+            print("\nRequired fields still empty:")
+            for label in report.missing_required:
+                print(f"  - {label}")
+        return report
+
+    def _cached_answers(self, form_elements: List[FormElement]) -> Dict[int, Any]:
+        """Precomputed answers by element id, for the elements that have one"""
+        cached = {}
+        if not self.corpus:
+            return cached
+        for elem in form_elements:
+            if elem.label and self.is_cacheable(elem):
+                found, value = self.corpus.lookup(elem, self.resume_digest)
+                if found:
+                    cached[id(elem)] = value
+        if cached:
+            print(f"{len(cached)} of {len(form_elements)} fields answered from the question corpus")
+        return cached
+
+    def is_cacheable(self, elem: FormElement) -> bool:
+        """Whether the answer depends only on the question and the resume.
+
+        Company-specific questions also depend on the posting, so they are
+        always answered live.
+        """
+        return not self._is_company_question(set(elem.label.lower().split()))
+
+    def answer_for(self, elem: FormElement) -> Any:
+        """Resume data for a field, as filling would choose it"""
+        return self._find_matching_data(elem)
+
     def _find_matching_data(self, elem: FormElement) -> Any:
         """Find matching resume data for a form field"""
         label = elem.label.lower()
@@ -209,8 +253,23 @@ class FormFiller:
                 if isinstance(value, bool):
                     return "Yes" if value else "No"
                 return value
-                
-        return None
+
+        # Fall back to fuzzy matching against the answer bank
+        return self._get_bank_value(elem)
+
+    def _get_bank_value(self, elem: FormElement) -> Any:
+        """Get resume data for the answer bank entry closest to the label"""
+        if elem.label not in self._bank_matches:
+            self._bank_matches[elem.label] = self.answer_matcher.match(elem.label)
+        match = self._bank_matches[elem.label]
+        if not match:
+            return None
+
+        print(f"Answer bank match: {match.key} ('{match.phrase}', score {match.score:.2f})")
+        value = self._get_value_from_path(match.path) if match.path else match.value
+        if isinstance(value, bool):
+            return "Yes" if value else "No"
+        return value
         
     def _get_value_from_path(self, path: List[str]) -> Any:
         """Get value from resume data using path"""
@@ -262,7 +321,8 @@ class FormFiller:
         if any(w in words for w in {'why', 'interest', 'role', 'what'}):
             responses = self.resume_data["application_responses"]["why_company"]
             # Try to find company name in URL
-            match = re.search(r"jobs\.lever\.co/([^/]+)", self.page.url)
+            url = self.posting_url or (self.page.url if self.page else "")
+            match = re.search(r"jobs\.lever\.co/([^/]+)", url)
             if match:
                 company = match.group(1).lower()
                 response = responses.get(company)
@@ -285,7 +345,7 @@ class FormFiller:
             if field_type == "file":
                 self._fill_file_field(field_id, value)
             if field_type in ["text", "textarea"]:
-                self._fill_text_field(field_id, value)
+                self._fill_text_field(field_id, value, elem.label)
             elif field_type in ["dropdown", "multiselect"]:
                 self._fill_dropdown(field_id, value)
             elif field_type == "radio":
@@ -303,24 +363,16 @@ class FormFiller:
             # Get element's position
             box = element.bounding_box()
             if box:
-                self.page.evaluate("""
-                    (elementY) => {
-                        const currentY = window.scrollY;
-                        const offset = 150;  // Space from top
-                        
-                        window.scrollTo({
-                            top: elementY - offset,
-                            behavior: 'smooth'
-                        });
-                    }
-                """, box['y'])
+                call(self.page, 'scrollToY', box['y'])
                 
                 # Wait for scroll to complete
-                self.page.wait_for_timeout(TIMEOUTS['interaction'])
+                self.page.wait_for_timeout(self.timeouts['interaction'])
+        except BudgetExceeded:
+            raise
         except Exception as e:
             print(f"Scroll error: {e}")
 
-    def _fill_text_field(self, field_id: str, value: str) -> None:
+    def _fill_text_field(self, field_id: str, value: str, label: str = "") -> None:
         """Fill a text or textarea field"""
         selectors = [
             f"input[name='{field_id}']",
@@ -329,82 +381,79 @@ class FormFiller:
             f"[data-qa='{field_id}']"
         ]
         for selector in selectors:
+            element = None
             try:
-                element = self.page.wait_for_selector(selector, 
-                                                    timeout=TIMEOUTS['element'],
-                                                    state='visible')
+                with self.timeouts.measure('element'):
+                    element = self.page.wait_for_selector(selector, 
+                                                        timeout=self.timeouts['element'],
+                                                        state='visible')
                 if element:
                     # Smooth scroll to element
                     self._smooth_scroll_to_element(element)
-                    element.click()
-                    element.fill("")
-                    
-                    # # Type value with human-like delays
-                    # words = str(value).split()
-                    # for i, word in enumerate(words):
-                    #     # Type word as a chunk for speed
-                    #     element.type(word, delay=1)
-                    #     # Add space between words with shorter pause
+                    element.click(timeout=self.timeouts['element'])
 
-                    element.type(str(value))
-                    self.page.wait_for_timeout(TIMEOUTS['interaction'])
+                    # Bulk entry where possible; keystrokes only where the widget needs them
+                    verified, strategy = self.text_input.enter(element, str(value), label)
+                    if not verified:
+                        print(f"Value for {label or field_id} did not stick ({strategy})")
+                    self.page.wait_for_timeout(self.timeouts['interaction'])
                     break
+            except BudgetExceeded:
+                raise
             except Exception as e:
                 print(f"Failed with selector {selector}: {e}")
                 continue
+            finally:
+                dispose([element])
 
     def _fill_dropdown(self, field_id: str, value: Any) -> None:
         """Fill a dropdown or multiselect field"""
-        if isinstance(value, list):
-            value = value[0]  # Take first value for now
-        self.page.select_option(f"select[name='{field_id}']", value)
+        self._resolve_options(field_id, value)
 
     def _fill_radio(self, field_id: str, value: Any, options: Optional[List[str]]) -> None:
         """Fill a radio button field"""
-        selector = f"input[type='radio'][name='{field_id}'][value='{value}']"
-        radio = self.page.wait_for_selector(selector, 
-                                          timeout=TIMEOUTS['element'],
-                                          state='visible')
-        if radio:
-            radio.check()
-            self.page.wait_for_timeout(TIMEOUTS['interaction'])
+        self._resolve_options(field_id, value)
 
     def _fill_checkbox(self, field_id: str, value: Any, options: Optional[List[str]]) -> None:
         """Fill a checkbox field"""
         print(f"\nTrying to fill checkbox with field_id: {field_id}, value: {value}")
-        
         try:
-            # Find all checkboxes for this field with timeout
-            selector = f"input[type='checkbox'][name='{field_id}']"
-            self.page.wait_for_selector(selector, timeout=TIMEOUTS['element'])  # Wait for at least one to be present
-            checkboxes = self.page.query_selector_all(selector)
-            
-            # Convert value to lowercase for case-insensitive comparison
-            target_value = str(value).lower()
-            
-            # Find the matching checkbox
-            for checkbox in checkboxes:
-                checkbox_value = (checkbox.get_attribute('value') or '').lower()
-                if target_value in checkbox_value or checkbox_value in target_value:
-                    if not checkbox.is_checked():
-                        checkbox.check()
-                    return
-                    
-            print(f"No matching checkbox found for value: {value}")
-            
+            self._resolve_options(field_id, value)
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"Error finding/filling checkbox: {e}") 
+            print(f"Error finding/filling checkbox: {e}")
+
+    def _resolve_options(self, field_id: str, value: Any) -> None:
+        """Fetch, match and select a group's options in a single page call"""
+        result = self.option_resolver.resolve(field_id, value)
+        if result.get("selected"):
+            self.page.wait_for_timeout(self.timeouts['interaction'])
 
     def _fill_file_field(self, field_id: str, value: Any) -> None:
         """Handle file upload for resume"""
+        file_input = None
         try:
             # Use input[type="file"] selector
             file_input = self.page.wait_for_selector(
                 f'input[type="file"][name="{field_id}"]',
-                timeout=TIMEOUTS['element']
+                timeout=self.timeouts['element']
             )
             if file_input:
-                file_input.set_input_files(value)
-                self.page.wait_for_timeout(TIMEOUTS['resume_upload'])
+                # Wait for the upload request the file choice sends (e.g. Lever's
+                # parseResume), not a fixed pause: that is what has to finish
+                # before the form can be submitted
+                upload_timeout = self.timeouts['resume_upload']
+                try:
+                    with self.timeouts.measure('resume_upload', include_failures=True):
+                        with self.page.expect_response(_is_upload, timeout=upload_timeout):
+                            file_input.set_input_files(value)
+                except Exception:
+                    self.timeouts.check('resume upload')
+                    print(f"No upload response within {upload_timeout}ms")
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"Error uploading file: {e}")
\ No newline at end of file
+            print(f"Error uploading file: {e}")
+        finally:
+            dispose([file_input])
\ No newline at end of file
@@ -1,31 +1,47 @@
 from typing import List, Dict, Any, Optional, Tuple
 from playwright.sync_api import Page
 from models.form import FormElement
+from services.latency_tracker import HostTimeouts
+from services.page_helpers import call_on
+from utils.memory import dispose
 
 class FormScraper:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, timeouts: Optional[HostTimeouts] = None):
         self.page = page
+        self.timeouts = timeouts or HostTimeouts()
 
     def scrape_form(self) -> List[FormElement]:
         """Scrape form elements using generalized selectors"""
         elements = []
         
         # Wait for form to be present
-        form = self.page.wait_for_selector('form')
+        form = self.page.wait_for_selector('form', timeout=self.timeouts['page_load'])
         if not form:
             return elements
 
         # Find all application fields
         field_containers = form.query_selector_all('.application-field')
-        
-        for field in field_containers:
+        try:
+            for field in field_containers:
+                self.timeouts.check('scraping')
+                field_info = self._scrape_field(field)
+                if field_info:
+                    print(f"Processing field: {field_info.label} ({field_info.type_of_input})")
+                    elements.append(field_info)
+        finally:
+            # Release handles now instead of keeping them alive until navigation
+            dispose(field_containers)
+            dispose([form])
+
+        return elements
+
+    def _scrape_field(self, field) -> Optional[FormElement]:
+        """Extract a single application field"""
+        input_elem = None
+        inputs = []
+        try:
             # Get the label from the previous sibling
-            label_text = field.evaluate('''field => {
-                const label = field.previousElementSibling;
-                return label && label.classList.contains('application-label') 
-                    ? label.textContent.trim() 
-                    : '';
-            }''')
+            label_text = call_on(field, 'labelText')
 
             # Get the input element
             input_elem = field.query_selector('input, select, textarea')
@@ -33,11 +49,8 @@ class FormScraper:
                 # Check for checkbox/radio groups
                 inputs = field.query_selector_all('input[type="checkbox"], input[type="radio"]')
                 if inputs:
-                    field_info = self._extract_group_info(label_text, field, inputs)
-                    if field_info:
-                        print(f"Processing field: {field_info.label} ({field_info.type_of_input})")
-                        elements.append(field_info)
-                continue
+                    return self._extract_group_info(label_text, field, inputs)
+                return None
 
             # Get input type and options
             input_type = self._get_input_type(input_elem)
@@ -64,11 +77,9 @@ class FormScraper:
                 options=options if options else None,
                 user_data_select_values=[options[0]] if options else None
             )
-            
-            print(f"Processing field: {field_info.label} ({field_info.type_of_input})")
-            elements.append(field_info)
-
-        return elements
+            return field_info
+        finally:
+            dispose([input_elem, *inputs])
 
     def _extract_group_info(self, label_text: str, container, inputs) -> Optional[FormElement]:
         """Extract information from a group of inputs"""
@@ -82,10 +93,7 @@ class FormScraper:
         # Get all options
         options = []
         for inp in inputs:
-            option_label = inp.evaluate('''input => {
-                const label = input.labels[0];
-                return label ? label.textContent.trim() : '';
-            }''')
+            option_label = call_on(inp, 'optionLabel')
             if option_label:
                 options.append(option_label)
 
@@ -103,7 +111,7 @@ class FormScraper:
 
     def _get_input_type(self, input_elem) -> str:
         """Get standardized input type"""
-        tag_name = input_elem.evaluate('el => el.tagName.toLowerCase()')
+        tag_name = call_on(input_elem, 'tagName')
         
         if tag_name == 'textarea':
             return 'textarea'
@@ -120,19 +128,18 @@ class FormScraper:
     def _get_options(self, container, input_elem, input_type) -> List[str]:
         """Get options for select/radio/checkbox fields"""
         if input_type in ['dropdown', 'multiselect']:
-            return input_elem.evaluate('''
-                el => Array.from(el.options)
-                    .map(opt => opt.textContent.trim())
-                    .filter(text => text)
-            ''')
+            return call_on(input_elem, 'selectOptions')
         elif input_type in ['radio', 'checkbox']:
             name = input_elem.get_attribute('name')
             if name:
                 options = []
                 inputs = container.query_selector_all(f'input[name="{name}"]')
-                for inp in inputs:
-                    label = inp.evaluate('el => el.labels[0]?.textContent.trim()')
-                    if label:
-                        options.append(label)
+                try:
+                    for inp in inputs:
+                        label = call_on(inp, 'optionLabel')
+                        if label:
+                            options.append(label)
+                finally:
+                    dispose(inputs)
                 return options
         return [] 
\ No newline at end of file
@@ -1,20 +1,39 @@
+import time
 from playwright.sync_api import Page
-from utils.constants import TIMEOUTS
 from services.twocaptcha_handler import TwoCaptchaHandler
-from typing import Optional
+from services.latency_tracker import HostTimeouts
+from services.page_helpers import call, wait_for
+from services.posting_budget import BudgetExceeded
+from services.scheduler import host_of
+from utils.memory import dispose
+from utils.constants import CONFIRMATION
+from typing import Callable, Optional
+
+class SubmissionError(Exception):
+    """Submission was rejected or never confirmed; retrying risks a duplicate"""
+    retryable = False
+
 
 class FormSubmitter:
     """Service for handling form submission"""
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, timeouts: Optional[HostTimeouts] = None,
+                 while_waiting: Optional[Callable[[], None]] = None):
         self.page = page
+        self.timeouts = timeouts or HostTimeouts()
+        # Work to overlap with the first confirmation wait (e.g. preparing the next posting)
+        self.while_waiting = while_waiting
+        self.last_outcome: Optional[str] = None
+        self.last_reason: Optional[str] = None
+        self._post_statuses: list[int] = []
     
     def submit_form(self, captcha_handler: Optional[TwoCaptchaHandler] = None) -> bool:
         """Submit the form by finding and clicking the submit button"""
+        submit_button = None
         try:
             # Scroll to bottom of page
-            self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            self.page.wait_for_timeout(TIMEOUTS['interaction'])  # Wait for scroll to complete
+            call(self.page, 'scrollToBottom')
+            self.page.wait_for_timeout(self.timeouts['interaction'])  # Wait for scroll to complete
             # import pdb; pdb.set_trace()
             
             # Try different submit button selectors
@@ -27,50 +46,145 @@ class FormSubmitter:
             ]
             
             # Try each selector
-            submit_button = None
             for selector in selectors:
                 print(f"Trying selector: {selector}")   
                 try:
                     # import pdb; pdb.set_trace()
                     # Wait for button to be visible and enabled
-                    submit_button = self.page.wait_for_selector(
-                        selector,
-                        timeout=TIMEOUTS['element'],
-                        state="visible"
-                    )
+                    dispose([submit_button])
+                    submit_button = None
+                    with self.timeouts.measure('element'):
+                        submit_button = self.page.wait_for_selector(
+                            selector,
+                            timeout=self.timeouts['element'],
+                            state="visible"
+                        )
                     
                     if submit_button and submit_button.is_enabled():
                         print(f"Found submit button with selector: {selector}")
                         break
+                except BudgetExceeded:
+                    raise
                 except:
                     print(f"Selector failed: {selector}")
                     continue
             
             if not submit_button:
                 print("Submit button not found!")
+                self.last_outcome, self.last_reason = 'not_submitted', 'submit button not found'
                 return False
 
+            # A challenge brought up while filling is solved once, before the click
+            if captcha_handler:
+                hcaptcha = TwoCaptchaHandler.detect_hcaptcha(self.page)
+                if hcaptcha["found"]:
+                    print("hCaptcha already up, solving before submitting...")
+                    captcha_handler.diagnostics.capture(self.page, "captcha_before_submit",
+                                                        frame_url=hcaptcha['src'])
+                    if captcha_handler.solve_hcaptcha(self.page, hcaptcha, budget=self.timeouts.budget):
+                        self.page.wait_for_timeout(self.timeouts['interaction'])
+                    else:
+                        print("Failed to solve hCaptcha before submitting")
+
             # First submit attempt
-            submit_button.click()
             print("First submit attempt...")
-            self.page.wait_for_timeout(TIMEOUTS['interaction'])
+            outcome, reason = self._click_and_confirm(submit_button, watch_captcha=bool(captcha_handler))
+
             # Check for hCaptcha
-            if captcha_handler:
-                hcaptcha = CaptchaHandler.detect_hcaptcha(self.page)
+            if outcome == 'captcha':
+                hcaptcha = TwoCaptchaHandler.detect_hcaptcha(self.page)
                 if hcaptcha["found"]:
                     print("hCaptcha detected, attempting to solve...")
-                    if captcha_handler.solve_hcaptcha(self.page, hcaptcha):
+                    captcha_handler.diagnostics.capture(self.page, "captcha_at_submit", frame_url=hcaptcha['src'])
+                    if captcha_handler.solve_hcaptcha(self.page, hcaptcha, budget=self.timeouts.budget):
                         print("hCaptcha solved successfully")
                         # Add extra delay after solving captcha
-                        self.page.wait_for_timeout(TIMEOUTS['interaction'])
-                        submit_button.click()
+                        self.page.wait_for_timeout(self.timeouts['interaction'])
                         print("Second submit attempt after captcha...")
-                        self.page.wait_for_timeout(TIMEOUTS['interaction'])
+                        outcome, reason = self._click_and_confirm(submit_button)
                     else:
                         print("Failed to solve hCaptcha")
+                        outcome, reason = 'unconfirmed', 'hCaptcha not solved'
+
+            self.last_outcome, self.last_reason = outcome, reason
+            if outcome == 'confirmed':
+                print(f"✓ Submission confirmed ({reason})")
+                return True
+            print(f"✗ Submission {outcome}: {reason}")
+            return False
             
-            return True
-            
+        except BudgetExceeded as e:
+            print(f"✗ {e}")
+            self.last_outcome, self.last_reason = 'error', str(e)
+            raise
         except Exception as e:
             print(f"Error submitting form: {e}")
-            return False 
\ No newline at end of file
+            self.last_outcome, self.last_reason = 'error', str(e)
+            return False
+        finally:
+            dispose([submit_button])
+
+    def _click_and_confirm(self, submit_button, watch_captcha: bool = False) -> tuple[str, str]:
+        """Click submit and wait for the ATS to confirm or reject the submission"""
+        host = host_of(self.page.url)
+
+        def on_response(response):
+            if response.request.method == 'POST' and host_of(response.url) == host:
+                self._post_statuses.append(response.status)
+
+        self._post_statuses = []
+        self.page.on('response', on_response)
+        try:
+            submit_button.click()
+            self._run_while_waiting()
+            return self.await_confirmation(watch_captcha)
+        finally:
+            self.page.remove_listener('response', on_response)
+
+    def _run_while_waiting(self) -> None:
+        """Run the overlap work once; the outcome is still read from the page afterwards"""
+        work, self.while_waiting = self.while_waiting, None
+        if not work:
+            return
+        try:
+            work()
+        except Exception as e:
+            print(f"Error in work overlapped with submission: {e}")
+
+    def await_confirmation(self, watch_captcha: bool = False) -> tuple[str, str]:
+        """Resolve the submission outcome as soon as a signal appears.
+
+        Returns (outcome, reason) where outcome is 'confirmed', 'rejected',
+        'captcha' (only with watch_captcha) or 'unconfirmed' once the
+        navigation timeout runs out.
+        """
+        deadline = time.monotonic() + self.timeouts['navigation'] / 1000
+        markers = {
+            'urlPatterns': CONFIRMATION['success_url_patterns'],
+            'successSelectors': CONFIRMATION['success_selectors'],
+            'successTexts': CONFIRMATION['success_texts'],
+            'errorSelectors': CONFIRMATION['error_selectors'],
+            'watchCaptcha': watch_captcha,
+        }
+        while True:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                # Cut short by the posting's budget rather than the navigation timeout
+                self.timeouts.check('submit confirmation')
+                return 'unconfirmed', 'no confirmation before deadline'
+            try:
+                verdict = wait_for(
+                    self.page,
+                    'confirmation',
+                    markers,
+                    polling=CONFIRMATION['poll'],
+                    timeout=min(CONFIRMATION['response_check'], remaining_ms)
+                ).json_value()
+                return verdict['outcome'], verdict['reason']
+            except Exception:
+                # Still waiting, or the context was replaced by a navigation
+                pass
+
+            failed = [status for status in self._post_statuses if status >= 400]
+            if failed:
+                return 'rejected', f'submit POST returned {failed[-1]}'
@@ -0,0 +1,73 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from playwright.sync_api import Page
+from models.form import FormElement
+from services.page_helpers import call
+
+GROUP_TYPES = ("dropdown", "multiselect", "radio", "checkbox")
+
+
+def _normalize(text: Any) -> str:
+    return re.sub(r'\s+', ' ', str(text or '')).strip().lower()
+
+
+@dataclass
+class VerificationReport:
+    mismatched: List[FormElement] = field(default_factory=list)
+    missing_required: List[str] = field(default_factory=list)
+    invalid: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        """Nothing required is missing, so submitting has a chance"""
+        return not self.missing_required
+
+
+class FormVerifier:
+    """Compares the form's live state with the fill plan"""
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def read_back(self, elements: List[FormElement]) -> Dict[str, dict]:
+        """Current state of each element, keyed by field id, in one round trip"""
+        fields = [{"id": elem.id_of_input_component} for elem in elements if elem.id_of_input_component]
+        return {state["id"]: state for state in call(self.page, 'readBack', fields)}
+
+    def verify(self, elements: List[FormElement], plan: Dict[str, Any]) -> VerificationReport:
+        """Check every element against the value planned for it (if any)"""
+        report = VerificationReport()
+        states = self.read_back(elements)
+        for elem in elements:
+            state = states.get(elem.id_of_input_component)
+            if not state or not state.get("found"):
+                continue
+            filled = self._has_value(elem, state)
+            expected = plan.get(elem.id_of_input_component)
+            if expected is not None and not self._matches(elem, state, expected):
+                report.mismatched.append(elem)
+            if (elem.required or state["required"]) and not filled:
+                report.missing_required.append(elem.label or elem.id_of_input_component)
+            elif filled and not state["valid"]:
+                report.invalid[elem.label or elem.id_of_input_component] = state["message"]
+        return report
+
+    @staticmethod
+    def _has_value(elem: FormElement, state: dict) -> bool:
+        if "checked" in state:
+            return bool(state["checked"])
+        if "files" in state:
+            return state["files"] > 0
+        return bool(_normalize(state.get("value")))
+
+    @staticmethod
+    def _matches(elem: FormElement, state: dict, expected: Any) -> bool:
+        if "checked" in state or elem.type_of_input in GROUP_TYPES:
+            # Options are picked fuzzily, so any selection counts as applied
+            return bool(state.get("checked"))
+        if "files" in state:
+            return state["files"] > 0
+        actual, wanted = _normalize(state.get("value")), _normalize(expected)
+        # Autocompletes may expand the typed text
+        return actual == wanted or (bool(wanted) and wanted in actual)
@@ -0,0 +1,142 @@
+import json
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Optional
+from services.posting_budget import PostingBudget
+from utils.constants import TIMEOUTS, ADAPTIVE_TIMEOUTS
+
+# Stages whose waits end on a real signal and can therefore be learned.
+# 'interaction' and 'navigation' are fixed pauses and always use TIMEOUTS.
+ADAPTIVE_STAGES = ('page_load', 'element', 'resume_upload')
+
+
+class LatencyTracker:
+    """Rolling latency history per ATS host and stage, persisted between runs.
+
+    Timeouts are derived as percentile * margin over the recent window and
+    clamped between ADAPTIVE_TIMEOUTS['floor'] and the TIMEOUTS constant.
+    """
+
+    def __init__(self, path: str = ADAPTIVE_TIMEOUTS['history_path'],
+                 window: int = ADAPTIVE_TIMEOUTS['window'],
+                 min_samples: int = ADAPTIVE_TIMEOUTS['min_samples'],
+                 percentile: float = ADAPTIVE_TIMEOUTS['percentile'],
+                 margin: float = ADAPTIVE_TIMEOUTS['margin']):
+        self.path = Path(path)
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.margin = margin
+        self.samples: Dict[str, Dict[str, Deque[float]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = ADAPTIVE_TIMEOUTS['history_path'], **kwargs) -> "LatencyTracker":
+        """Create a tracker seeded with the history saved by earlier runs"""
+        tracker = cls(path, **kwargs)
+        if tracker.path.exists():
+            try:
+                with open(tracker.path) as f:
+                    history = json.load(f)
+                for host, stages in history.items():
+                    for stage, values in stages.items():
+                        tracker._series(host, stage).extend(values)
+            except (OSError, ValueError) as e:
+                print(f"Could not load latency history: {e}")
+        return tracker
+
+    def save(self) -> None:
+        """Persist the latency history"""
+        # Workers share one tracker: write under the lock, through a temp
+        # file of this call's own, so saves can't truncate or rename each other's
+        with self._lock:
+            history = {host: {stage: list(values) for stage, values in stages.items()}
+                       for host, stages in self.samples.items()}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False) as f:
+                json.dump(history, f)
+            Path(f.name).replace(self.path)
+
+    def _series(self, host: str, stage: str) -> Deque[float]:
+        return self.samples.setdefault(host, {}).setdefault(stage, deque(maxlen=self.window))
+
+    def record(self, host: str, stage: str, elapsed_ms: float) -> None:
+        """Add an observed latency for a host and stage"""
+        if stage not in ADAPTIVE_STAGES:
+            return
+        with self._lock:
+            self._series(host, stage).append(round(elapsed_ms, 1))
+
+    def timeout(self, host: str, stage: str) -> int:
+        """Timeout in ms for a host and stage"""
+        bound = TIMEOUTS[stage]
+        if stage not in ADAPTIVE_STAGES:
+            return bound
+        with self._lock:
+            values = sorted(self.samples.get(host, {}).get(stage, ()))
+        if len(values) < self.min_samples:
+            return bound
+
+        # Nearest-rank percentile
+        rank = max(0, min(len(values) - 1, int(round(self.percentile / 100 * len(values))) - 1))
+        derived = values[rank] * self.margin
+        return int(min(bound, max(ADAPTIVE_TIMEOUTS['floor'], derived)))
+
+    def for_host(self, host: str) -> "HostTimeouts":
+        """TIMEOUTS-compatible view for one host"""
+        return HostTimeouts(self, host)
+
+
+class HostTimeouts:
+    """Drop-in replacement for the TIMEOUTS dict, adapted to one host.
+
+    Without a tracker it simply returns the TIMEOUTS constants and
+    discards recorded samples. With a posting budget every timeout is
+    shrunk to the time the posting has left, and reading one after the
+    budget ran out raises BudgetExceeded.
+    """
+
+    def __init__(self, tracker: Optional[LatencyTracker] = None, host: str = '',
+                 budget: Optional[PostingBudget] = None):
+        self.tracker = tracker
+        self.host = host
+        self.budget = budget
+
+    def with_budget(self, budget: Optional[PostingBudget]) -> "HostTimeouts":
+        """The same timeouts, bounded by a posting's budget"""
+        return HostTimeouts(self.tracker, self.host, budget)
+
+    def __getitem__(self, stage: str) -> int:
+        timeout = self.tracker.timeout(self.host, stage) if self.tracker else TIMEOUTS[stage]
+        return self.budget.clamp(timeout, stage) if self.budget else timeout
+
+    def check(self, stage: str = '') -> None:
+        """Cancellation point: raise BudgetExceeded once the posting's budget is gone"""
+        if self.budget:
+            self.budget.check(stage)
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        if self.tracker:
+            self.tracker.record(self.host, stage, elapsed_ms)
+
+    @contextmanager
+    def measure(self, stage: str, include_failures: bool = False):
+        """Record how long the wrapped block took.
+
+        Failed blocks are only recorded with include_failures, for waits
+        where a timeout means the host was slow rather than the selector
+        being wrong.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            # A wait cut short by the budget says nothing about the host
+            if include_failures and not (self.budget and self.budget.expired):
+                self.record(stage, (time.monotonic() - start) * 1000)
+            raise
+        self.record(stage, (time.monotonic() - start) * 1000)
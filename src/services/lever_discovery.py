@@ -0,0 +1,168 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from utils.constants import LEVER_DISCOVERY
+
+# Posting fields kept in the cache (the API also returns full descriptions)
+KEPT_FIELDS = ('id', 'text', 'categories', 'hostedUrl', 'applyUrl', 'workplaceType', 'createdAt')
+
+
+@dataclass
+class DiscoveredPosting:
+    company: str
+    id: str
+    title: str
+    location: str
+    team: str
+    commitment: str
+    workplace: str
+    apply_url: str
+
+    @property
+    def name(self) -> str:
+        """Posting name for output files and the scheduler"""
+        return f"{self.company}-{self.id[:8]}"
+
+    @classmethod
+    def from_api(cls, company: str, posting: dict) -> "DiscoveredPosting":
+        categories = posting.get('categories') or {}
+        hosted = posting.get('hostedUrl', '').rstrip('/')
+        return cls(
+            company=company,
+            id=posting['id'],
+            title=posting.get('text', ''),
+            location=categories.get('location') or '',
+            team=categories.get('team') or '',
+            commitment=categories.get('commitment') or '',
+            workplace=posting.get('workplaceType') or '',
+            apply_url=posting.get('applyUrl') or f"{hosted}/apply",
+        )
+
+
+def matches(posting: DiscoveredPosting, rules: dict) -> bool:
+    """Case-insensitive substring rules; an empty list lets everything through"""
+    title = posting.title.lower()
+    where = f"{posting.location} {posting.workplace}".lower()
+    if rules.get('title_include') and not any(word.lower() in title for word in rules['title_include']):
+        return False
+    if any(word.lower() in title for word in rules.get('title_exclude', ())):
+        return False
+    if rules.get('locations') and not any(place.lower() in where for place in rules['locations']):
+        return False
+    if rules.get('commitments') and posting.commitment.lower() not in {c.lower() for c in rules['commitments']}:
+        return False
+    return True
+
+
+class LeverDiscovery:
+    """Open postings of Lever companies from the public postings API, no browser needed.
+
+    One GET per company (/v0/postings/<company>?mode=json) over a pooled
+    session, fanned out over a thread pool. Each company's ETag and
+    Last-Modified are kept with its postings, so later runs send conditional
+    requests and an unchanged board costs a 304 instead of the whole list.
+    """
+
+    def __init__(self, api_base: str = LEVER_DISCOVERY['api_base'],
+                 cache_path: str = LEVER_DISCOVERY['cache_path'],
+                 workers: int = LEVER_DISCOVERY['workers'],
+                 timeout: float = LEVER_DISCOVERY['timeout']):
+        self.api_base = api_base.rstrip('/')
+        self.cache_path = Path(cache_path)
+        self.workers = workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cache: Dict[str, dict] = self._load_cache()
+        self.stats = {'fetched': 0, 'not_modified': 0, 'failed': 0}
+        self._lock = threading.Lock()
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable Lever cache: {e}")
+            return {}
+
+    def _save_cache(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cache, f)
+        tmp_path.replace(self.cache_path)
+
+    def fetch(self, company: str) -> List[dict]:
+        """A company's open postings, revalidated against the cache"""
+        with self._lock:
+            cached = self.cache.get(company)
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self.session.get(f"{self.api_base}/{company}", params={'mode': 'json'},
+                                        headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Lever postings for {company} unavailable: {e}")
+            return self._failed(cached)
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            return cached['postings']
+        if not response.ok:
+            print(f"Lever postings for {company}: HTTP {response.status_code}")
+            return self._failed(cached)
+
+        try:
+            body = response.json()
+            if not isinstance(body, list):
+                raise TypeError(f"expected a list of postings, got {type(body).__name__}")
+            postings = [{key: posting.get(key) for key in KEPT_FIELDS} for posting in body]
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Lever postings for {company}: malformed response ({e})")
+            return self._failed(cached)
+        with self._lock:
+            self.stats['fetched'] += 1
+            self.cache[company] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'postings': postings,
+            }
+        return postings
+
+    def _failed(self, cached: Optional[dict]) -> List[dict]:
+        """Count a failed fetch; fall back to the last known board"""
+        with self._lock:
+            self.stats['failed'] += 1
+        return cached['postings'] if cached else []
+
+    def discover(self, companies: List[str], rules: Optional[dict] = None) -> List[DiscoveredPosting]:
+        """Open postings of all companies that match the rules"""
+        rules = LEVER_DISCOVERY['rules'] if rules is None else rules
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(companies)))) as pool:
+            boards = list(pool.map(self.fetch, companies))
+        self._save_cache()
+
+        found = []
+        for company, postings in zip(companies, boards):
+            for posting in postings:
+                discovered = DiscoveredPosting.from_api(company, posting)
+                if matches(discovered, rules):
+                    found.append(discovered)
+        return found
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,41 @@
+from typing import Any, Dict, List
+from playwright.sync_api import Page
+from services.page_helpers import call
+from utils.constants import MATCHING
+
+
+class OptionResolver:
+    """Resolves answers to options of radio, checkbox and select groups"""
+
+    def __init__(self, page: Page, threshold: float = MATCHING['option_threshold']):
+        self.page = page
+        self.threshold = threshold
+
+    def resolve(self, field_id: str, value: Any) -> Dict[str, Any]:
+        """Match value(s) against a group's options and select them in one round trip"""
+        wanted = self._to_list(value)
+        result = call(self.page, 'resolveOptions', {
+            "name": field_id,
+            "wanted": wanted,
+            "threshold": self.threshold,
+        })
+
+        if not result.get("found"):
+            print(f"No option group found for: {field_id}")
+            return result
+
+        for selected in result["selected"]:
+            print(f"Selected option '{selected['label'] or selected['value']}' "
+                  f"({result['kind']}, score {selected['score']:.2f})")
+        for missing in result["unmatched"]:
+            print(f"No matching option found for value: {missing}")
+        return result
+
+    @staticmethod
+    def _to_list(value: Any) -> List[str]:
+        """Normalise a single value or list of values to strings"""
+        if isinstance(value, (list, tuple, set)):
+            return [str(v) for v in value]
+        if isinstance(value, bool):
+            return ["Yes" if value else "No"]
+        return [str(value)]
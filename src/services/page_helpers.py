@@ -0,0 +1,519 @@
+import hashlib
+from typing import Any
+
+# Global the bundle is installed under (non-enumerable, so page scripts
+# iterating window don't see it)
+GLOBAL_NAME = '__jobAutoHelpers'
+
+# --- Form scraping -----------------------------------------------------------
+
+# Lever puts the question in the .application-label sibling before the field
+LABEL_TEXT_JS = """(field) => {
+    const label = field.previousElementSibling;
+    return label && label.classList.contains('application-label')
+        ? label.textContent.trim()
+        : '';
+}"""
+
+OPTION_LABEL_JS = """(input) => {
+    const label = input.labels && input.labels[0];
+    return label ? label.textContent.trim() : '';
+}"""
+
+SELECT_OPTIONS_JS = """(el) => Array.from(el.options)
+    .map(opt => opt.textContent.trim())
+    .filter(text => text)"""
+
+# --- Text entry (services/text_input.py) ------------------------------------
+
+# What the field is, read in one call before choosing how to enter text
+PROBE_JS = """(el, markers) => {
+    const attr = name => (el.getAttribute(name) || '').toLowerCase();
+    const autocomplete = attr('role') === 'combobox'
+        || ['list', 'both'].includes(attr('aria-autocomplete'))
+        || el.hasAttribute('list')
+        || markers.some(m => el.matches(m) || el.closest(m) !== null);
+    return {
+        tag: el.tagName.toLowerCase(),
+        editable: el.isContentEditable,
+        autocomplete: autocomplete,
+        maxLength: el.maxLength > 0 ? el.maxLength : null
+    };
+}"""
+
+# --- Option groups (services/option_resolver.py) ----------------------------
+
+# Collects every option of a select/radio/checkbox group, matches the wanted
+# answers against values and visible labels, and selects the winners - all
+# inside a single evaluate call.
+RESOLVE_OPTIONS_JS = """({ name, wanted, threshold }) => {
+    const normalize = s => (s || '').toLowerCase()
+        .replace(/[^a-z0-9]+/g, ' ').trim();
+    const bigrams = s => {
+        const out = [];
+        const t = s.replace(/ /g, '');
+        for (let i = 0; i < t.length - 1; i++) out.push(t.slice(i, i + 2));
+        return out;
+    };
+    const dice = (a, b) => {
+        const x = bigrams(a), y = bigrams(b);
+        if (!x.length || !y.length) return a === b ? 1 : 0;
+        const counts = new Map();
+        x.forEach(g => counts.set(g, (counts.get(g) || 0) + 1));
+        let hits = 0;
+        y.forEach(g => {
+            const c = counts.get(g) || 0;
+            if (c > 0) { hits++; counts.set(g, c - 1); }
+        });
+        return 2 * hits / (x.length + y.length);
+    };
+    // Whole words only: "no" must not match "I don't know", nor "male" "Female"
+    const startsWithWords = (s, prefix) => s.startsWith(prefix + ' ');
+    const containsWords = (s, part) => (' ' + s + ' ').includes(' ' + part + ' ');
+    const score = (want, opt) => {
+        let best = 0;
+        for (const text of [opt.label, opt.value]) {
+            const t = normalize(text);
+            if (!t) continue;
+            if (t === want) return 1;
+            if (startsWithWords(t, want) || startsWithWords(want, t)) best = Math.max(best, 0.9);
+            else if (containsWords(t, want) || containsWords(want, t)) best = Math.max(best, 0.8);
+            // Bigram similarity is too loose for short answers
+            else if (want.length > 4 && t.length > 4) best = Math.max(best, dice(want, t));
+        }
+        return best;
+    };
+
+    const nodes = Array.from(document.querySelectorAll(`[name="${CSS.escape(name)}"]`));
+    const select = nodes.find(n => n.tagName === 'SELECT');
+    let kind, options;
+    if (select) {
+        kind = select.multiple ? 'multiselect' : 'dropdown';
+        options = Array.from(select.options).map(o => ({
+            node: o, value: o.value, label: o.textContent.trim(),
+            checked: o.selected, disabled: o.disabled
+        }));
+    } else {
+        const inputs = nodes.filter(n => n.type === 'radio' || n.type === 'checkbox');
+        if (!inputs.length) return { found: false, selected: [], unmatched: wanted };
+        kind = inputs[0].type;
+        options = inputs.map(i => ({
+            node: i, value: i.value,
+            label: (i.labels && i.labels[0] ? i.labels[0].textContent : '').trim(),
+            checked: i.checked, disabled: i.disabled
+        }));
+    }
+
+    const candidates = options.filter(o => !o.disabled && (o.value || o.label));
+    const chosen = [], unmatched = [];
+    for (const w of wanted) {
+        const want = normalize(w);
+        if (!want) { unmatched.push(w); continue; }
+        let best = null, bestScore = 0;
+        for (const opt of candidates) {
+            const s = score(want, opt);
+            if (s > bestScore) { best = opt; bestScore = s; }
+        }
+        if (best && bestScore >= threshold) {
+            chosen.push({ opt: best, score: bestScore });
+        } else {
+            unmatched.push(w);
+        }
+    }
+    // Single-choice groups only take the best answer
+    const singleChoice = kind === 'dropdown' || kind === 'radio';
+    if (singleChoice && chosen.length > 1) {
+        chosen.sort((a, b) => b.score - a.score);
+        chosen.length = 1;
+    }
+
+    for (const { opt } of chosen) {
+        if (select) {
+            opt.node.selected = true;
+        } else if (!opt.node.checked) {
+            opt.node.click();
+        }
+    }
+    if (select && chosen.length) {
+        select.dispatchEvent(new Event('input', { bubbles: true }));
+        select.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+
+    return {
+        found: true,
+        kind,
+        selected: chosen.map(({ opt, score }) => ({
+            value: opt.value, label: opt.label, score
+        })),
+        unmatched,
+        options: options.map(o => ({
+            value: o.value, label: o.label,
+            checked: select ? o.node.selected : o.node.checked,
+            disabled: o.disabled
+        }))
+    };
+}"""
+
+# --- Post-fill verification (services/form_verifier.py) ---------------------
+
+# Reads back every field's value, checked options and validity in one call.
+# validity.valid is used rather than checkValidity() so no 'invalid' events
+# fire and the ATS doesn't light up error messages.
+READ_BACK_JS = """(fields) => fields.map(f => {
+    const byName = Array.from(document.querySelectorAll(`[name="${CSS.escape(f.id)}"]`));
+    const nodes = byName.length ? byName : [
+        document.getElementById(f.id),
+        document.querySelector(`[data-qa="${CSS.escape(f.id)}"]`)
+    ].filter(Boolean);
+    if (!nodes.length) return { id: f.id, found: false };
+
+    const state = {
+        id: f.id,
+        found: true,
+        required: nodes.some(n => n.required || n.getAttribute('aria-required') === 'true'),
+        valid: nodes.every(n => !n.validity || n.validity.valid),
+        message: (nodes.find(n => n.validationMessage) || {}).validationMessage || ''
+    };
+    const select = nodes.find(n => n.tagName === 'SELECT');
+    const toggles = nodes.filter(n => n.type === 'radio' || n.type === 'checkbox');
+    const file = nodes.find(n => n.type === 'file');
+    if (select) {
+        state.checked = Array.from(select.selectedOptions)
+            .filter(o => o.value !== '')
+            .map(o => o.textContent.trim() || o.value);
+    } else if (toggles.length) {
+        state.checked = toggles.filter(n => n.checked)
+            .map(n => ((n.labels && n.labels[0] ? n.labels[0].textContent : '') || n.value).trim());
+    } else if (file) {
+        state.files = file.files ? file.files.length : 0;
+    } else {
+        const el = nodes[0];
+        state.value = el.isContentEditable ? el.innerText : (el.value || '');
+    }
+    return state;
+})"""
+
+# --- hCaptcha ----------------------------------------------------------------
+
+# The first fully visible hCaptcha iframe and the widget's sitekey
+DETECT_HCAPTCHA_JS = """() => {
+    const iframes = document.querySelectorAll('iframe[src*="hcaptcha"]');
+    for (const iframe of iframes) {
+        const style = window.getComputedStyle(iframe);
+        const rect = iframe.getBoundingClientRect();
+        if (style.visibility === 'visible' &&
+            style.display === 'block' &&
+            style.opacity === '1' &&
+            rect.width > 0) {
+            const hcaptchaDiv = document.querySelector('.h-captcha');
+            return {
+                found: true,
+                sitekey: hcaptchaDiv ? hcaptchaDiv.getAttribute('data-sitekey') : null,
+                src: iframe.src,
+                iframes: iframes.length
+            };
+        }
+    }
+    return { found: false, iframes: iframes.length };
+}"""
+
+# Inside the challenge frame: hand the token to the checkbox-invisible iframe
+SET_CHECKBOX_RESPONSE_JS = """(solution) => {
+    try {
+        const checkbox = document.querySelector('iframe[src*="checkbox-invisible"]');
+        if (!checkbox) {
+            return { success: false, error: 'checkbox-invisible iframe not found in frame' };
+        }
+        checkbox.setAttribute('data-hcaptcha-response', solution);
+        return {
+            success: true,
+            widgetId: checkbox.getAttribute('data-hcaptcha-widget-id'),
+            response: checkbox.getAttribute('data-hcaptcha-response')
+        };
+    } catch (e) {
+        return { success: false, error: e.message };
+    }
+}"""
+
+SET_INPUT_RESPONSE_JS = """(solution) => {
+    try {
+        const input = document.querySelector('textarea[name="h-captcha-response"]');
+        if (!input) {
+            return { success: false, error: 'Response input field not found' };
+        }
+        input.value = solution;
+        return { success: true };
+    } catch (e) {
+        return { success: false, error: e.message };
+    }
+}"""
+
+# Inside the challenge frame: Verify if offered, else Next Challenge
+CLICK_CHALLENGE_BUTTON_JS = """() => {
+    try {
+        const nextButton = document.querySelector('button[title="Next Challenge"], button[data-cy="next-challenge"]');
+        const verifyButton = document.querySelector('button[title="Verify Answers"], button[data-cy="verify-answers"]');
+        if (verifyButton) {
+            verifyButton.click();
+            return { success: true, buttonClicked: 'verify' };
+        } else if (nextButton) {
+            nextButton.click();
+            return { success: true, buttonClicked: 'next' };
+        }
+        // Every button found, for debugging
+        const allButtons = Array.from(document.querySelectorAll('button'));
+        return {
+            success: false,
+            error: 'No matching button found',
+            debug: {
+                totalButtons: allButtons.length,
+                buttonDetails: allButtons.map(b => ({
+                    title: b.title,
+                    text: b.textContent,
+                    class: b.className
+                }))
+            }
+        };
+    } catch (e) {
+        return { success: false, error: e.message };
+    }
+}"""
+
+# Everything the old state dumps printed, gathered in a single evaluate
+CAPTURE_JS = """() => {
+    const style = (el) => {
+        const computed = window.getComputedStyle(el);
+        return {display: computed.display, visibility: computed.visibility, opacity: computed.opacity};
+    };
+    const attributes = (el) => Array.from(el.attributes).reduce((acc, attr) => {
+        acc[attr.name] = attr.value;
+        return acc;
+    }, {});
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        const s = style(el);
+        return rect.width > 0 && rect.height > 0 && s.display !== 'none' && s.visibility !== 'hidden';
+    };
+
+    const hcaptchaDiv = document.querySelector('.h-captcha');
+    const focused = document.activeElement;
+    return {
+        iframes: Array.from(document.querySelectorAll('iframe[src*="hcaptcha"]')).map(iframe => ({
+            src: iframe.src,
+            enclave: iframe.src.includes('hcaptcha-enclave'),
+            style: style(iframe),
+            parent: iframe.parentElement ? iframe.parentElement.tagName : null,
+            attributes: attributes(iframe)
+        })),
+        responses: Array.from(document.querySelectorAll(
+            'textarea[name="h-captcha-response"], #hcaptchaResponseInput'
+        )).map(el => ({
+            name: el.getAttribute('name'),
+            id: el.id || null,
+            hasValue: Boolean(el.value),
+            valueLength: (el.value || '').length,
+            parent: el.parentElement ? el.parentElement.tagName : null,
+            visible: visible(el)
+        })),
+        hcaptchaDiv: hcaptchaDiv ? attributes(hcaptchaDiv) : null,
+        focused: focused && focused !== document.body
+            ? {tag: focused.tagName, name: focused.getAttribute('name'), id: focused.id || null}
+            : null
+    };
+}"""
+
+# Inside the challenge frame: the nested checkbox-invisible iframe
+CHALLENGE_FRAME_JS = """() => {
+    const iframe = document.querySelector('iframe[src*="checkbox-invisible"]');
+    if (!iframe) return null;
+    const computed = window.getComputedStyle(iframe);
+    return {
+        src: iframe.src,
+        widgetId: iframe.getAttribute('data-hcaptcha-widget-id'),
+        hasResponse: Boolean(iframe.getAttribute('data-hcaptcha-response')),
+        display: computed.display,
+        visibility: computed.visibility
+    };
+}"""
+
+# Finds a sitekey already present in the page's markup
+SITEKEY_JS = """() => {
+    const el = document.querySelector('.h-captcha[data-sitekey], [data-hcaptcha-sitekey], [data-sitekey]');
+    if (!el) return null;
+    return el.getAttribute('data-sitekey') || el.getAttribute('data-hcaptcha-sitekey');
+}"""
+
+# After a verify click: true once no hCaptcha enclave iframe is still visible
+ENCLAVE_HIDDEN_JS = """() => {
+    const enclaves = document.querySelectorAll('iframe[src*="hcaptcha-enclave"]');
+    return !Array.from(enclaves).some(iframe =>
+        window.getComputedStyle(iframe).visibility === 'visible'
+    );
+}"""
+
+# --- Submission and sessions -------------------------------------------------
+
+# Resolves as soon as the page shows a success or error marker (or a
+# visible hCaptcha when asked to watch for one); null keeps polling.
+CONFIRMATION_JS = """({ urlPatterns, successSelectors, successTexts, errorSelectors, watchCaptcha }) => {
+    const visible = el => {
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0 &&
+            style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    if (urlPatterns.some(p => new RegExp(p, 'i').test(location.href))) {
+        return { outcome: 'confirmed', reason: `url ${location.href}` };
+    }
+    for (const sel of successSelectors) {
+        const el = document.querySelector(sel);
+        if (el && visible(el)) return { outcome: 'confirmed', reason: sel };
+    }
+    const text = document.body ? document.body.innerText.toLowerCase() : '';
+    for (const t of successTexts) {
+        if (text.includes(t)) return { outcome: 'confirmed', reason: `text "${t}"` };
+    }
+    for (const sel of errorSelectors) {
+        for (const el of document.querySelectorAll(sel)) {
+            const message = el.textContent.trim();
+            if (message && visible(el)) {
+                return { outcome: 'rejected', reason: message.slice(0, 200) };
+            }
+        }
+    }
+    if (watchCaptcha) {
+        for (const iframe of document.querySelectorAll('iframe[src*="hcaptcha"]')) {
+            const style = window.getComputedStyle(iframe);
+            if (style.visibility === 'visible' && style.opacity === '1' && visible(iframe)) {
+                return { outcome: 'captcha', reason: 'hCaptcha challenge visible' };
+            }
+        }
+    }
+    return null;
+}"""
+
+# Workday session: signed in, signed out, or can't tell yet
+SESSION_STATE_JS = """({ signedIn, signInButton }) => {
+    if (document.querySelector(signedIn)) return 'signed_in';
+    if (document.querySelector(signInButton)) return 'signed_out';
+    return 'unknown';
+}"""
+
+# --- Scrolling -----------------------------------------------------------------
+
+# Smooth scroll that leaves 150px above the element
+SCROLL_TO_Y_JS = """(elementY) => window.scrollTo({ top: elementY - 150, behavior: 'smooth' })"""
+
+SCROLL_TO_BOTTOM_JS = """() => window.scrollTo(0, document.body.scrollHeight)"""
+
+# Helper name -> function source. Page/frame helpers take (arg); element
+# helpers take (el, arg).
+HELPERS = {
+    'labelText': LABEL_TEXT_JS,
+    'optionLabel': OPTION_LABEL_JS,
+    'tagName': "(el) => el.tagName.toLowerCase()",
+    'selectOptions': SELECT_OPTIONS_JS,
+    'probeTextInput': PROBE_JS,
+    'inputValue': "(el) => el.isContentEditable ? el.innerText : el.value",
+    'resolveOptions': RESOLVE_OPTIONS_JS,
+    'readBack': READ_BACK_JS,
+    'detectHcaptcha': DETECT_HCAPTCHA_JS,
+    'setCheckboxResponse': SET_CHECKBOX_RESPONSE_JS,
+    'setInputResponse': SET_INPUT_RESPONSE_JS,
+    'clickChallengeButton': CLICK_CHALLENGE_BUTTON_JS,
+    'captchaState': CAPTURE_JS,
+    'challengeFrameState': CHALLENGE_FRAME_JS,
+    'sitekey': SITEKEY_JS,
+    'enclaveHidden': ENCLAVE_HIDDEN_JS,
+    'confirmation': CONFIRMATION_JS,
+    'sessionState': SESSION_STATE_JS,
+    'scrollToY': SCROLL_TO_Y_JS,
+    'scrollToBottom': SCROLL_TO_BOTTOM_JS,
+}
+
+# Derived from the sources, so any edit to a helper invalidates bundles
+# already installed in open documents
+HELPERS_VERSION = hashlib.sha1(
+    '\n'.join(f"{name}={source}" for name, source in sorted(HELPERS.items())).encode('utf-8')
+).hexdigest()[:12]
+
+# Added once per context as an init script: runs in every document and frame
+# before the page's own scripts
+HELPERS_JS = """(() => {
+    const current = window.%(global)s;
+    if (current && current.version === '%(version)s') return;
+    Object.defineProperty(window, '%(global)s', {
+        value: Object.freeze({
+            version: '%(version)s',
+%(helpers)s
+        }),
+        configurable: true,
+        enumerable: false
+    });
+})();""" % {
+    'global': GLOBAL_NAME,
+    'version': HELPERS_VERSION,
+    'helpers': ',\n'.join(f"            {name}: {source}" for name, source in HELPERS.items()),
+}
+
+# The same bundle as an evaluate function, for documents the init script missed
+INSTALL_JS = f"() => {{ {HELPERS_JS} }}"
+
+# What actually crosses the wire per call: a helper name, the bundle version
+# and the arguments. [false, null] means the bundle is missing or stale.
+CALL_JS = f"""([name, version, arg]) => {{
+    const helpers = window.{GLOBAL_NAME};
+    return helpers && helpers.version === version ? [true, helpers[name](arg)] : [false, null];
+}}"""
+
+ELEMENT_CALL_JS = f"""(el, [name, version, arg]) => {{
+    const helpers = window.{GLOBAL_NAME};
+    return helpers && helpers.version === version ? [true, helpers[name](el, arg)] : [false, null];
+}}"""
+
+# Polled by wait_for_function: null (keep polling) until the helper returns
+# something truthy
+WAIT_JS = f"""([name, version, arg]) => {{
+    const helpers = window.{GLOBAL_NAME};
+    return helpers && helpers.version === version ? helpers[name](arg) : null;
+}}"""
+
+READY_JS = f"(version) => Boolean(window.{GLOBAL_NAME}) && window.{GLOBAL_NAME}.version === version"
+
+
+def install(context) -> None:
+    """Inject the helper bundle into every document the context opens"""
+    context.add_init_script(HELPERS_JS)
+
+
+def _invoke(target, invocation: str, name: str, arg: Any) -> Any:
+    found, value = target.evaluate(invocation, [name, HELPERS_VERSION, arg])
+    if not found:
+        # Documents the init script didn't reach (pages opened before it was
+        # added, snapshots with scripts disabled, an older bundle): install
+        # the bundle into this document and call again
+        target.evaluate(INSTALL_JS)
+        found, value = target.evaluate(invocation, [name, HELPERS_VERSION, arg])
+        if not found:
+            raise RuntimeError(f"Page helper {name} unavailable after installing the bundle")
+    return value
+
+
+def call(target, name: str, arg: Any = None) -> Any:
+    """Run a named helper in a page or frame"""
+    return _invoke(target, CALL_JS, name, arg)
+
+
+def call_on(element, name: str, arg: Any = None) -> Any:
+    """Run a named helper on an element handle (passed as its first argument)"""
+    return _invoke(element, ELEMENT_CALL_JS, name, arg)
+
+
+def wait_for(target, name: str, arg: Any = None, **kwargs) -> Any:
+    """Poll a named helper until it returns a truthy value (the result's JSHandle).
+
+    Takes wait_for_function's timeout and polling options.
+    """
+    if not target.evaluate(READY_JS, HELPERS_VERSION):
+        target.evaluate(INSTALL_JS)
+    return target.wait_for_function(WAIT_JS, arg=[name, HELPERS_VERSION, arg], **kwargs)
@@ -0,0 +1,99 @@
+from typing import Callable, List, Optional
+from models.form import FormElement
+from services.browser import BrowserService
+from services.form_scraper import FormScraper
+from services.latency_tracker import HostTimeouts
+from services.posting_budget import PostingBudget
+from services.scheduler import HostScheduler, Job
+from services.snapshot_store import SnapshotStore
+
+
+class PostingPipeline:
+    """Overlaps loading and scraping posting N+1 with filling and submitting posting N.
+
+    Once posting N's page is up, the next runnable job is taken from the
+    scheduler and navigation starts in a second tab (look_ahead). While N's
+    submission waits for confirmation, that tab's form is waited for,
+    snapshotted and scraped (prepare_next). When N+1 comes up, its page is
+    handed over ready to fill (take).
+
+    Both overlap steps run inside posting N, so their waits are bounded by
+    N's budget: a slow next page must not hold N past its deadline.
+    """
+
+    def __init__(self, browser: BrowserService, scheduler: HostScheduler,
+                 timeouts_for: Callable[[str], HostTimeouts],
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 captcha_handler=None):
+        self.browser = browser
+        self.scheduler = scheduler
+        self.timeouts_for = timeouts_for
+        self.snapshot_store = snapshot_store
+        self.captcha_handler = captcha_handler
+
+        self.next: Optional[Job] = None
+        self.next_elements: Optional[List[FormElement]] = None
+        # Looked-ahead job that next_job() returned and take() has yet to claim
+        self.handing_over: Optional[Job] = None
+        self.handovers = 0
+
+    def next_job(self) -> Optional[Job]:
+        """The looked-ahead job if there is one, else the scheduler's next"""
+        job, self.next = self.next, None
+        self.handing_over = job
+        return job or self.scheduler.next_job()
+
+    def _timeouts(self, job: Job, budget: Optional[PostingBudget]) -> HostTimeouts:
+        """The next job's host timeouts, clamped to the current posting's budget"""
+        return self.timeouts_for(job.host).with_budget(budget)
+
+    def look_ahead(self, budget: Optional[PostingBudget] = None) -> None:
+        """Take the next runnable job (if any is ready now) and start loading it"""
+        if self.next:
+            return
+        job = self.scheduler.next_job(block=False)
+        if not job:
+            return
+        self.next, self.next_elements = job, None
+        if self.browser.preload(job.url, self._timeouts(job, budget)):
+            print(f"Preloading {job.name} in a second tab")
+
+    def prepare_next(self, budget: Optional[PostingBudget] = None) -> None:
+        """Wait for the preloaded form and scrape it, within the current posting's budget"""
+        job = self.next
+        if not job or self.next_elements is not None or not self.browser.preloaded:
+            return
+        url, page = self.browser.preloaded
+        if url != job.url:
+            return
+        page = self.browser.instrumented(page)
+        try:
+            timeouts = self._timeouts(job, budget)
+            self.browser.wait_for_form(page, timeouts)
+            if self.captcha_handler and self.captcha_handler.broker:
+                self.captcha_handler.broker.prefetch(page)
+            if self.snapshot_store:
+                self.snapshot_store.save(job.url, job.name, page.content())
+            self.next_elements = FormScraper(page, timeouts).scrape_form()
+            print(f"Prepared {job.name}: {len(self.next_elements)} elements scraped ahead")
+        except Exception as e:
+            # Fall back to loading it normally when its turn comes
+            print(f"Could not prepare {job.name} ahead: {e}")
+            self.browser.discard_preloaded()
+
+    def take(self, job: Job) -> Optional[List[FormElement]]:
+        """Hand over the prepared page for a job.
+
+        Returns the scraped elements once the preloaded tab is current, or
+        None if the job has to be loaded and scraped from scratch.
+        """
+        if job is not self.handing_over:
+            self.browser.discard_preloaded()
+            return None
+        elements = self.next_elements
+        self.handing_over, self.next_elements = None, None
+        if elements is None or not self.browser.adopt_preloaded(job.url):
+            self.browser.discard_preloaded()
+            return None
+        self.handovers += 1
+        return elements
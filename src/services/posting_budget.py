@@ -0,0 +1,47 @@
+import time
+from typing import Optional
+from utils.constants import POSTING_BUDGET
+
+
+class BudgetExceeded(Exception):
+    """The posting used up its time budget.
+
+    Not retried: a page that ate a whole budget once would likely hold the
+    worker just as long again.
+    """
+    retryable = False
+
+
+class PostingBudget:
+    """Total wall-clock time a posting may take.
+
+    Carried by the posting's HostTimeouts, so every wait the services read
+    from it is shrunk to what is left, and check() is the cancellation
+    point between steps: once the budget is gone it raises BudgetExceeded.
+    """
+
+    def __init__(self, seconds: float = POSTING_BUDGET['seconds']):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self.deadline - time.monotonic()) * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def check(self, stage: str = '') -> None:
+        """Raise BudgetExceeded if the budget has run out"""
+        if self.expired:
+            where = f" during {stage}" if stage else ""
+            raise BudgetExceeded(f"Posting budget of {self.seconds:.0f}s used up{where}")
+
+    def clamp(self, timeout_ms: float, stage: str = '') -> int:
+        """A wait shrunk to the remaining budget (raises once nothing is left)"""
+        self.check(stage)
+        return int(max(1, min(timeout_ms, self.remaining_ms())))
+
+    def remaining_seconds(self, cap: Optional[float] = None) -> float:
+        remaining = self.remaining_ms() / 1000
+        return remaining if cap is None else min(cap, remaining)
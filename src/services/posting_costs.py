@@ -0,0 +1,97 @@
+import json
+import statistics
+import tempfile
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional
+from utils.constants import POSTING_COSTS
+
+
+def schema_field_count(output_dir: Path, name: str) -> Optional[int]:
+    """Number of elements in the posting's last scraped schema, if there is one"""
+    path = Path(output_dir) / f"{name}-form.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return len(json.load(f).get('elements', []))
+    except (OSError, ValueError):
+        return None
+
+
+class PostingCostModel:
+    """Estimated seconds a posting takes, learned per ATS host across runs.
+
+    Each finished posting adds a sample (wall seconds, field count, whether
+    a captcha came up) to its host's rolling window. A posting's estimate is
+    its field count times the host's seconds per field, plus the host's
+    captcha rate times the typical captcha cost. Hosts without history fall
+    back to the POSTING_COSTS defaults.
+    """
+
+    def __init__(self, path: str = POSTING_COSTS['history_path'],
+                 window: int = POSTING_COSTS['window']):
+        self.path = Path(path)
+        self.window = window
+        self.samples: Dict[str, Deque[dict]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = POSTING_COSTS['history_path'], **kwargs) -> "PostingCostModel":
+        """Create a model seeded with the history saved by earlier runs"""
+        model = cls(path, **kwargs)
+        if model.path.exists():
+            try:
+                with open(model.path) as f:
+                    history = json.load(f)
+                for host, samples in history.items():
+                    model._series(host).extend(samples)
+            except (OSError, ValueError) as e:
+                print(f"Could not load posting cost history: {e}")
+        return model
+
+    def save(self) -> None:
+        """Persist the cost history"""
+        # Saved by every fanout worker: write under the lock through a temp file of its own
+        with self._lock:
+            history = {host: list(samples) for host, samples in self.samples.items()}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False) as f:
+                json.dump(history, f)
+            Path(f.name).replace(self.path)
+
+    def _series(self, host: str) -> Deque[dict]:
+        return self.samples.setdefault(host, deque(maxlen=self.window))
+
+    def record(self, host: str, seconds: float, fields: Optional[int],
+               captcha: Optional[bool] = None) -> None:
+        """Add a finished posting; captcha=None when it is unknown"""
+        with self._lock:
+            self._series(host).append({'seconds': round(seconds, 1), 'fields': fields or 0,
+                                       'captcha': captcha})
+
+    def captcha_rate(self, host: str) -> float:
+        """Share of the host's postings that came up with a captcha"""
+        with self._lock:
+            seen = [s['captcha'] for s in self.samples.get(host, ()) if s['captcha'] is not None]
+        return sum(seen) / len(seen) if seen else POSTING_COSTS['captcha_prior']
+
+    def estimate(self, host: str, fields: Optional[int] = None) -> float:
+        """Expected seconds for a posting on a host with the given field count"""
+        captcha_seconds = POSTING_COSTS['captcha_seconds']
+        with self._lock:
+            samples = [s for s in self.samples.get(host, ()) if s['fields']]
+        if fields is None:
+            fields = (int(statistics.median(s['fields'] for s in samples)) if samples
+                      else POSTING_COSTS['default_fields'])
+
+        captcha_rate = self.captcha_rate(host)
+        if not samples:
+            return (POSTING_COSTS['page_load_seconds'] + fields * POSTING_COSTS['seconds_per_field']
+                    + captcha_rate * captcha_seconds)
+        # Page load and submit overhead are folded into the per-field rate
+        per_field = statistics.median(
+            max(0.0, s['seconds'] - (captcha_seconds if s['captcha'] else 0)) / s['fields']
+            for s in samples)
+        return fields * per_field + captcha_rate * captcha_seconds
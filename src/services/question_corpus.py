@@ -0,0 +1,210 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from models.form import FormElement
+from utils.constants import QUESTION_CORPUS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    normalized TEXT NOT NULL,
+    type TEXT NOT NULL,
+    options_key TEXT NOT NULL,
+    label TEXT NOT NULL,
+    options TEXT,
+    seen INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (normalized, type, options_key)
+);
+CREATE TABLE IF NOT EXISTS sightings (
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    ats TEXT NOT NULL,
+    employer TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (question_id, ats, employer)
+);
+CREATE TABLE IF NOT EXISTS answers (
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    resume_digest TEXT NOT NULL,
+    value TEXT,
+    computed_at TEXT NOT NULL,
+    PRIMARY KEY (question_id, resume_digest)
+);
+CREATE INDEX IF NOT EXISTS questions_by_seen ON questions(seen DESC);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    normalized, content='questions', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts(rowid, normalized) VALUES (new.id, new.normalized);
+END;
+"""
+
+# Hosts of the ATSs we know, mapped to a short name
+ATS_HOSTS = {
+    'lever.co': 'lever',
+    'myworkdayjobs.com': 'workday',
+    'smartrecruiters.com': 'smartrecruiters',
+    'greenhouse.io': 'greenhouse',
+}
+
+
+def normalize_question(label: str) -> str:
+    """Lowercase, drop required markers and punctuation, collapse whitespace"""
+    text = label.lower().replace('✱', ' ').replace('*', ' ')
+    return ' '.join(re.findall(r"[a-z0-9]+", text))
+
+
+def _options_key(options: Optional[List[str]]) -> str:
+    if not options:
+        return ''
+    normalized = sorted(normalize_question(opt) for opt in options)
+    return hashlib.sha1('\n'.join(normalized).encode('utf-8')).hexdigest()[:16]
+
+
+def ats_and_employer(url: str) -> Tuple[str, str]:
+    """ATS name and employer slug for a posting URL"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    ats = next((name for suffix, name in ATS_HOSTS.items() if host.endswith(suffix)), host)
+    parts = [part for part in parsed.path.split('/') if part]
+    if ats == 'workday':
+        # <tenant>.wd5.myworkdayjobs.com/<site>/job/...
+        employer = host.split('.')[0]
+    else:
+        employer = parts[0].lower() if parts else host
+    return ats, employer
+
+
+def resume_digest(resume_data: dict) -> str:
+    """Fingerprint of the resume data; cached answers are tied to it"""
+    return hashlib.sha256(json.dumps(resume_data, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class QuestionCorpus:
+    """SQLite index of every scraped question across postings.
+
+    Questions are keyed by normalized label, input type and option set, and
+    counted per ATS and employer. Answers precomputed for the most frequent
+    questions are cached per resume version, so filling a known question
+    is a single indexed lookup.
+    """
+
+    def __init__(self, path: str = QUESTION_CORPUS['db_path']):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search() falls back to LIKE
+            self.has_fts = False
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_form(self, url: str, elements: Iterable[FormElement]) -> int:
+        """Count every labelled element of a scraped form"""
+        ats, employer = ats_and_employer(url)
+        now = datetime.now().isoformat()
+        recorded = 0
+        with self._lock, self.conn:
+            for elem in elements:
+                if not elem.label:
+                    continue
+                question_id = self._upsert_question(elem, now)
+                self.conn.execute(
+                    """INSERT INTO sightings (question_id, ats, employer, seen, last_seen)
+                       VALUES (?, ?, ?, 1, ?)
+                       ON CONFLICT (question_id, ats, employer)
+                       DO UPDATE SET seen = seen + 1, last_seen = excluded.last_seen""",
+                    (question_id, ats, employer, now))
+                recorded += 1
+        return recorded
+
+    def _upsert_question(self, elem: FormElement, now: str, count: bool = True) -> int:
+        key = (normalize_question(elem.label), elem.type_of_input, _options_key(elem.options))
+        on_conflict = ("DO UPDATE SET seen = seen + 1, label = excluded.label, last_seen = excluded.last_seen"
+                       if count else "DO NOTHING")
+        self.conn.execute(
+            f"""INSERT INTO questions (normalized, type, options_key, label, options, seen, first_seen, last_seen)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (normalized, type, options_key) {on_conflict}""",
+            (*key, elem.label, json.dumps(elem.options) if elem.options else None, int(count), now, now))
+        return self.conn.execute(
+            "SELECT id FROM questions WHERE normalized = ? AND type = ? AND options_key = ?", key
+        ).fetchone()[0]
+
+    def top_questions(self, limit: int = QUESTION_CORPUS['top_questions'],
+                      ats: Optional[str] = None) -> List[FormElement]:
+        """Most frequently seen questions, optionally for one ATS"""
+        if ats:
+            rows = self.conn.execute(
+                """SELECT q.label, q.type, q.options FROM questions q
+                   JOIN sightings s ON s.question_id = q.id
+                   WHERE s.ats = ? GROUP BY q.id ORDER BY SUM(s.seen) DESC LIMIT ?""",
+                (ats, limit)).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT label, type, options FROM questions ORDER BY seen DESC LIMIT ?",
+                (limit,)).fetchall()
+        return [FormElement(label=label, id_of_input_component='', required=False,
+                            type_of_input=type_, options=json.loads(options) if options else None)
+                for label, type_, options in rows]
+
+    def search(self, text: str, limit: int = 10) -> List[Tuple[str, str, int]]:
+        """(label, type, times seen) of stored questions matching the words in text"""
+        words = normalize_question(text).split()
+        if not words:
+            return []
+        if self.has_fts:
+            query = ' '.join(f'"{word}"' for word in words)
+            sql = """SELECT q.label, q.type, q.seen FROM questions_fts f
+                     JOIN questions q ON q.id = f.rowid
+                     WHERE questions_fts MATCH ? ORDER BY rank LIMIT ?"""
+            return self.conn.execute(sql, (query, limit)).fetchall()
+        clauses = ' AND '.join('normalized LIKE ?' for _ in words)
+        return self.conn.execute(
+            f"SELECT label, type, seen FROM questions WHERE {clauses} ORDER BY seen DESC LIMIT ?",
+            (*[f'%{word}%' for word in words], limit)).fetchall()
+
+    def cache_answer(self, elem: FormElement, digest: str, value: Any) -> None:
+        """Store the answer to a question for a resume version"""
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            question_id = self._upsert_question(elem, now, count=False)
+            self.conn.execute(
+                """INSERT OR REPLACE INTO answers (question_id, resume_digest, value, computed_at)
+                   VALUES (?, ?, ?, ?)""",
+                (question_id, digest, json.dumps(value), now))
+
+    def lookup(self, elem: FormElement, digest: str) -> Tuple[bool, Any]:
+        """(found, value) of a cached answer; a cached None means no data"""
+        with self._lock:
+            row = self.conn.execute(
+                """SELECT a.value FROM answers a JOIN questions q ON q.id = a.question_id
+                   WHERE q.normalized = ? AND q.type = ? AND q.options_key = ? AND a.resume_digest = ?""",
+                (normalize_question(elem.label), elem.type_of_input, _options_key(elem.options), digest)
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def stats(self) -> dict:
+        """Row counts for reporting"""
+        count = lambda table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return {'questions': count('questions'), 'sightings': count('sightings'), 'answers': count('answers')}
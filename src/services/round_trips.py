@@ -0,0 +1,165 @@
+import json
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from playwright.sync_api import ElementHandle, Frame, Keyboard, Locator, Mouse, Page
+from services import page_helpers
+from utils.constants import ROUND_TRIPS
+
+# Objects whose method calls go through the driver
+INSTRUMENTED_TYPES = (Page, Frame, ElementHandle, Locator, Keyboard, Mouse)
+
+# Not call sites of their own (see _call_site)
+_SKIPPED_FILES = {__file__, page_helpers.__file__}
+
+
+class _Instrumented:
+    """Stands in for a Playwright object and reports every method call"""
+
+    __slots__ = ('_target', '_profiler')
+
+    def __init__(self, target: Any, profiler: 'RoundTripProfiler'):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_profiler', profiler)
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if not callable(value):
+            # Properties such as page.keyboard or page.main_frame
+            return self._profiler.wrap(value)
+        method = f"{type(self._target).__name__}.{name}"
+        profiler = self._profiler
+
+        def call(*args, **kwargs):
+            args = tuple(_unwrap(arg) for arg in args)
+            kwargs = {key: _unwrap(arg) for key, arg in kwargs.items()}
+            started = time.perf_counter()
+            failed = False
+            try:
+                return profiler.wrap(value(*args, **kwargs))
+            except Exception:
+                failed = True
+                raise
+            finally:
+                profiler.record(method, _call_site(), time.perf_counter() - started, failed)
+
+        return call
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        return self._target == _unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(self._target)
+
+    def __bool__(self) -> bool:
+        return bool(self._target)
+
+    def __repr__(self) -> str:
+        return repr(self._target)
+
+
+def _unwrap(value: Any) -> Any:
+    """Playwright only accepts its own objects as arguments (e.g. evaluate handles)"""
+    if isinstance(value, _Instrumented):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+def _call_site() -> str:
+    """The first service function on the stack, as <module>.<function>
+
+    Frames in this module and in page_helpers are skipped, so helper calls
+    are attributed to the service that made them.
+    """
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename in _SKIPPED_FILES:
+        frame = frame.f_back
+    if not frame:
+        return '?'
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class RoundTripProfiler:
+    """Counts and times Playwright calls per posting, by method and call site.
+
+    Opt-in: services get pages wrapped by wrap(), and every method call on
+    the page, its frames, element handles, locators, keyboard and mouse is
+    recorded under (method, calling function). end() writes the posting's
+    totals and top call sites as a JSON line and warns when the posting
+    made more calls than the budget allows.
+    """
+
+    def __init__(self, log_path: str = ROUND_TRIPS['log_path'],
+                 top_sites: int = ROUND_TRIPS['top_sites'],
+                 budget: int = ROUND_TRIPS['budget']):
+        self.log_path = Path(log_path)
+        self.top_sites = top_sites
+        self.budget = budget
+        self.posting: Optional[str] = None
+        # (method, call site) -> [calls, seconds, failures]
+        self.calls: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0.0, 0])
+        self.over_budget = 0
+
+    def wrap(self, value: Any) -> Any:
+        """Instrument a Playwright object (or a list of them); anything else passes through"""
+        if isinstance(value, INSTRUMENTED_TYPES):
+            return _Instrumented(value, self)
+        if isinstance(value, list) and value and isinstance(value[0], INSTRUMENTED_TYPES):
+            return [_Instrumented(item, self) for item in value]
+        return value
+
+    def record(self, method: str, site: str, seconds: float, failed: bool) -> None:
+        entry = self.calls[(method, site)]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += failed
+
+    def begin(self, posting: str) -> None:
+        """Start counting for a posting"""
+        self.posting = posting
+        self.calls.clear()
+
+    def report(self) -> dict:
+        """Totals and the top call sites (by time) so far"""
+        ranked = sorted(self.calls.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'posting': self.posting,
+            'calls': sum(entry[0] for entry in self.calls.values()),
+            'seconds': round(sum(entry[1] for entry in self.calls.values()), 3),
+            'top_sites': [
+                {'site': site, 'method': method, 'calls': calls,
+                 'ms': round(seconds * 1000, 1), 'failures': failures}
+                for (method, site), (calls, seconds, failures) in ranked[:self.top_sites]
+            ],
+        }
+
+    def end(self) -> Optional[dict]:
+        """Log and print the posting's report"""
+        if not self.posting:
+            return None
+        report = self.report()
+        report['timestamp'] = datetime.now().isoformat()
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+
+        print(f"Round trips for {self.posting}: {report['calls']} calls, {report['seconds']:.1f}s")
+        for site in report['top_sites']:
+            print(f"  {site['calls']:5d} x {site['method']:<30} {site['ms']:8.0f}ms  {site['site']}")
+        if self.budget and report['calls'] > self.budget:
+            self.over_budget += 1
+            print(f"Over round-trip budget: {self.posting} made {report['calls']} calls "
+                  f"(budget {self.budget})")
+        self.posting = None
+        return report
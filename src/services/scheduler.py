@@ -0,0 +1,335 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from utils.constants import SCHEDULER
+
+# Error text fragments that point at the host rather than the page
+HOST_ERROR_MARKERS = (
+    'net::ERR_NAME_NOT_RESOLVED',
+    'net::ERR_CONNECTION_REFUSED',
+    'net::ERR_CONNECTION_RESET',
+    'net::ERR_CONNECTION_TIMED_OUT',
+    'net::ERR_INTERNET_DISCONNECTED',
+    'net::ERR_ADDRESS_UNREACHABLE',
+    'net::ERR_TIMED_OUT',
+    'NS_ERROR_CONNECTION_REFUSED',
+    'NS_ERROR_UNKNOWN_HOST',
+    'NS_ERROR_NET_TIMEOUT',
+)
+
+
+def host_of(url: str) -> str:
+    """Host part of a posting URL"""
+    return urlparse(url).netloc.lower()
+
+
+def classify_error(error: Exception) -> str:
+    """Classify a posting failure as 'host', 'transient' or 'permanent'.
+
+    'host' failures are retried and count towards the host's circuit
+    breaker, 'transient' failures are retried only, and 'permanent'
+    failures (bad selectors, missing data, our own bugs) are not retried.
+    """
+    if getattr(error, 'retryable', None) is False:
+        return 'permanent'
+    message = str(error)
+    if any(marker in message for marker in HOST_ERROR_MARKERS):
+        return 'host'
+    if type(error).__name__ == 'TimeoutError' or 'Timeout' in message:
+        return 'transient'
+    if 'Target closed' in message or 'Navigation failed' in message:
+        return 'transient'
+    return 'permanent'
+
+
+class TokenBucket:
+    """Token bucket limiting how often a host may be hit.
+
+    A rate of float('inf') disables limiting (e.g. for offline replay).
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate == float('inf'):
+            self.tokens = self.capacity
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float) -> bool:
+        """Take a token if one is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def next_available(self, now: float) -> float:
+        """Monotonic time at which the next token will be available"""
+        self._refill(now)
+        if self.tokens >= 1 or self.rate <= 0:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+
+class CircuitBreaker:
+    """Parks a host after repeated failures, then lets one probe through"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def allow(self, now: float) -> bool:
+        """Whether a request to the host may start now (see start())"""
+        if self.state == 'open' and now - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+            self.probe_in_flight = False
+        if self.state == 'closed':
+            return True
+        return self.state == 'half_open' and not self.probe_in_flight
+
+    def start(self) -> bool:
+        """A request allowed by allow() has started; True if it is the probe"""
+        if self.state == 'half_open':
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def reopens_at(self) -> float:
+        """Monotonic time at which an open breaker will allow a probe"""
+        return self.opened_at + self.reset_timeout
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = 'closed'
+        self.probe_in_flight = False
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.state = 'open'
+            self.opened_at = now
+            self.probe_in_flight = False
+
+
+class RetryPolicy:
+    """Jittered exponential backoff"""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, attempt: int, error_class: str) -> bool:
+        return error_class != 'permanent' and attempt < self.max_attempts
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff for the given (1-based) attempt"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+@dataclass
+class Job:
+    url: str
+    name: str
+    host: str
+    attempt: int = 0
+    ready_at: float = 0.0
+    last_error: Optional[str] = None
+    # Ordering: higher priority first, close deadlines (epoch seconds) next,
+    # then by estimated cost in seconds
+    priority: int = 0
+    deadline: Optional[float] = None
+    cost: float = 0.0
+    expensive: bool = False
+    # The half-open breaker's probe for its host
+    probe: bool = False
+
+
+@dataclass
+class HostState:
+    bucket: TokenBucket
+    breaker: CircuitBreaker
+    in_flight: int = 0
+
+
+@dataclass
+class SchedulerStats:
+    succeeded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    retries: int = 0
+
+
+class HostScheduler:
+    """Hands out postings so that no host is overloaded or retried while down.
+
+    Workers call next_job() to get work and report the outcome with
+    report_success()/report_failure(). A worker only waits when no posting
+    on any host is runnable, and then only until the earliest one is.
+
+    Runnable postings are taken by priority, then those closing within the
+    deadline horizon (earliest first), then by estimated cost. Cheap postings
+    go first, so more applications complete per hour, but while fewer than
+    half of the busy workers hold an expensive posting the most expensive
+    one is handed out instead, so slow flows don't pile up at the end.
+    """
+
+    def __init__(self,
+                 rate_per_minute: float = SCHEDULER['rate_per_minute'],
+                 burst: int = SCHEDULER['burst'],
+                 max_attempts: int = SCHEDULER['max_attempts'],
+                 backoff_base: float = SCHEDULER['backoff_base'],
+                 backoff_max: float = SCHEDULER['backoff_max'],
+                 breaker_failures: int = SCHEDULER['breaker_failures'],
+                 breaker_reset: float = SCHEDULER['breaker_reset'],
+                 deadline_horizon: float = SCHEDULER['deadline_horizon']):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.deadline_horizon = deadline_horizon
+        self.retry_policy = RetryPolicy(max_attempts, backoff_base, backoff_max)
+
+        self.pending: List[Job] = []
+        self.hosts: Dict[str, HostState] = {}
+        self.in_flight = 0
+        self.expensive_in_flight = 0
+        self.stats = SchedulerStats()
+        self._cond = threading.Condition()
+
+    def _host(self, host: str) -> HostState:
+        if host not in self.hosts:
+            self.hosts[host] = HostState(
+                bucket=TokenBucket(self.rate_per_minute, self.burst),
+                breaker=CircuitBreaker(self.breaker_failures, self.breaker_reset),
+            )
+        return self.hosts[host]
+
+    def add(self, url: str, name: str, priority: int = 0,
+            deadline: Optional[float] = None, cost: float = 0.0) -> None:
+        """Queue a posting"""
+        with self._cond:
+            if deadline is not None and deadline < time.time():
+                print(f"Skipping {name}: its deadline has passed")
+                self.stats.failed[name] = 'deadline passed'
+                return
+            job = Job(url=url, name=name, host=host_of(url),
+                      priority=priority, deadline=deadline, cost=cost)
+            self._host(job.host)
+            self.pending.append(job)
+            self._cond.notify_all()
+
+    def _ordered(self) -> List[Job]:
+        """Pending jobs in the order they should be handed out"""
+        costs = sorted(job.cost for job in self.pending)
+        median_cost = costs[len(costs) // 2] if costs else 0.0
+        for job in self.pending:
+            job.expensive = job.cost > median_cost
+        prefer_expensive = self.expensive_in_flight * 2 < self.in_flight
+        closing = time.time() + self.deadline_horizon
+
+        def key(job: Job):
+            urgent = job.deadline is not None and job.deadline <= closing
+            return (-job.priority, not urgent, job.deadline if urgent else 0.0,
+                    -job.cost if prefer_expensive else job.cost)
+
+        # Stable: equal keys (e.g. no estimates) keep the order they were added in
+        return sorted(self.pending, key=key)
+
+    def _pick(self, now: float) -> tuple[Optional[Job], Optional[float]]:
+        """Runnable job, or the earliest time one could become runnable"""
+        earliest = None
+        for job in self._ordered():
+            state = self.hosts[job.host]
+            ready_at = job.ready_at
+            if ready_at <= now and state.breaker.state == 'open':
+                ready_at = max(ready_at, state.breaker.reopens_at())
+            if ready_at <= now:
+                ready_at = max(ready_at, state.bucket.next_available(now))
+            if ready_at <= now:
+                # Only take the probe once a token is actually available
+                if state.breaker.allow(now) and state.bucket.try_acquire(now):
+                    job.probe = state.breaker.start()
+                    self.pending.remove(job)
+                    return job, None
+                # Half-open host with its probe still running: wait for the report
+                continue
+            earliest = ready_at if earliest is None else min(earliest, ready_at)
+        return None, earliest
+
+    def next_job(self, block: bool = True) -> Optional[Job]:
+        """Block until a posting is runnable; None once all work is done.
+
+        With block=False, returns None right away if nothing is runnable now.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                job, earliest = self._pick(now)
+                if job:
+                    job.attempt += 1
+                    self.hosts[job.host].in_flight += 1
+                    self.in_flight += 1
+                    self.expensive_in_flight += job.expensive
+                    return job
+                if not block or (not self.pending and not self.in_flight):
+                    return None
+                # Wake up when the earliest job is ready or another worker reports back
+                timeout = None if earliest is None else max(0.05, earliest - now)
+                self._cond.wait(timeout)
+
+    def _finish(self, job: Job) -> HostState:
+        state = self.hosts[job.host]
+        state.in_flight -= 1
+        self.in_flight -= 1
+        self.expensive_in_flight -= job.expensive
+        self._cond.notify_all()
+        return state
+
+    def report_success(self, job: Job) -> None:
+        with self._cond:
+            state = self._finish(job)
+            state.breaker.record_success()
+            job.probe = False
+            self.stats.succeeded.append(job.name)
+
+    def report_failure(self, job: Job, error: Exception) -> None:
+        """Record a failure and schedule a retry if the error class allows it"""
+        with self._cond:
+            state = self._finish(job)
+            error_class = classify_error(error)
+            job.last_error = str(error)
+            now = time.monotonic()
+            if error_class == 'host':
+                state.breaker.record_failure(now)
+                if state.breaker.state == 'open':
+                    print(f"Circuit open for {job.host}, parking for {self.breaker_reset:.0f}s")
+            elif job.probe:
+                # The host answered; the posting itself failed. Resolve the
+                # probe, or every other job on the host waits on it forever.
+                state.breaker.record_success()
+            job.probe = False
+
+            if self.retry_policy.should_retry(job.attempt, error_class):
+                delay = self.retry_policy.delay(job.attempt)
+                job.ready_at = now + delay
+                self.pending.append(job)
+                self.stats.retries += 1
+                print(f"Retrying {job.name} ({error_class} error) in {delay:.1f}s "
+                      f"[attempt {job.attempt + 1}/{self.retry_policy.max_attempts}]")
+            else:
+                self.stats.failed[job.name] = job.last_error
+                print(f"Giving up on {job.name} after {job.attempt} attempt(s) ({error_class} error)")
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+from playwright.sync_api import BrowserContext
+from utils.constants import WORKDAY_AUTH
+
+
+def tenant_of(url: str) -> str:
+    """Sessions are per host: a Workday tenant is <tenant>.wdN.myworkdayjobs.com"""
+    return urlparse(url).netloc.lower()
+
+
+def _belongs_to(domain: str, host: str) -> bool:
+    domain = domain.lstrip('.').lower()
+    return host == domain or host.endswith('.' + domain)
+
+
+class SessionCache:
+    """Per-tenant storage state (cookies and local storage) kept between runs.
+
+    After a successful sign-in the tenant's slice of the context's storage
+    state is written to <dir>/<tenant>.json. Before a state is injected into
+    a new context it is checked offline: too old, or with every cookie
+    expired, and it is dropped so the next visit signs in again.
+    """
+
+    def __init__(self, root: str = WORKDAY_AUTH['session_dir'],
+                 max_age: float = WORKDAY_AUTH['session_max_age']):
+        self.root = Path(root)
+        self.max_age = max_age
+
+    def path(self, tenant: str) -> Path:
+        return self.root / f"{tenant}.json"
+
+    def save(self, tenant: str, context: BrowserContext) -> None:
+        """Store the tenant's cookies and local storage from a signed-in context"""
+        state = context.storage_state()
+        tenant_state = {
+            'cookies': [c for c in state.get('cookies', []) if _belongs_to(c['domain'], tenant)],
+            'origins': [o for o in state.get('origins', []) if urlparse(o['origin']).netloc == tenant],
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(tenant)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'saved_at': time.time(), 'state': tenant_state}, f)
+        # Session cookies are as good as a password
+        os.chmod(tmp_path, 0o600)
+        tmp_path.replace(path)
+        print(f"Saved session for {tenant} ({len(tenant_state['cookies'])} cookies)")
+
+    def load(self, tenant: str) -> Optional[dict]:
+        """The tenant's storage state if it still looks usable, else None"""
+        path = self.path(tenant)
+        if not path.exists():
+            return None
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable session for {tenant}: {e}")
+            return None
+
+        now = time.time()
+        if now - saved.get('saved_at', 0) > self.max_age:
+            print(f"Session for {tenant} is older than {self.max_age / 3600:.0f}h, signing in again")
+            self.invalidate(tenant)
+            return None
+        state = saved['state']
+        # expires == -1 marks a browser-session cookie, which stays until the state is dropped
+        cookies = [c for c in state['cookies'] if c.get('expires', -1) == -1 or c['expires'] > now]
+        if not cookies:
+            self.invalidate(tenant)
+            return None
+        return {'cookies': cookies, 'origins': state.get('origins', [])}
+
+    def invalidate(self, tenant: str) -> None:
+        """Forget a tenant's session (expired or rejected)"""
+        self.path(tenant).unlink(missing_ok=True)
+
+    def tenants(self) -> list:
+        if not self.root.exists():
+            return []
+        return [path.stem for path in self.root.glob('*.json')]
+
+    def storage_state(self) -> Optional[dict]:
+        """All usable tenant states merged, for a new browser context"""
+        merged = {'cookies': [], 'origins': []}
+        for tenant in self.tenants():
+            state = self.load(tenant)
+            if state:
+                merged['cookies'].extend(state['cookies'])
+                merged['origins'].extend(state['origins'])
+        return merged if merged['cookies'] else None
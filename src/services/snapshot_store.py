@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+from utils.constants import SNAPSHOTS
+
+
+@dataclass
+class SnapshotEntry:
+    digest: str
+    url: str
+    name: str
+    timestamp: str
+
+
+class SnapshotStore:
+    """Compressed, content-addressed store of serialized form pages.
+
+    Each page is stored once under objects/<sha256[:2]>/<sha256[2:]>.html.gz;
+    index.jsonl records every visit (url, posting name, digest, time), so
+    identical pages seen on several runs share one object.
+    """
+
+    def __init__(self, root: str = SNAPSHOTS['dir']):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_path = self.root / 'index.jsonl'
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest[2:]}.html.gz"
+
+    def save(self, url: str, name: str, html: str) -> str:
+        """Store a page's serialized DOM and return its digest"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                with gzip.open(tmp_path, 'wb', compresslevel=SNAPSHOTS['compresslevel']) as f:
+                    f.write(data)
+                tmp_path.replace(path)
+
+            entry = SnapshotEntry(digest=digest, url=url, name=name,
+                                  timestamp=datetime.now().isoformat())
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(asdict(entry)) + '\n')
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Serialized DOM for a digest"""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self) -> Iterator[SnapshotEntry]:
+        """Every recorded visit, oldest first"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield SnapshotEntry(**json.loads(line))
+
+    def latest(self) -> List[SnapshotEntry]:
+        """Most recent snapshot per posting URL"""
+        latest: Dict[str, SnapshotEntry] = {}
+        for entry in self.entries():
+            latest[entry.url] = entry
+        return list(latest.values())
@@ -0,0 +1,84 @@
+import re
+from typing import Optional, Tuple
+from playwright.sync_api import Page, ElementHandle
+from services.page_helpers import call_on
+from utils.constants import TEXT_INPUT
+
+TEXT_STRATEGIES = ('fill', 'insert', 'chunked')
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+class TextInput:
+    """Enters text with the cheapest method the field tolerates.
+
+    - fill: one call that sets the value and fires input/change
+    - insert: focus plus a single insertText, for contenteditable editors
+    - chunked: insertText for all but the last few characters, then real
+      keystrokes for the tail so autocomplete widgets see key events
+
+    The cost per field is a fixed number of calls regardless of length.
+    The value is read back afterwards; on a mismatch the next strategy
+    in line is tried.
+    """
+
+    def __init__(self, page: Page, keystroke_tail: int = TEXT_INPUT['keystroke_tail'],
+                 keystroke_delay: int = TEXT_INPUT['keystroke_delay']):
+        self.page = page
+        self.keystroke_tail = keystroke_tail
+        self.keystroke_delay = keystroke_delay
+
+    def choose(self, traits: dict, label: str = '') -> str:
+        """Pick a strategy from the probed field traits and its label"""
+        # Whole words: 'city' must not match 'ethnicity', nor 'location' 'relocation'
+        words = set(re.findall(r'[a-z0-9]+', label.lower()))
+        if traits.get('autocomplete') or words & set(TEXT_INPUT['keystroke_labels']):
+            return 'chunked'
+        if traits.get('editable') and traits.get('tag') not in ('input', 'textarea'):
+            return 'insert'
+        return 'fill'
+
+    def enter(self, element: ElementHandle, value: str, label: str = '') -> Tuple[bool, str]:
+        """Enter a value and verify it; returns (verified, strategy used)"""
+        traits = call_on(element, 'probeTextInput', TEXT_INPUT['autocomplete_selectors'])
+        if traits.get('maxLength') and len(value) > traits['maxLength']:
+            print(f"Truncating value to the field's maxlength of {traits['maxLength']}")
+            value = value[:traits['maxLength']]
+
+        strategy = self.choose(traits, label)
+        # Fall back in order of cost if the field does not take the value
+        order = TEXT_STRATEGIES[TEXT_STRATEGIES.index(strategy):]
+        for attempt in order:
+            self._apply(element, value, attempt)
+            actual = call_on(element, 'inputValue')
+            if self._matches(value, actual, keystrokes=attempt == 'chunked'):
+                return True, attempt
+            print(f"Value check failed after {attempt} (got {(actual or '')[:40]!r})")
+        return False, order[-1]
+
+    def _apply(self, element: ElementHandle, value: str, strategy: str) -> None:
+        if strategy == 'fill':
+            element.fill(value)
+            return
+
+        element.fill("")
+        element.focus()
+        if strategy == 'insert':
+            self.page.keyboard.insert_text(value)
+            return
+
+        # chunked: bulk insert, then keystrokes for the tail
+        split = max(0, len(value) - self.keystroke_tail)
+        if split:
+            self.page.keyboard.insert_text(value[:split])
+        self.page.keyboard.type(value[split:], delay=self.keystroke_delay)
+
+    @staticmethod
+    def _matches(expected: str, actual: Optional[str], keystrokes: bool) -> bool:
+        expected, actual = _normalize(expected), _normalize(actual)
+        if keystrokes:
+            # Autocompletes may rewrite the text to the picked suggestion
+            return expected in actual
+        return expected == actual
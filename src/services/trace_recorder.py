@@ -0,0 +1,93 @@
+import json
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Optional
+from playwright.sync_api import BrowserContext, Page
+from utils.constants import TRACING
+
+
+class TraceRecorder:
+    """Playwright tracing per posting, kept only when the posting fails.
+
+    Tracing runs on the context without per-action screenshots or DOM
+    snapshots; each posting is one trace chunk. At stage boundaries
+    (loaded, filled, ...) a screenshot and the page HTML go into a small
+    ring buffer. When the posting succeeds the chunk is stopped without a
+    path, which discards it; when it fails the chunk, the ring buffer and
+    the error are written to <dir>/<posting>-<time>/.
+    """
+
+    def __init__(self, root: str = TRACING['dir'], ring_size: int = TRACING['ring_size'],
+                 screenshot_quality: int = TRACING['screenshot_quality']):
+        self.root = Path(root)
+        self.screenshot_quality = screenshot_quality
+        self.context: Optional[BrowserContext] = None
+        self.posting: Optional[str] = None
+        self.stages: Deque[dict] = deque(maxlen=ring_size)
+        self.saved = 0
+
+    def attach(self, context: BrowserContext) -> None:
+        """Start tracing on a (new) context; a chunk running on the old one is lost with it"""
+        self.context = context
+        self.posting = None
+        context.tracing.start(screenshots=False, snapshots=False, sources=False)
+
+    def begin(self, posting: str) -> None:
+        """Start this posting's chunk"""
+        if not self.context:
+            return
+        if self.posting:
+            # Previous posting never ended (e.g. crashed mid-way): drop it
+            self.end(failed=False)
+        self.context.tracing.start_chunk(title=posting)
+        self.posting = posting
+        self.stages.clear()
+
+    def mark(self, page: Page, stage: str) -> None:
+        """Capture a screenshot and the DOM at a stage boundary"""
+        if not self.posting:
+            return
+        capture = {'stage': stage, 'time': time.time(), 'url': page.url}
+        try:
+            capture['screenshot'] = page.screenshot(type='jpeg', quality=self.screenshot_quality)
+            capture['html'] = page.content()
+        except Exception as e:
+            capture['error'] = str(e)
+        self.stages.append(capture)
+
+    def end(self, failed: bool, error: Optional[BaseException] = None) -> Optional[Path]:
+        """Finish the posting's chunk: persist it on failure, discard it otherwise"""
+        if not self.posting or not self.context:
+            return None
+        posting, self.posting = self.posting, None
+        try:
+            if not failed:
+                self.context.tracing.stop_chunk()
+                return None
+
+            out_dir = self.root / f"{posting}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            self.context.tracing.stop_chunk(path=str(out_dir / 'trace.zip'))
+            self._write_stages(out_dir, error)
+            self.saved += 1
+            print(f"Saved failure trace to {out_dir} (open with: playwright show-trace {out_dir / 'trace.zip'})")
+            return out_dir
+        except Exception as e:
+            print(f"Could not finish trace for {posting}: {e}")
+            return None
+        finally:
+            self.stages.clear()
+
+    def _write_stages(self, out_dir: Path, error: Optional[BaseException]) -> None:
+        summary = {'error': repr(error) if error else None, 'stages': []}
+        for idx, capture in enumerate(self.stages, 1):
+            prefix = f"{idx:02d}-{capture['stage']}"
+            if capture.get('screenshot'):
+                (out_dir / f"{prefix}.jpg").write_bytes(capture['screenshot'])
+            if capture.get('html'):
+                (out_dir / f"{prefix}.html").write_text(capture['html'])
+            summary['stages'].append({k: v for k, v in capture.items() if k not in ('screenshot', 'html')})
+        with open(out_dir / 'summary.json', 'w') as f:
+            json.dump(summary, f, indent=2)
@@ -2,94 +2,61 @@ import requests
 import time
 from playwright.sync_api import Page
 from typing import Optional
+from services.captcha_diagnostics import CaptchaDiagnostics
+from services.page_helpers import call, wait_for
+from services.posting_budget import BudgetExceeded, PostingBudget
+from utils.constants import CAPTCHA_SOLVER
 
 class TwoCaptchaHandler:
     """Handler for automated captcha solving using 2captcha API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = CAPTCHA_SOLVER['base_url'],
+                 poll_interval: float = CAPTCHA_SOLVER['poll_interval'],
+                 max_polls: int = CAPTCHA_SOLVER['max_polls'],
+                 request_timeout: float = CAPTCHA_SOLVER['request_timeout']):
         self.api_key = api_key
-        self.base_url = "https://2captcha.com"
+        # Point at a local stand-in (standins/captcha_standin.py) for benchmarks
+        self.base_url = base_url.rstrip('/')
+        self.poll_interval = poll_interval
+        self.max_polls = max_polls
+        self.request_timeout = request_timeout
+        # Optional CaptchaTokenBroker that prefetches and caches tokens
+        self.broker = None
+        # Optional CaptchaTriggerStore: fields that bring up a challenge, per host
+        self.triggers = None
+        # Captchas that came up, for the cost model's captcha rate
+        self.encounters = 0
+        # Widget state capture at detection points (off unless configured)
+        self.diagnostics = CaptchaDiagnostics()
         
     @staticmethod
     def detect_hcaptcha(page: Page) -> dict:
         """Find and return visible hCaptcha details"""
+        # Runs after every field, so one small helper call and no state dump;
+        # CaptchaDiagnostics records the full widget state when enabled.
         try:
-            print("\nChecking for hCaptcha iframes...")
-            
-            # First get count of iframes
-            iframe_count = page.evaluate("""() => {
-                return document.querySelectorAll('iframe[src*="hcaptcha"]').length;
-            }""")
-            print(f"Found {iframe_count} hCaptcha iframes")
-            
-            # Get details of each iframe
-            iframes_data = page.evaluate("""() => {
-                const iframes = document.querySelectorAll('iframe[src*="hcaptcha"]');
-                return Array.from(iframes).map(iframe => {
-                    const style = window.getComputedStyle(iframe);
-                    const rect = iframe.getBoundingClientRect();
-                    return {
-                        src: iframe.src,
-                        id: iframe.id,
-                        visibility: style.visibility,
-                        display: style.display,
-                        opacity: style.opacity,
-                        width: rect.width,
-                        height: rect.height
-                    };
-                });
-            }""")
-            
-            # Print details of each iframe
-            for idx, iframe in enumerate(iframes_data):
-                print(f"\nIframe {idx + 1}:")
-                print(f"  Source: {iframe['src']}")
-                print(f"  ID: {iframe['id']}")
-                print(f"  Visibility: {iframe['visibility']}")
-                print(f"  Display: {iframe['display']}")
-                print(f"  Opacity: {iframe['opacity']}")
-                print(f"  Dimensions: {iframe['width']}x{iframe['height']}")
-            
-            # Now find the visible one
-            hcaptcha = page.evaluate("""() => {
-                const iframes = document.querySelectorAll('iframe[src*="hcaptcha"]');
-                
-                // Look for an iframe that's fully visible
-                for (const iframe of iframes) {
-                    const style = window.getComputedStyle(iframe);
-                    const rect = iframe.getBoundingClientRect();
-                    if (style.visibility === 'visible' && 
-                        style.display === 'block' && 
-                        style.opacity === '1' &&
-                        rect.width > 0) {
-                        
-                        // Get the sitekey from parent div
-                        const hcaptchaDiv = document.querySelector('.h-captcha');
-                        return {
-                            found: true,
-                            sitekey: hcaptchaDiv ? hcaptchaDiv.getAttribute('data-sitekey') : null,
-                            src: iframe.src
-                        };
-                    }
-                }
-                return { found: false };
-            }""")
+            hcaptcha = call(page, 'detectHcaptcha')
             
             if hcaptcha["found"]:
-                print("\nFound visible hCaptcha:")
-                print(f"  Sitekey: {hcaptcha['sitekey']}")
-                print(f"  Source: {hcaptcha['src']}")
-            else:
-                print("\nNo visible hCaptcha found")
+                print(f"Found visible hCaptcha (sitekey {hcaptcha['sitekey']}, "
+                      f"{hcaptcha['iframes']} hCaptcha iframes)")
             
             return hcaptcha
             
         except Exception as e:
             print(f"Error checking for hCaptcha: {e}")
             return { "found": False }
+
+    def _timeout(self, budget: Optional[PostingBudget]) -> float:
+        """Seconds one 2captcha request may take: the fixed cap, or less if the budget is lower"""
+        if not budget:
+            return self.request_timeout
+        budget.check('captcha solve')
+        return max(0.1, budget.remaining_seconds(self.request_timeout))
             
-    def _get_solution_from_2captcha(self, website_key: str, page_url: str) -> Optional[str]:
-        """Get solution token from 2captcha API"""
+    def _get_solution_from_2captcha(self, website_key: str, page_url: str,
+                                    budget: Optional[PostingBudget] = None) -> Optional[str]:
+        """Get solution token from 2captcha API, polling no longer than the budget allows"""
         print(f"Solving hCaptcha with sitekey: {website_key}")
         
         # Create task
@@ -107,10 +74,17 @@ class TwoCaptchaHandler:
         print(f"  method: hcaptcha")
         
         # Submit task
-        response = requests.post(
-            f"{self.base_url}/in.php",
-            params=data
-        )
+        try:
+            response = requests.post(
+                f"{self.base_url}/in.php",
+                params=data,
+                timeout=self._timeout(budget)
+            )
+        except requests.RequestException as e:
+            if budget:
+                budget.check('captcha solve')
+            print(f"Error creating task: {e}")
+            return None
 
         print("################################## : Response")
         print(response.json())
@@ -131,17 +105,27 @@ class TwoCaptchaHandler:
         
         # Get solution
         print("Waiting for solution...")
-        max_attempts = 24  # Increased to 2 minutes total
-        for _ in range(max_attempts):
-            response = requests.get(
-                f"{self.base_url}/res.php",
-                params={
-                    "key": self.api_key,
-                    "action": "get",
-                    "id": task_id,
-                    "json": 1
-                }
-            )
+        for _ in range(self.max_polls):
+            if budget:
+                budget.check('captcha solve')
+            try:
+                response = requests.get(
+                    f"{self.base_url}/res.php",
+                    params={
+                        "key": self.api_key,
+                        "action": "get",
+                        "id": task_id,
+                        "json": 1
+                    },
+                    timeout=self._timeout(budget)
+                )
+            except requests.RequestException as e:
+                if budget:
+                    budget.check('captcha solve')
+                # A dropped poll; the task may still be solved
+                print(f"Error polling for solution: {e}")
+                time.sleep(budget.remaining_seconds(self.poll_interval) if budget else self.poll_interval)
+                continue
             
             result = response.json()
             print(result)
@@ -167,37 +151,14 @@ class TwoCaptchaHandler:
                 print(f"Error getting solution: {result.get('request')}")
                 return None
             
-            time.sleep(5)
+            time.sleep(budget.remaining_seconds(self.poll_interval) if budget else self.poll_interval)
         
         print("Timeout waiting for solution")
         return None
 
     def _set_response_in_checkbox(self, frame, solution: str) -> bool:
         """Set the solution in the checkbox iframe"""
-        result = frame.evaluate("""(solution) => {
-            try {
-                // Find checkbox-invisible iframe and set response
-                const checkbox = document.querySelector('iframe[src*="checkbox-invisible"]');
-                if (!checkbox) {
-                    return { 
-                        success: false, 
-                        error: 'checkbox-invisible iframe not found in frame' 
-                    };
-                }
-                
-                checkbox.setAttribute('data-hcaptcha-response', solution);
-                return { 
-                    success: true,
-                    widgetId: checkbox.getAttribute('data-hcaptcha-widget-id'),
-                    response: checkbox.getAttribute('data-hcaptcha-response')
-                };
-            } catch (e) {
-                return { 
-                    success: false, 
-                    error: e.message 
-                };
-            }
-        }""", solution)
+        result = call(frame, 'setCheckboxResponse', solution)
 
         if not result.get('success'):
             print(f"✗ Error setting response: {result.get('error')}")
@@ -210,24 +171,7 @@ class TwoCaptchaHandler:
     def _set_response_in_input(self, page, solution: str) -> bool:
         """Set the solution in the hidden input field"""
         print("\nSetting response in hidden input...")
-        result = page.evaluate("""(solution) => {
-            try {
-                const input = document.querySelector('textarea[name="h-captcha-response"]');
-                if (!input) {
-                    return { 
-                        success: false, 
-                        error: 'Response input field not found' 
-                    };
-                }
-                input.value = solution;
-                return { success: true };
-            } catch (e) {
-                return { 
-                    success: false, 
-                    error: e.message 
-                };
-            }
-        }""", solution)
+        result = call(page, 'setInputResponse', solution)
 
         if not result.get('success'):
             print(f"✗ Error setting input: {result.get('error')}")
@@ -239,67 +183,7 @@ class TwoCaptchaHandler:
     def _handle_button_click(self, frame) -> tuple[bool, Optional[str]]:
         """Handle button detection and clicking. Returns (success, button_type)"""
         print("\nChecking available buttons...")
-        buttons = frame.evaluate("""() => {
-            try {
-                const nextButton = document.querySelector('button[title="Next Challenge"], button[data-cy="next-challenge"]');
-                const verifyButton = document.querySelector('button[title="Verify Answers"], button[data-cy="verify-answers"]');
-                # const skipButton = document.querySelector('button[title="Skip Challenge"], button[data-cy="skip-challenge"]');
-                
-                console.log("Button search results:", {
-                    nextFound: !!nextButton,
-                    verifyFound: !!verifyButton,
-                    # skipFound: !!skipButton,
-                    allButtons: Array.from(document.querySelectorAll('button')).map(b => ({
-                        title: b.title,
-                        text: b.textContent,
-                        class: b.className
-                    }))
-                });
-                
-                # if (skipButton) {
-                #     console.log("Found Skip button - clicking to skip challenge");
-                #     skipButton.click();
-                #     return { 
-                #         success: true,
-                #         buttonClicked: 'skip'
-                #     };
-                } else if (verifyButton) {
-                    console.log("Found Verify button - clicking to complete");
-                    verifyButton.click();
-                    return { 
-                        success: true,
-                        buttonClicked: 'verify'
-                    };
-                } else if (nextButton) {
-                    console.log("Found Next button - clicking to continue");
-                    nextButton.click();
-                    return {
-                        success: true,
-                        buttonClicked: 'next'
-                    };
-                } else {
-                    // Log all buttons found for debugging
-                    const allButtons = Array.from(document.querySelectorAll('button'));
-                    return {
-                        success: false,
-                        error: 'No matching button found',
-                        debug: {
-                            totalButtons: allButtons.length,
-                            buttonDetails: allButtons.map(b => ({
-                                title: b.title,
-                                text: b.textContent,
-                                class: b.className
-                            }))
-                        }
-                    };
-                }
-            } catch (e) {
-                return { 
-                    success: false, 
-                    error: e.message 
-                };
-            }
-        }""")
+        buttons = call(frame, 'clickChallengeButton')
         
         if not buttons.get('success'):
             print(f"✗ Error with buttons: {buttons.get('error')}")
@@ -321,8 +205,8 @@ class TwoCaptchaHandler:
             print("✗ No actionable buttons found")
             return False, None
 
-    def solve_hcaptcha(self, page: Page, hcaptcha: dict) -> bool:
-        """Main method to solve hCaptcha on a page"""
+    def solve_hcaptcha(self, page: Page, hcaptcha: dict, budget: Optional[PostingBudget] = None) -> bool:
+        """Main method to solve hCaptcha on a page, within the posting's budget if given"""
         try:
             print("\nStarting hCaptcha solution process...")
             
@@ -332,9 +216,13 @@ class TwoCaptchaHandler:
                 return False
 
             print(f"Website key: {website_key}")
+            self.encounters += 1
             # import pdb; pdb.set_trace()
-            # Get solution from 2captcha
-            solution = self._get_solution_from_2captcha(website_key, page.url)
+            # Get solution from the broker's cache/prefetch, or 2captcha directly
+            if self.broker:
+                solution = self.broker.take(website_key, page.url, budget)
+            else:
+                solution = self._get_solution_from_2captcha(website_key, page.url, budget)
             if not solution:
                 return False
 
@@ -367,90 +255,17 @@ class TwoCaptchaHandler:
             if button_type == 'verify':
                 # Wait for enclave iframes to become hidden
                 print("\nWaiting for hCaptcha to process solution...")
-                page.wait_for_function("""() => {
-                    // Find the initially visible iframe
-                    const enclaves = document.querySelectorAll('iframe[src*="hcaptcha-enclave"]');
-                    const visibleEnclave = Array.from(enclaves).find(iframe => 
-                        window.getComputedStyle(iframe).visibility === 'visible'
-                    );
-                    
-                    // If no visible iframe found, it means it became hidden
-                    return !visibleEnclave;
-                }""", timeout=5000)
+                wait_for(page, 'enclaveHidden', timeout=budget.clamp(5000, 'captcha solve') if budget else 5000)
                 print("✓ hCaptcha processed solution (visible iframe became hidden)")
+                self.diagnostics.capture(page, "captcha_solved")
                 return True
             else:  # button_type == 'next'
                 # Wait a bit and try again
-                self.page.wait_for_timeout(1000)  # Wait 1 second
-                return self.solve_hcaptcha(self.page, hcaptcha)  # Recursive call
+                page.wait_for_timeout(budget.clamp(1000, 'captcha solve') if budget else 1000)  # Wait 1 second
+                return self.solve_hcaptcha(page, hcaptcha, budget)  # Recursive call
                 
+        except BudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error in solve_hcaptcha: {e}")
             return False
-
-    def print_captcha_state(self, page: Page, message: str):
-        """Print the current state of captcha elements"""
-        print(f"\n=== {message} ===")
-        
-        # Get all hcaptcha iframes and elements
-        elements = page.evaluate("""() => {
-            const iframes = document.querySelectorAll('iframe[src*="hcaptcha"]');
-            const responseInput = document.querySelector('#hcaptchaResponseInput');
-            const hcaptchaDiv = document.querySelector('.h-captcha');
-            
-            return {
-                iframes: Array.from(iframes).map(iframe => ({
-                    src: iframe.src,
-                    style: {
-                        display: iframe.style.display || window.getComputedStyle(iframe).display,
-                        visibility: iframe.style.visibility || window.getComputedStyle(iframe).visibility,
-                        opacity: iframe.style.opacity || window.getComputedStyle(iframe).opacity
-                    },
-                    attributes: {
-                        'data-hcaptcha-widget-id': iframe.getAttribute('data-hcaptcha-widget-id'),
-                        'data-hcaptcha-response': iframe.getAttribute('data-hcaptcha-response'),
-                        'aria-hidden': iframe.getAttribute('aria-hidden')
-                    },
-                    dataset: Object.assign({}, iframe.dataset)
-                })),
-                responseInput: responseInput ? {
-                    value: responseInput.value,
-                    attributes: {
-                        name: responseInput.getAttribute('name'),
-                        type: responseInput.getAttribute('type')
-                    }
-                } : null,
-                hcaptchaDiv: hcaptchaDiv ? {
-                    attributes: {
-                        'class': hcaptchaDiv.getAttribute('class'),
-                        'data-sitekey': hcaptchaDiv.getAttribute('data-sitekey'),
-                        'data-theme': hcaptchaDiv.getAttribute('data-theme')
-                    },
-                    dataset: Object.assign({}, hcaptchaDiv.dataset)
-                } : null
-            };
-        }""")
-        
-        print("\nHCaptcha iframes:")
-        for idx, iframe in enumerate(elements['iframes']):
-            print(f"\nIframe {idx + 1}:")
-            print(f"  Source: {iframe['src']}")
-            print(f"  Style: {iframe['style']}")
-            print(f"  Attributes: {iframe['attributes']}")
-            print(f"  Dataset: {iframe['dataset']}")
-            
-        print("\nResponse Input:")
-        if elements['responseInput']:
-            print(f"  Value: {elements['responseInput']['value']}")
-            print(f"  Attributes: {elements['responseInput']['attributes']}")
-        else:
-            print("  Not found")
-            
-        print("\nHCaptcha Div:")
-        if elements['hcaptchaDiv']:
-            print(f"  Attributes: {elements['hcaptchaDiv']['attributes']}")
-            print(f"  Dataset: {elements['hcaptchaDiv']['dataset']}")
-        else:
-            print("  Not found")
-            
-        print("=" * 50) 
\ No newline at end of file
@@ -0,0 +1,104 @@
+import os
+from typing import Optional, Set
+from playwright.sync_api import Page
+from services.latency_tracker import HostTimeouts
+from services.page_helpers import call
+from services.posting_budget import BudgetExceeded
+from services.session_cache import SessionCache, tenant_of
+from utils.constants import WORKDAY_AUTH
+
+
+class WorkdayAuth:
+    """Signs in to Workday candidate accounts, once per tenant.
+
+    The session cache's storage state is injected when the browser context
+    is created, so usually the first posting on a tenant already finds the
+    account signed in and only has to check for it, on the posting page it
+    has already loaded. A full sign-in runs only
+    when there is no cached session or it has expired, and the fresh session
+    is saved for later postings and runs.
+    """
+
+    def __init__(self, session_cache: SessionCache,
+                 email: Optional[str] = None, password: Optional[str] = None):
+        self.session_cache = session_cache
+        self.email = email or os.environ.get(WORKDAY_AUTH['email_env'])
+        self.password = password or os.environ.get(WORKDAY_AUTH['password_env'])
+        # Tenants confirmed signed in during this run
+        self._verified: Set[str] = set()
+        self.sign_ins = 0
+
+    @staticmethod
+    def handles(url: str) -> bool:
+        return tenant_of(url).endswith(WORKDAY_AUTH['host_suffix'])
+
+    def _state(self, page: Page) -> str:
+        selectors = WORKDAY_AUTH['selectors']
+        return call(page, 'sessionState', {
+            'signedIn': selectors['signed_in'],
+            'signInButton': selectors['sign_in_button'],
+        })
+
+    def ensure_signed_in(self, page: Page, timeouts: Optional[HostTimeouts] = None) -> bool:
+        """Make sure the page's tenant is signed in; the page must be on the tenant"""
+        tenant = tenant_of(page.url)
+        if tenant in self._verified:
+            return True
+        timeouts = timeouts or HostTimeouts()
+
+        # Cheap check: wait for either marker on the page we are already on.
+        # A slow page gets a second, longer wait before we give up on it.
+        selectors = WORKDAY_AUTH['selectors']
+        state = 'unknown'
+        for stage in ('element', 'page_load'):
+            try:
+                page.wait_for_selector(f"{selectors['signed_in']}, {selectors['sign_in_button']}",
+                                       timeout=timeouts[stage])
+            except BudgetExceeded:
+                raise
+            except Exception:
+                pass
+            state = self._state(page)
+            if state != 'unknown':
+                break
+        if state == 'signed_in':
+            print(f"Reusing Workday session for {tenant}")
+            self._verified.add(tenant)
+            return True
+        if state == 'unknown':
+            # Can't tell: fail this posting but keep a cached session that may be fine
+            print(f"Workday session state on {tenant} unknown (neither marker rendered)")
+            return False
+
+        # Explicitly signed out: no session, or the cached one has expired
+        self.session_cache.invalidate(tenant)
+        if not self._sign_in(page, timeouts):
+            return False
+        self.session_cache.save(tenant, page.context)
+        self._verified.add(tenant)
+        return True
+
+    def _sign_in(self, page: Page, timeouts: HostTimeouts) -> bool:
+        """Run the sign-in dialog with the configured credentials"""
+        if not self.email or not self.password:
+            print(f"Workday credentials missing: set {WORKDAY_AUTH['email_env']} "
+                  f"and {WORKDAY_AUTH['password_env']}")
+            return False
+
+        selectors = WORKDAY_AUTH['selectors']
+        print(f"Signing in to Workday on {tenant_of(page.url)}...")
+        try:
+            page.click(selectors['sign_in_button'], timeout=timeouts['element'])
+            page.fill(selectors['email'], self.email, timeout=timeouts['element'])
+            page.fill(selectors['password'], self.password, timeout=timeouts['element'])
+            # Workday lays a click filter over its buttons; clicking it submits
+            page.click(selectors['submit'], timeout=timeouts['element'])
+            page.wait_for_selector(selectors['signed_in'], timeout=timeouts['navigation'])
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Workday sign-in failed: {e}")
+            return False
+        self.sign_ins += 1
+        print("✓ Signed in")
+        return True
@@ -0,0 +1,263 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_SITEKEY = "10000000-ffff-ffff-ffff-000000000001"
+
+
+@dataclass
+class StandinConfig:
+    """Solve behaviour of the stand-in (times in seconds)"""
+    solve_median: float = 20.0       # Median solve time
+    solve_sigma: float = 0.5         # Log-normal spread of solve times
+    solve_min: float = 0.0           # Lower bound on any solve
+    unsolvable_rate: float = 0.0     # Share of tasks ending in ERROR_CAPTCHA_UNSOLVABLE
+    valid_key: Optional[str] = None  # Reject other keys with ERROR_WRONG_USER_KEY
+    sitekey: str = DEFAULT_SITEKEY
+
+    def sample_solve_time(self) -> float:
+        if self.solve_median <= 0:
+            return self.solve_min
+        sample = random.lognormvariate(math.log(self.solve_median), self.solve_sigma)
+        return max(self.solve_min, sample)
+
+
+@dataclass
+class Task:
+    ready_at: float
+    unsolvable: bool
+    token: str
+    sitekey: str
+    pageurl: str
+
+
+# Lever-like application form whose location field brings up the challenge,
+# like the real Lever forms do.
+WIDGET_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Stand-in application</title></head>
+<body>
+<form method="POST" action="/widget/submit">
+  <div class="application-label">Full name ✱</div>
+  <div class="application-field"><input type="text" name="name"></div>
+  <div class="application-label">Email ✱</div>
+  <div class="application-field"><input type="email" name="email"></div>
+  <div class="application-label">Current location</div>
+  <div class="application-field"><input type="text" name="location" id="location-input"></div>
+  <div class="h-captcha" data-sitekey="{sitekey}"></div>
+  <textarea name="h-captcha-response" style="display:none"></textarea>
+  <iframe id="hcaptcha-challenge" src="/hcaptcha-enclave/challenge?sitekey={sitekey}"
+          style="display:none; visibility:hidden; opacity:0; width:400px; height:580px; border:0"></iframe>
+  <button type="submit">Submit application</button>
+</form>
+<script>
+  const showChallenge = () => {{
+    const frame = document.getElementById('hcaptcha-challenge');
+    frame.style.display = 'block';
+    frame.style.visibility = 'visible';
+    frame.style.opacity = '1';
+  }};
+  document.getElementById('location-input').addEventListener('input', showChallenge, {{ once: true }});
+  if (location.search.includes('challenge=1')) showChallenge();
+</script>
+</body>
+</html>"""
+
+# Challenge frame: holds the checkbox-invisible frame and the Verify button.
+# Verifying with a token in the parent's response field hides the challenge.
+CHALLENGE_PAGE = """<!DOCTYPE html>
+<html>
+<body>
+<iframe src="/hcaptcha/checkbox-invisible" data-hcaptcha-widget-id="standin-widget"
+        style="width:1px; height:1px; border:0"></iframe>
+<p>Select all images with a bus</p>
+<button title="Verify Answers" data-cy="verify-answers" id="verify">Verify</button>
+<script>
+  document.getElementById('verify').addEventListener('click', () => {
+    const response = parent.document.querySelector('textarea[name="h-captcha-response"]');
+    if (response && response.value) {
+      parent.document.getElementById('hcaptcha-challenge').style.visibility = 'hidden';
+    }
+  });
+</script>
+</body>
+</html>"""
+
+SUBMITTED_PAGE = "<html><body><h3>Application submitted</h3></body></html>"
+REJECTED_PAGE = ("<html><body><div class=\"application-error\">"
+                 "Please complete the captcha</div></body></html>")
+
+
+class CaptchaStandin:
+    """Local stand-in for the 2captcha API and an hCaptcha-protected form.
+
+    Emulates in.php / res.php (CAPCHA_NOT_READY until a sampled solve time
+    has passed, ERROR_CAPTCHA_UNSOLVABLE at a configurable rate) and serves
+    a form page with a fake hCaptcha widget at /widget.
+    """
+
+    def __init__(self, config: Optional[StandinConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or StandinConfig()
+        self.tasks: Dict[str, Task] = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CaptchaStandin":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def create_task(self, sitekey: str, pageurl: str) -> str:
+        task_id = uuid.uuid4().hex[:12]
+        task = Task(
+            ready_at=time.monotonic() + self.config.sample_solve_time(),
+            unsolvable=random.random() < self.config.unsolvable_rate,
+            token=f"P1_standin_{uuid.uuid4().hex}",
+            sitekey=sitekey,
+            pageurl=pageurl,
+        )
+        with self.lock:
+            self.tasks[task_id] = task
+        return task_id
+
+    def poll_task(self, task_id: str) -> dict:
+        with self.lock:
+            task = self.tasks.get(task_id)
+        if not task:
+            return {"status": 0, "request": "ERROR_WRONG_CAPTCHA_ID"}
+        if time.monotonic() < task.ready_at:
+            return {"status": 0, "request": "CAPCHA_NOT_READY"}
+        if task.unsolvable:
+            return {"status": 0, "request": "ERROR_CAPTCHA_UNSOLVABLE"}
+        return {"status": 1, "request": task.token}
+
+    def is_issued_token(self, token: str) -> bool:
+        with self.lock:
+            return any(task.token == token for task in self.tasks.values())
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _params(self) -> Dict[str, str]:
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8')
+                    params.update({k: v[0] for k, v in parse_qs(body).items()})
+                return params
+
+            def _send(self, body: str, content_type: str = 'text/html', status: int = 200):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _json(self, payload: dict):
+                self._send(json.dumps(payload), 'application/json')
+
+            def _route(self):
+                path = urlparse(self.path).path
+                params = self._params()
+                config = standin.config
+
+                if path == '/in.php':
+                    if config.valid_key and params.get('key') != config.valid_key:
+                        return self._json({"status": 0, "request": "ERROR_WRONG_USER_KEY"})
+                    if params.get('method') != 'hcaptcha' or not params.get('sitekey'):
+                        return self._json({"status": 0, "request": "ERROR_BAD_PARAMETERS"})
+                    task_id = standin.create_task(params['sitekey'], params.get('pageurl', ''))
+                    return self._json({"status": 1, "request": task_id})
+
+                if path == '/res.php':
+                    if config.valid_key and params.get('key') != config.valid_key:
+                        return self._json({"status": 0, "request": "ERROR_WRONG_USER_KEY"})
+                    return self._json(standin.poll_task(params.get('id', '')))
+
+                if path == '/widget':
+                    return self._send(WIDGET_PAGE.format(sitekey=config.sitekey))
+                if path == '/widget/submit':
+                    token = params.get('h-captcha-response', '')
+                    if token and standin.is_issued_token(token):
+                        return self._send(SUBMITTED_PAGE)
+                    return self._send(REJECTED_PAGE, status=400)
+                if path.startswith('/hcaptcha-enclave/challenge'):
+                    return self._send(CHALLENGE_PAGE)
+                if path.startswith('/hcaptcha/'):
+                    return self._send("<html><body></body></html>")
+                return self._send("Not found", 'text/plain', 404)
+
+            def do_GET(self):
+                self._route()
+
+            def do_POST(self):
+                self._route()
+
+        return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local 2captcha + hCaptcha stand-in")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--solve-median', type=float, default=20.0, help="Median solve time (s)")
+    parser.add_argument('--solve-sigma', type=float, default=0.5, help="Log-normal spread")
+    parser.add_argument('--solve-min', type=float, default=0.0, help="Minimum solve time (s)")
+    parser.add_argument('--unsolvable-rate', type=float, default=0.0,
+                        help="Share of tasks answered with ERROR_CAPTCHA_UNSOLVABLE")
+    parser.add_argument('--valid-key', default=None, help="Only accept this API key")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = StandinConfig(
+        solve_median=args.solve_median,
+        solve_sigma=args.solve_sigma,
+        solve_min=args.solve_min,
+        unsolvable_rate=args.unsolvable_rate,
+        valid_key=args.valid_key,
+    )
+    standin = CaptchaStandin(config, port=args.port)
+    print(f"Captcha stand-in listening on {standin.base_url} (form page at /widget)")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+TITLES = ["Software Engineer", "Senior Software Engineer", "Machine Learning Engineer",
+          "Data Scientist", "Product Manager", "Account Executive", "Recruiter",
+          "Backend Engineer", "Frontend Engineer", "Engineering Manager"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Remote", "Austin, TX", "London", "Toronto"]
+TEAMS = ["Engineering", "Data", "Product", "Sales", "People"]
+COMMITMENTS = ["Full-time", "Part-time", "Contract", "Intern"]
+# Last-Modified of the generated boards, so they revalidate across restarts
+GENERATED_AT = 1700000000
+
+# Minimal Lever-like application form behind every apply URL
+APPLY_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>{title}</title></head>
+<body>
+<form method="POST">
+  <div class="application-label">Full name ✱</div>
+  <div class="application-field"><input type="text" name="name" required></div>
+  <div class="application-label">Email ✱</div>
+  <div class="application-field"><input type="email" name="email" required></div>
+  <button type="submit">Submit application</button>
+</form>
+</body>
+</html>"""
+
+SUBMITTED_PAGE = "<html><body><h3>Application submitted</h3></body></html>"
+
+
+class LeverStandin:
+    """Local stand-in for Lever's public postings API.
+
+    Serves GET /v0/postings/<company>?mode=json for a set of generated
+    companies, with an ETag and Last-Modified per board and 304 answers to
+    matching conditional requests. Apply URLs point back at the stand-in,
+    which serves a small application form there. touch() changes a board,
+    as when a company opens a posting.
+    """
+
+    def __init__(self, companies: int = 20, postings_per_company: int = 50,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.boards: Dict[str, dict] = {}
+        self.requests = 0
+        self.not_modified = 0
+        for idx in range(companies):
+            self.touch(f"company{idx:03d}", postings_per_company, modified=GENERATED_AT)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.base_url}/v0/postings"
+
+    @property
+    def companies(self) -> List[str]:
+        return list(self.boards)
+
+    def _posting(self, company: str) -> dict:
+        posting_id = str(uuid.UUID(int=self.random.getrandbits(128)))
+        hosted = f"{self.base_url}/{company}/{posting_id}"
+        return {
+            'id': posting_id,
+            'text': self.random.choice(TITLES),
+            'categories': {
+                'location': self.random.choice(LOCATIONS),
+                'team': self.random.choice(TEAMS),
+                'commitment': self.random.choice(COMMITMENTS),
+            },
+            'workplaceType': self.random.choice(['onsite', 'hybrid', 'remote']),
+            'hostedUrl': hosted,
+            'applyUrl': f"{hosted}/apply",
+            'createdAt': 1700000000000,
+            'descriptionPlain': "Lorem ipsum " * 200,
+        }
+
+    def touch(self, company: str, postings: int = 1, modified: Optional[float] = None) -> None:
+        """Add postings to a board (creating it), which changes its ETag"""
+        with self.lock:
+            board = self.boards.setdefault(company, {'postings': []})
+            board['postings'].extend(self._posting(company) for _ in range(postings))
+            board['body'] = json.dumps(board['postings']).encode('utf-8')
+            # Postings come from a seeded generator, so on a fixed port the
+            # ETag is the same on every run
+            board['etag'] = f'"{hashlib.sha1(board["body"]).hexdigest()}"'
+            board['modified'] = formatdate(modified, usegmt=True)
+
+    def start(self) -> "LeverStandin":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str, status: int = 200,
+                      headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_modified(self, board: dict) -> bool:
+                etag = self.headers.get('If-None-Match')
+                if etag:
+                    return etag == board['etag']
+                since = self.headers.get('If-Modified-Since')
+                if since:
+                    try:
+                        return parsedate_to_datetime(since) >= parsedate_to_datetime(board['modified'])
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def _board(self, company: str):
+                with standin.lock:
+                    standin.requests += 1
+                    board = standin.boards.get(company)
+                    if board:
+                        board = dict(board)
+                if not board:
+                    body = json.dumps({"ok": False, "error": "Document not found"}).encode('utf-8')
+                    return self._send(body, 'application/json', 404)
+                validators = {'ETag': board['etag'], 'Last-Modified': board['modified']}
+                if self._not_modified(board):
+                    with standin.lock:
+                        standin.not_modified += 1
+                    self.send_response(304)
+                    for name, value in validators.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self._send(board['body'], 'application/json', headers=validators)
+
+            def do_GET(self):
+                parts = urlparse(self.path).path.strip('/').split('/')
+                if len(parts) == 3 and parts[:2] == ['v0', 'postings']:
+                    return self._board(parts[2])
+                if len(parts) == 3 and parts[2] == 'apply' and parts[0] in standin.boards:
+                    page = APPLY_PAGE.format(title=f"{parts[0]} application")
+                    return self._send(page.encode('utf-8'), 'text/html')
+                self._send(b"Not found", 'text/plain', 404)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                parts = urlparse(self.path).path.strip('/').split('/')
+                if len(parts) == 3 and parts[2] == 'apply':
+                    return self._send(SUBMITTED_PAGE.encode('utf-8'), 'text/html')
+                self._send(b"Not found", 'text/plain', 404)
+
+        return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Lever postings API stand-in")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--companies', type=int, default=20, help="Generated companies")
+    parser.add_argument('--postings', type=int, default=50, help="Open postings per company")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    standin = LeverStandin(args.companies, args.postings, port=args.port)
+    print(f"Lever stand-in listening on {standin.api_base} "
+          f"(companies company000..company{args.companies - 1:03d})")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,234 @@ TIMEOUTS = {
     'interaction': 2000,     # After clicks/inputs
     'navigation': 20000,     # Page navigation/submission
     'resume_upload': 13000,  # Resume upload timeout
-} 
\ No newline at end of file
+}
+
+# Fuzzy label matching against the answer bank
+MATCHING = {
+    'threshold': 0.45,       # Minimum cosine similarity to accept a match
+    'ngram_size': 3,         # Character n-gram length
+    'option_threshold': 0.6, # Minimum similarity to pick a radio/checkbox/select option
+}
+
+# Per-host scheduling (times in seconds)
+SCHEDULER = {
+    'rate_per_minute': 6,    # Sustained postings per minute per host
+    'burst': 2,              # Postings a host may take back to back
+    'max_attempts': 3,       # Attempts per posting, including the first
+    'backoff_base': 5,       # First retry backoff ceiling
+    'backoff_max': 120,      # Largest retry backoff ceiling
+    'breaker_failures': 3,   # Consecutive host failures that open the circuit
+    'breaker_reset': 300,    # How long an open circuit parks the host
+    'deadline_horizon': 24 * 3600,  # Postings closing within this many seconds jump the queue
+}
+
+# Per-host timeouts learned from observed latencies. Derived values are
+# clamped between 'floor' and the matching TIMEOUTS entry.
+ADAPTIVE_TIMEOUTS = {
+    'history_path': 'output/state/latency.json',
+    'window': 200,           # Samples kept per host and stage
+    'min_samples': 5,        # Samples needed before adapting
+    'percentile': 99,        # Percentile of the window to build on
+    'margin': 1.5,           # Multiplier applied to the percentile
+    'floor': 1000,           # Smallest timeout ever used (ms)
+}
+
+# Submission confirmation markers. The wait is bounded by TIMEOUTS['navigation'].
+CONFIRMATION = {
+    'poll': 100,             # In-page polling interval (ms)
+    'response_check': 1000,  # How often the submit POST status is checked (ms)
+    'success_url_patterns': [r'/thanks', r'/confirmation', r'application-?submitted'],
+    'success_selectors': [
+        '[data-qa="msg-submit-success"]',
+        '.application-confirmation',
+        '[data-automation-id="applicationSubmitted"]',
+    ],
+    'success_texts': [
+        'application submitted',
+        'thank you for applying',
+        'thanks for applying',
+        'we have received your application',
+    ],
+    'error_selectors': [
+        '[data-qa="msg-submit-error"]',
+        '.application-error',
+        '.error-message',
+    ],
+}
+
+# HAR record-and-replay
+REPLAY = {
+    'har_dir': 'output/har',
+    # Never replayed from the recording; answered with an empty 200 instead
+    'stub_url_patterns': [r'hcaptcha\.com', r'2captcha\.com'],
+    'submit_stub_body': '<html><body><h3>Application submitted (replay)</h3></body></html>',
+}
+
+# DOM snapshot store for offline re-scraping
+SNAPSHOTS = {
+    'dir': 'output/snapshots',
+    'compresslevel': 6,      # gzip level for stored pages
+    'workers': 4,            # Parallel browsers for batch re-scrapes
+}
+
+# Browser context recycling for long runs (0 disables a limit)
+RECYCLING = {
+    'max_postings': 25,      # Fresh context after this many postings
+    'max_rss_mb': 1500,      # Fresh context once driver + browser RSS exceeds this
+}
+
+# hCaptcha token prefetching (times in seconds)
+CAPTCHA_BROKER = {
+    'ttl': 110,              # hCaptcha tokens expire after ~120s
+    'max_solves': 50,        # Solve budget per run
+    'workers': 2,            # Concurrent background solves
+    'sitekey_path': 'output/state/sitekeys.json',
+}
+
+# 2captcha API (times in seconds)
+CAPTCHA_SOLVER = {
+    'base_url': 'https://2captcha.com',
+    'poll_interval': 5,      # Delay between res.php polls
+    'max_polls': 24,         # Polls before giving up (2 minutes)
+    'request_timeout': 30,   # Seconds per in.php/res.php request (less if the budget is lower)
+}
+
+# hCaptcha state diagnostics written as JSON lines
+CAPTCHA_DIAGNOSTICS = {
+    'level': 'off',          # off, sampled or all
+    'sample_rate': 0.1,      # Share of events captured when sampled
+    'log_path': 'output/logs/captcha.jsonl',
+}
+
+# Text entry: keystrokes only where a widget needs them
+TEXT_INPUT = {
+    'keystroke_tail': 3,     # Characters typed as real keys in chunked mode
+    'keystroke_delay': 50,   # Delay between those keystrokes (ms)
+    'keystroke_labels': ['location', 'city'],   # Whole label words
+    'autocomplete_selectors': [
+        '.location-input',
+        '[data-qa="location-input"]',
+        '[data-automation-id="searchBox"]',
+    ],
+}
+
+# Cross-posting question corpus and precomputed answers
+QUESTION_CORPUS = {
+    'db_path': 'output/state/questions.db',
+    'top_questions': 200,    # Questions answered ahead of a run
+}
+
+# Workday candidate accounts. Credentials come from the environment.
+WORKDAY_AUTH = {
+    'host_suffix': '.myworkdayjobs.com',
+    'email_env': 'WORKDAY_EMAIL',
+    'password_env': 'WORKDAY_PASSWORD',
+    'session_dir': 'output/state/sessions',
+    'session_max_age': 12 * 3600,  # Seconds before a saved session is re-authenticated
+    'selectors': {
+        'signed_in': '[data-automation-id="accountSettingsButton"], [data-automation-id="utilityButtonAccountSettings"]',
+        'sign_in_button': '[data-automation-id="utilityButtonSignIn"]',
+        'email': '[data-automation-id="email"]',
+        'password': '[data-automation-id="password"]',
+        'submit': '[data-automation-id="click_filter"][aria-label="Sign In"], [data-automation-id="signInSubmitButton"]',
+    },
+}
+
+# Post-fill verification before submitting
+VERIFICATION = {
+    'repair_rounds': 1,      # Refill passes over fields whose value didn't take
+}
+
+# Failure traces: a Playwright trace chunk per posting, saved only on failure
+TRACING = {
+    'dir': 'output/traces',
+    'ring_size': 4,            # Stage screenshots + DOM kept per posting
+    'screenshot_quality': 50,  # JPEG quality of stage screenshots
+}
+
+# Playwright round-trip accounting (opt-in profiler)
+ROUND_TRIPS = {
+    'log_path': 'output/logs/round_trips.jsonl',
+    'top_sites': 10,         # Call sites listed per posting
+    'budget': 400,           # Calls per posting before it is flagged
+}
+
+# Posting cost estimates for the scheduler (seconds)
+POSTING_COSTS = {
+    'history_path': 'output/state/posting_costs.json',
+    'window': 20,            # Postings kept per host
+    'default_fields': 15,    # Field count assumed without a cached schema
+    'seconds_per_field': 4,  # Fill time per field for unseen hosts
+    'page_load_seconds': 10, # Load, scrape and submit overhead for unseen hosts
+    'captcha_seconds': 45,   # Typical extra time when a captcha comes up
+    'captcha_prior': 0.3,    # Captcha likelihood for unseen hosts
+}
+
+# Fields that bring up hCaptcha, learned per host
+CAPTCHA_TRIGGERS = {
+    'path': 'output/state/captcha_triggers.json',
+    'learn_forms': 3,        # Forms per host checked after every field
+    'sample_every': 10,      # Afterwards, every Nth form is still checked after every field
+    'min_rate': 0.5,         # Share of checks a field must trigger to be filled last
+    # Label words known to trigger, by host (whole words, seed_types fields only)
+    'seed': {
+        'jobs.lever.co': ['location'],
+    },
+    'seed_types': ['text', 'textarea'],
+}
+
+# Total time a posting may take, from navigation to confirmed submit
+POSTING_BUDGET = {
+    'seconds': 240,
+}
+
+# Browser engines. 'routes_path' holds the fastest engine per ATS host,
+# written by engine_benchmark.py and used with --engine auto.
+BROWSER_ENGINES = {
+    'default': 'chromium',
+    'routes_path': 'output/state/engine_routes.json',
+    'chromium': {
+        'args': ['--start-maximized', '--disable-infobars', '--window-size=1920,1080'],
+        # Lean headless: no GPU, extensions, background traffic or audio
+        'headless_args': [
+            '--disable-gpu',
+            '--disable-dev-shm-usage',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--no-first-run',
+            '--mute-audio',
+        ],
+        # No fixed viewport: required for Chromium maximized mode
+        'context': {'viewport': None, 'no_viewport': True},
+    },
+    'firefox': {
+        'args': [],
+        'headless_args': [],
+        'firefox_user_prefs': {
+            'browser.cache.disk.enable': False,
+            'network.prefetch-next': False,
+            'media.autoplay.default': 5,   # Block all autoplay
+            'browser.sessionstore.resume_from_crash': False,
+        },
+        'context': {'viewport': {'width': 1920, 'height': 1080}},
+    },
+}
+
+# Lever posting discovery (public postings API, conditional requests)
+LEVER_DISCOVERY = {
+    'api_base': 'https://api.lever.co/v0/postings',
+    'companies': ['voltus', 'regentcraft'],
+    'cache_path': 'output/state/lever_postings.json',
+    'output_path': 'output/discovered.json',
+    'standin_port': 8766,    # Fixed (as in lever_standin.py), so apply URLs and ETags hold across runs
+    'workers': 16,
+    'timeout': 10,   # Seconds per API request
+    # Case-insensitive substrings; empty lists let everything through
+    'rules': {
+        'title_include': [],
+        'title_exclude': [],
+        'locations': [],
+        'commitments': [],
+    },
+}
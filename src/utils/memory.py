@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+PROC = Path('/proc')
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """Parent pid -> child pids, read from /proc"""
+    children: Dict[int, List[int]] = {}
+    for stat_path in PROC.glob('[0-9]*/stat'):
+        try:
+            stat = stat_path.read_text()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name: state, ppid, ...
+        fields = stat[stat.rfind(')') + 2:].split()
+        pid = int(stat_path.parent.name)
+        children.setdefault(int(fields[1]), []).append(pid)
+    return children
+
+
+def child_pids(pid: int) -> Set[int]:
+    """Direct children of a process (empty where /proc is unavailable)"""
+    if not PROC.exists():
+        return set()
+    return set(_children_map().get(pid, []))
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants, in MB.
+
+    Returns None where /proc is unavailable (non-Linux).
+    """
+    if not PROC.exists():
+        return None
+    children = _children_map()
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            resident_pages = int((PROC / str(current) / 'statm').read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        total += resident_pages * page_size
+        stack.extend(children.get(current, []))
+    return total / (1024 * 1024)
+
+
+def dispose(handles: Iterable) -> None:
+    """Release ElementHandles (or JSHandles) so the page can free them"""
+    for handle in handles:
+        if handle is None:
+            continue
+        try:
+            handle.dispose()
+        except Exception:
+            # Handle already gone with its page or context
+            pass
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+# Test URLs
+URLS = [
+    ("https://jobs.lever.co/voltus/e6e12da1-116e-4fa9-bb36-a6d224aaee4f/apply", "voltus"),
+    ("https://jobs.lever.co/Regentcraft/f8597117-3d67-4989-944a-c89fd4f756ac/apply", "regentcraft")
+]
+
+# Optional scheduling hints by posting name, e.g.
+# {"voltus": {"priority": 1, "deadline": "2026-11-01"}}
+POSTING_OPTIONS = {}
+
+# Captcha solver API key
+CAPTCHA_API_KEY = "<your api key>"
+
+def posting_schedule(name: str) -> tuple[int, Optional[float]]:
+    """Priority and deadline (epoch seconds) configured for a posting"""
+    options = POSTING_OPTIONS.get(name, {})
+    deadline = options.get('deadline')
+    return options.get('priority', 0), datetime.fromisoformat(deadline).timestamp() if deadline else None